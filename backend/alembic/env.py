@@ -4,6 +4,7 @@ from sqlalchemy import engine_from_config
 from sqlalchemy import pool
 
 from alembic import context
+from app.config import settings
 from app.db import Base
 
 from app.models.user import User
@@ -11,14 +12,18 @@ from app.models.refresh_token import RefreshToken
 from app.models.chat_threads import ChatThread
 from app.models.chat_messages import ChatMessage
 from app.models.chat_files import ChatFiles
+from app.models.chat_file_blob import ChatFileBlob
 
-from app.models import user, refresh_token, chat_threads, chat_messages, chat_files
+from app.models import user, refresh_token, chat_threads, chat_messages, chat_files, chat_file_blob
 
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
 config = context.config
 
+# the database location comes from the app settings (DATABASE_URL), not alembic.ini
+config.set_main_option("sqlalchemy.url", settings.database_url.replace("%", "%%"))
+
 # Interpret the config file for Python logging.
 # This line sets up loggers basically.
 if config.config_file_name is not None:
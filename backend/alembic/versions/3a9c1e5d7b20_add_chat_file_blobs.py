@@ -0,0 +1,133 @@
+"""add chat file blobs
+
+Revision ID: 3a9c1e5d7b20
+Revises: ffbcf548b830
+Create Date: 2026-10-19 10:12:31.482017
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from datetime import datetime
+import hashlib
+import zlib
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3a9c1e5d7b20'
+down_revision: Union[str, Sequence[str], None] = 'ffbcf548b830'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# keep in sync with app.models.chat_file_blob.MIN_COMPRESS_SIZE
+MIN_COMPRESS_SIZE = 256
+
+
+def encode_blob(content: str) -> dict:
+    raw = content.encode("utf-8")
+    data, compression = raw, "none"
+    if len(raw) >= MIN_COMPRESS_SIZE:
+        compressed = zlib.compress(raw, 6)
+        if len(compressed) < len(raw):
+            data, compression = compressed, "zlib"
+    return {
+        "hash": hashlib.sha256(raw).hexdigest(),
+        "compression": compression,
+        "size": len(raw),
+        "data": data,
+        "created_at": datetime.utcnow(),
+    }
+
+
+def decode_blob(data: bytes, compression: str) -> str:
+    if compression == "zlib":
+        data = zlib.decompress(data)
+    elif compression != "none":
+        raise RuntimeError(f"Cannot downgrade blob compressed with {compression!r}")
+    return data.decode("utf-8")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    blobs_table = op.create_table('chat_file_blobs',
+    sa.Column('hash', sa.String(length=64), nullable=False),
+    sa.Column('compression', sa.String(length=16), nullable=False),
+    sa.Column('size', sa.Integer(), nullable=False),
+    sa.Column('data', sa.LargeBinary(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('hash')
+    )
+
+    with op.batch_alter_table('chat_files') as batch_op:
+        batch_op.add_column(sa.Column('blob_hash', sa.String(length=64), nullable=True))
+
+    # backfill: one blob per distinct file content
+    conn = op.get_bind()
+    files_table = sa.table(
+        'chat_files',
+        sa.column('id', sa.Integer),
+        sa.column('file_content', sa.String),
+        sa.column('blob_hash', sa.String),
+    )
+
+    seen = set()
+    rows = conn.execute(sa.select(files_table.c.id, files_table.c.file_content)).fetchall()
+    for file_id, content in rows:
+        blob = encode_blob(content)
+        if blob["hash"] not in seen:
+            conn.execute(blobs_table.insert().values(**blob))
+            seen.add(blob["hash"])
+        conn.execute(
+            files_table.update()
+            .where(files_table.c.id == file_id)
+            .values(blob_hash=blob["hash"])
+        )
+
+    with op.batch_alter_table('chat_files') as batch_op:
+        batch_op.alter_column('blob_hash', existing_type=sa.String(length=64), nullable=False)
+        batch_op.create_foreign_key(
+            'fk_chat_files_blob_hash_chat_file_blobs', 'chat_file_blobs', ['blob_hash'], ['hash']
+        )
+        batch_op.create_index(batch_op.f('ix_chat_files_blob_hash'), ['blob_hash'], unique=False)
+        batch_op.drop_column('file_content')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('chat_files') as batch_op:
+        batch_op.add_column(sa.Column('file_content', sa.String(), nullable=True))
+
+    conn = op.get_bind()
+    files_table = sa.table(
+        'chat_files',
+        sa.column('id', sa.Integer),
+        sa.column('file_content', sa.String),
+        sa.column('blob_hash', sa.String),
+    )
+    blobs_table = sa.table(
+        'chat_file_blobs',
+        sa.column('hash', sa.String),
+        sa.column('compression', sa.String),
+        sa.column('data', sa.LargeBinary),
+    )
+
+    rows = conn.execute(
+        sa.select(files_table.c.id, blobs_table.c.data, blobs_table.c.compression)
+        .join(blobs_table, blobs_table.c.hash == files_table.c.blob_hash)
+    ).fetchall()
+    for file_id, data, compression in rows:
+        conn.execute(
+            files_table.update()
+            .where(files_table.c.id == file_id)
+            .values(file_content=decode_blob(data, compression))
+        )
+
+    with op.batch_alter_table('chat_files') as batch_op:
+        batch_op.alter_column('file_content', existing_type=sa.String(), nullable=False)
+        batch_op.drop_index(batch_op.f('ix_chat_files_blob_hash'))
+        batch_op.drop_constraint('fk_chat_files_blob_hash_chat_file_blobs', type_='foreignkey')
+        batch_op.drop_column('blob_hash')
+
+    op.drop_table('chat_file_blobs')
@@ -0,0 +1,32 @@
+"""add chat query indexes
+
+Revision ID: 8e4f2b6c1a93
+Revises: 3a9c1e5d7b20
+Create Date: 2026-10-19 12:05:48.915203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e4f2b6c1a93'
+down_revision: Union[str, Sequence[str], None] = '3a9c1e5d7b20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_chat_messages_thread_id_created_at', 'chat_messages', ['thread_id', 'created_at'], unique=False)
+    op.create_index('ix_chat_threads_user_id_updated_at', 'chat_threads', ['user_id', 'updated_at', 'id'], unique=False)
+    op.create_index(op.f('ix_chat_files_message_id'), 'chat_files', ['message_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_chat_files_message_id'), table_name='chat_files')
+    op.drop_index('ix_chat_threads_user_id_updated_at', table_name='chat_threads')
+    op.drop_index('ix_chat_messages_thread_id_created_at', table_name='chat_messages')
@@ -0,0 +1,28 @@
+"""add refresh token hash index
+
+Revision ID: c71d5a0e9f42
+Revises: 8e4f2b6c1a93
+Create Date: 2026-10-19 12:31:07.264410
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c71d5a0e9f42'
+down_revision: Union[str, Sequence[str], None] = '8e4f2b6c1a93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_refresh_tokens_token_hash'), 'refresh_tokens', ['token_hash'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_refresh_tokens_token_hash'), table_name='refresh_tokens')
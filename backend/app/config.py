@@ -6,7 +6,48 @@ from pydantic_settings import BaseSettings, SettingsConfigDict
 class Settings(BaseSettings):
     openai_api_key: str  # required
     log_level: str = "INFO"
+    log_max_payload_chars: int = 2000  # longer logged payloads (diagrams, histories) are truncated
+    # frontend log ingestion (/api/logs), rates are in records per client, 0 disables the limit
+    log_ingest_max_batch: int = 500
+    log_ingest_rate_per_second: float = 20
+    log_ingest_burst: int = 1000
+
     refresh_token_expire_days: int = 7
+    refresh_token_purge_interval_seconds: int = 3600  # 0 disables the background purge
+
+    # authenticated users are cached per process, 0 disables the cache
+    user_cache_size: int = 1024
+    user_cache_ttl_seconds: int = 60
+
+    # worker warm-up on startup: comma separated algorithm names, e.g. "kruskal,genetic",
+    # empty disables it
+    warmup_algorithms: str = ""
+    warmup_shrink: bool = True  # also run each warmed algorithm on a tiny synthetic diagram
+
+    # upper bound on the time one /api/processPUML shrink may take, 0 means no limit;
+    # requests can ask for less with the "max_seconds" setting. Applies to algorithms
+    # that support budgets (the genetic algorithm), the others run in a single pass
+    shrink_max_seconds: float = 0
+    # idle shrinking algorithm instances kept per configuration, 0 disables pooling
+    algorithm_pool_size: int = 4
+
+    # database
+    database_url: str = "sqlite:///./app.db"
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: int = 30  # seconds
+    db_pool_recycle: int = 1800  # seconds, -1 disables recycling
+
+    # sqlite connection pragmas (ignored for other databases)
+    sqlite_journal_mode: str = "WAL"
+    sqlite_synchronous: str = "NORMAL"  # safe with WAL, only the last commits may be lost on power loss
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_cache_size_kib: int = 64 * 1024
+    sqlite_mmap_size: int = 256 * 1024 * 1024
+
+    # chat file storage: "zlib", "zstd" or "none"; zstd needs the zstandard package,
+    # which is checked on startup
+    file_blob_compression: str = "zlib"
 
     model_config = SettingsConfigDict(env_file=Path(__file__).parent.parent / ".env")
 
@@ -1,15 +1,97 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 
-DATABASE_URL = "sqlite:///./app.db"
+from app.config import settings
 
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False}
-)
+DATABASE_URL = settings.database_url
+
+# async drivers used for the sync drivers above (e.g. aiosqlite locally, asyncpg for Postgres)
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+
+def to_async_url(url: str) -> str:
+    """
+    Swap the driver of a sync database URL for its async counterpart.
+    URLs that already name a driver (e.g. "postgresql+asyncpg://") are kept as they are.
+    """
+    parsed = make_url(url)
+    if "+" in parsed.drivername:
+        return url
+    driver = ASYNC_DRIVERS.get(parsed.drivername)
+    if driver is None:
+        raise ValueError(f"No async driver known for database URL: {url!r}")
+    return parsed.set(drivername=driver).render_as_string(hide_password=False)
+
+
+def _is_sqlite(url: str) -> bool:
+    return make_url(url).get_backend_name() == "sqlite"
+
+
+def _engine_kwargs(url: str) -> dict:
+    """Connection and pool arguments for the given database URL."""
+    parsed = make_url(url)
+
+    if parsed.get_backend_name() == "sqlite":
+        kwargs = {"connect_args": {"check_same_thread": False}}
+        # in-memory databases use a single shared connection, pool settings do not apply
+        if parsed.database in (None, "", ":memory:"):
+            return kwargs
+    else:
+        kwargs = {"pool_pre_ping": True}
+
+    kwargs.update(
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+    )
+    return kwargs
+
+
+def set_sqlite_pragmas(dbapi_connection, connection_record=None) -> None:
+    """
+    Tune every new SQLite connection: WAL lets readers run next to a writer,
+    synchronous=NORMAL skips the fsync per commit, and busy_timeout makes
+    writers wait for the lock instead of failing with "database is locked".
+    """
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f"PRAGMA journal_mode={settings.sqlite_journal_mode}")
+        cursor.execute(f"PRAGMA synchronous={settings.sqlite_synchronous}")
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout_ms)}")
+        # negative cache_size is in KiB instead of pages
+        cursor.execute(f"PRAGMA cache_size=-{int(settings.sqlite_cache_size_kib)}")
+        cursor.execute(f"PRAGMA mmap_size={int(settings.sqlite_mmap_size)}")
+    finally:
+        cursor.close()
+
+
+def register_sqlite_pragmas(url: str, *engines) -> None:
+    """Run set_sqlite_pragmas on every new connection of the engines if `url` is SQLite."""
+    if not _is_sqlite(url):
+        return
+    for target in engines:
+        event.listen(target, "connect", set_sqlite_pragmas)
+
+
+engine = create_engine(DATABASE_URL, **_engine_kwargs(DATABASE_URL))
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+async_engine = create_async_engine(to_async_url(DATABASE_URL), **_engine_kwargs(DATABASE_URL))
+
+# objects are used after commit when building responses, so they must not expire
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
+register_sqlite_pragmas(DATABASE_URL, engine, async_engine.sync_engine)
+
 Base = declarative_base()
 
 def get_db():
@@ -18,3 +100,7 @@ def get_db():
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -1,11 +1,15 @@
 import os
+import asyncio
 import tempfile
 import json
+from contextlib import asynccontextmanager
 from typing import Union
 
 from datetime import datetime
+from app.config import settings
 from app.util import logger
 from fastapi import (
+    Body,
     FastAPI,
     UploadFile,
     Form,
@@ -13,33 +17,48 @@ from fastapi import (
     HTTPException,
     Request,
     Depends,
+    Query,
+    Response,
     status,
 )
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from app.services.openai_service import OpenAIService
-from app.services.parse_puml_service import PUMLParser
-from app.services.shrinking_algorithms.factory import get_algorithm
+from app.services.parse_puml_service import get_parser
+from app.services.shrinking_algorithms.registry import AlgorithmSpec, algorithm_registry
+from app.services.shrinking_algorithms.base import Budget
 
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.db import get_db
+from app.db import get_db, get_async_db
 from app.models.user import User
 from app.models.refresh_token import RefreshToken
 
 from app.models.password_reset_code import PasswordResetCode
+from app.models.chat_file_blob import check_codec
 from app.schemas.user import (UserListItem, UserRegister, UserResponse,
                               UserLogin, TokenResponse, RefreshRequest, ChangePasswordRequest)
 from app.schemas.chat_thread import ChatThreadSchema, ThreadRenameRequest
-from app.schemas.chat_message import ChatMessageSchema
+from app.schemas.chat_message import ChatMessageSchema, ChatMessageSummarySchema
+from app.repository.pagination import MAX_PAGE_LIMIT, decode_cursor
 from app.schemas.thread_create_response import ThreadCreateResponse
 
 import random
 from app.services.security_service import hash_password
 from app.services.jwt_service import create_access_token, create_refresh_token, hash_refresh_token, verify_access_token, verify_refresh_token
-from app.services.chat_service import ChatService
+from app.services.async_chat_service import AsyncChatService
+from app.services.user_cache import AuthenticatedUser, user_cache
+from app.services.rate_limiter import TokenBucketRateLimiter
+from app.schemas.log import LogRecordSchema
+from app.services.refresh_token_service import (
+    get_active_refresh_token,
+    purge_refresh_tokens_periodically,
+    revoke_refresh_token,
+)
+from app.services.warmup import parse_algorithm_names, warm_up
 
-from app.schemas.config import ConfigRequest, Algorithm
+from app.schemas.config import ConfigRequest
 from app.schemas.user import (
     UserListItem,
     UserRegister,
@@ -61,7 +80,38 @@ from app.services.jwt_service import (
     verify_refresh_token,
 )
 
-app = FastAPI()
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+log_rate_limiter = TokenBucketRateLimiter(
+    rate_per_second=settings.log_ingest_rate_per_second,
+    burst=settings.log_ingest_burst,
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # fail on startup instead of on every file upload
+    check_codec(settings.file_blob_compression)
+
+    background_tasks = []
+    if settings.refresh_token_purge_interval_seconds > 0:
+        background_tasks.append(asyncio.create_task(
+            purge_refresh_tokens_periodically(settings.refresh_token_purge_interval_seconds)
+        ))
+
+    # runs before the worker starts serving, so the first requests do not pay for it
+    warmup_algorithms = parse_algorithm_names(settings.warmup_algorithms)
+    if warmup_algorithms:
+        await asyncio.to_thread(warm_up, warmup_algorithms, settings.warmup_shrink)
+
+    yield
+
+    for task in background_tasks:
+        task.cancel()
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+
+
+app = FastAPI(lifespan=lifespan)
 logger.log("Starting FastAPI", level="info")
 
 
@@ -71,6 +121,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 
@@ -85,15 +136,37 @@ def read_item(item_id: int, q: Union[str, None] = None):
 
 
 @app.post("/api/logs")
-async def log_endpoint(request: Request):
-    data = await request.json()
-    level = data.get("level", "info")
-    message = data.get("message", "")
-    extra = data.get("extra", [])
-    if extra:
-        message += " " + " ".join(map(str, extra))
-    logger.log(message, level=level)
-    return {"status": "ok"}
+async def log_endpoint(
+    request: Request,
+    records: Union[list[LogRecordSchema], LogRecordSchema] = Body(...),
+):
+    """
+    Accepts a single log record or a batch of them.
+    """
+    if isinstance(records, LogRecordSchema):
+        records = [records]
+    if len(records) > settings.log_ingest_max_batch:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {settings.log_ingest_max_batch} log records per request",
+        )
+
+    client = request.client.host if request.client else "unknown"
+    retry_after = log_rate_limiter.acquire(client, cost=len(records))
+    if retry_after > 0:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many log records",
+            headers={"Retry-After": str(max(1, round(retry_after)))},
+        )
+
+    # logger.log only enqueues, the file is written by the logging thread
+    for record in records:
+        message = record.message
+        if record.extra:
+            message += " " + " ".join(map(str, record.extra))
+        logger.log(message, level=record.level)
+    return {"status": "ok", "accepted": len(records)}
 
 
 # bounce back the file
@@ -123,7 +196,7 @@ def message_controller(file: UploadFile, history: str = Form(None)):
 
     # Parse history
     history_list = json.loads(history) if history else []
-    logger.log(f"Received history: {history_list}", level="debug")
+    logger.log("Received history: %s", logger.truncate(history), level="debug")
 
     if not history_list or history_list[-1]["role"] != "user":
         raise HTTPException(status_code=400, detail="no request found for processing")
@@ -144,18 +217,52 @@ def message_controller(file: UploadFile, history: str = Form(None)):
         if not entry.get("content"):
             entry["content"] = entry["text"]
 
-    logger.log(f"Parsed prompt: {history_list}", level="debug")
+    logger.log("Parsed prompt: %s", logger.truncate(history_list), level="debug")
     response = service.chat(history_list)
 
     return {"response": response}
 
 
+BUDGET_SETTINGS = ("max_seconds", "max_evaluations")
+
+
+def _shrink_budget(algorithm_settings: dict, spec: AlgorithmSpec) -> Budget:
+    """
+    Budget for one shrink from the optional "max_seconds" and "max_evaluations"
+    settings, capped by settings.shrink_max_seconds. Algorithms that do not
+    support budgets reject budget settings and get an unlimited budget.
+    """
+    if not spec.supports_budget:
+        if any(key in algorithm_settings for key in BUDGET_SETTINGS):
+            raise HTTPException(
+                status_code=400,
+                detail=f"Algorithm {spec.name!r} does not support max_seconds/max_evaluations",
+            )
+        return Budget()
+
+    try:
+        max_seconds = algorithm_settings.get("max_seconds")
+        max_seconds = float(max_seconds) if max_seconds is not None else None
+        max_evaluations = algorithm_settings.get("max_evaluations")
+        max_evaluations = int(max_evaluations) if max_evaluations is not None else None
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid budget settings")
+    if (max_seconds is not None and max_seconds <= 0) or (
+        max_evaluations is not None and max_evaluations <= 0
+    ):
+        raise HTTPException(status_code=400, detail="Budget settings must be positive")
+
+    if settings.shrink_max_seconds > 0:
+        max_seconds = min(max_seconds or settings.shrink_max_seconds, settings.shrink_max_seconds)
+    return Budget(max_seconds=max_seconds, max_evaluations=max_evaluations)
+
+
 @app.post("/api/processPUML")
 def process_puml(
     file: UploadFile = File(...), algorithm: str = Form(...), settings: str = Form(...)
 ):
     logger.log("/api/processPUML", level="info")
-    parser = PUMLParser("app/services/parser_config.json")
+    parser = get_parser()
     source_path = None
     output_path = None
 
@@ -163,6 +270,16 @@ def process_puml(
         algorithm_settings = json.loads(settings)
     except Exception:
         raise HTTPException(status_code=400, detail="Unable to parse settings")
+    if not isinstance(algorithm_settings, dict):
+        raise HTTPException(status_code=400, detail="Settings must be a JSON object")
+    try:
+        spec = algorithm_registry.get(algorithm)
+        params = spec.parse_settings(algorithm_settings)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    budget = _shrink_budget(algorithm_settings, spec)
+    # the seed is per run, instances are pooled by their other parameters
+    run_seed = params.pop("seed", None)
 
     print(algorithm)
     print(algorithm_settings)
@@ -179,21 +296,11 @@ def process_puml(
         if not parsed:
             raise HTTPException(status_code=500, detail="Unable to parse PUML file")
 
-        # TODO: unify frontend/backend names too tired
-        if algorithm == Algorithm.evolution:
-            alg = get_algorithm("genetic")
-            alg.initialize(
-                population_size=algorithm_settings.get("population", 50),
-                generations=algorithm_settings.get("iterations", 100),
-            )
-        elif algorithm == Algorithm.kruskals:
-            alg = get_algorithm("kruskal")
-            # TODO: add settigns
-        else:
-            raise HTTPException(status_code=400, detail="Invalid algorithm")
-
-        reduced = alg.compute(parsed)
-        logger.log(f"Reduced PUML: {reduced}", level="debug")
+        # unset settings fall back to the algorithm's config file
+        with algorithm_registry.acquire(spec.name, params) as alg:
+            reduced = alg.compute(parsed, budget=budget, seed=run_seed)
+            seed = alg.last_seed
+        logger.log("Reduced PUML: %s", logger.truncate(reduced), level="debug")
 
         with tempfile.NamedTemporaryFile(
             delete=False, suffix="_reduced.puml"
@@ -203,7 +310,8 @@ def process_puml(
         with open(output_path, "r") as f:
             result = f.read()
 
-        return {"parsed": parsed, "reduced": reduced, "result_puml": result}
+        # seed to send back to reproduce this result, None for deterministic algorithms
+        return {"parsed": parsed, "reduced": reduced, "result_puml": result, "seed": seed}
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -270,7 +378,7 @@ def login_user(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = D
 
     token_entry = RefreshToken(
         user_id=user.id,
-        token_hash=hash_password(refresh_token),
+        token_hash=hash_refresh_token(refresh_token),
         expires_at=RefreshToken.generate_expiration(),
     )
     db.add(token_entry)
@@ -296,30 +404,80 @@ def get_current_user(
         raise HTTPException(status_code=404, detail="User not found")
     return user
 
+# for endpoints that only need user.id: the user is looked up once per cache TTL, not per request
+async def get_current_principal(
+    token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)
+) -> AuthenticatedUser:
+    payload = verify_access_token(token)
+    if not payload:
+        raise HTTPException(status_code=401, detail="Invalid token")
+    user_id = int(payload.get("sub"))
+
+    principal = user_cache.get(user_id)
+    if principal:
+        return principal
+
+    user = await db.get(User, user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    principal = AuthenticatedUser(id=user.id, email=user.email)
+    user_cache.put(principal)
+    return principal
+
+def _validate_cursor(cursor: str | None) -> None:
+    if cursor is None:
+        return
+    try:
+        decode_cursor(cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+# paginated listings return the cursor of the next page in the X-Next-Cursor header,
+# without a limit everything is returned in one page as before
 @app.get("/api/threads", response_model=list[ChatThreadSchema])
-def threads_controller(user: User = Depends(get_current_user),
-                       db: Session = Depends(get_db)):
-    chat_service = ChatService(db)
+async def threads_controller(response: Response,
+                             limit: int | None = Query(None, ge=1, le=MAX_PAGE_LIMIT),
+                             cursor: str | None = None,
+                             user: AuthenticatedUser = Depends(get_current_principal),
+                             db: AsyncSession = Depends(get_async_db)):
+    _validate_cursor(cursor)
+    chat_service = AsyncChatService(db)
 
     try:
-        return chat_service.retrieve_threads(
+        threads, next_cursor = await chat_service.retrieve_threads_page(
             user_id=user.id,
+            limit=limit,
+            cursor=cursor,
             order="DESC"
         )
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
-@app.get("/api/threads/{thread_id}", response_model=list[ChatMessageSchema])
-def thread_chat_controller(thread_id: str,
-                           user: User = Depends(get_current_user),
-                           db: Session = Depends(get_db)):
-    chat_service = ChatService(db)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return threads
+
+@app.get("/api/threads/{thread_id}",
+         response_model=list[Union[ChatMessageSchema, ChatMessageSummarySchema]])
+async def thread_chat_controller(thread_id: str,
+                                 response: Response,
+                                 limit: int | None = Query(None, ge=1, le=MAX_PAGE_LIMIT),
+                                 cursor: str | None = None,
+                                 include_files: bool = False,
+                                 user: AuthenticatedUser = Depends(get_current_principal),
+                                 db: AsyncSession = Depends(get_async_db)):
+    _validate_cursor(cursor)
+    chat_service = AsyncChatService(db)
 
     try:
-        return chat_service.retrieve_messages(
+        messages, next_cursor = await chat_service.retrieve_messages_page(
             user_id=user.id,
             thread_id=thread_id,
-            order="ASC"
+            limit=limit,
+            cursor=cursor,
+            order="ASC",
+            include_files=include_files,
         )
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
@@ -328,14 +486,21 @@ def thread_chat_controller(thread_id: str,
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+
+    # without include_files only file names are returned, the bodies are never loaded
+    schema = ChatMessageSchema if include_files else ChatMessageSummarySchema
+    return [schema.model_validate(message) for message in messages]
+
 @app.post("/api/threads/rename", response_model=ChatThreadSchema)
-def rename_thread_controller(data: ThreadRenameRequest,
-                             user: User = Depends(get_current_user),
-                             db: Session = Depends(get_db)):
-    chat_service = ChatService(db)
+async def rename_thread_controller(data: ThreadRenameRequest,
+                                   user: AuthenticatedUser = Depends(get_current_principal),
+                                   db: AsyncSession = Depends(get_async_db)):
+    chat_service = AsyncChatService(db)
 
     try:
-        return chat_service.rename_thread(
+        return await chat_service.rename_thread(
             user_id=user.id,
             thread_id=data.thread_id,
             title=data.new_title,
@@ -349,13 +514,13 @@ def rename_thread_controller(data: ThreadRenameRequest,
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.delete("/api/threads/delete/{thread_id}")
-def delete_thread_controller(thread_id: str,
-                             user: User = Depends(get_current_user),
-                             db: Session = Depends(get_db)):
-    chat_service = ChatService(db)
+async def delete_thread_controller(thread_id: str,
+                                   user: AuthenticatedUser = Depends(get_current_principal),
+                                   db: AsyncSession = Depends(get_async_db)):
+    chat_service = AsyncChatService(db)
 
     try:
-        chat_service.delete_thread(
+        await chat_service.delete_thread(
             user_id=user.id,
             thread_id=thread_id,
             commit=True
@@ -371,15 +536,15 @@ def delete_thread_controller(thread_id: str,
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/threads/create")
-def create_thread_controller(
+async def create_thread_controller(
     title: str = Form(None),
-    user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    user: AuthenticatedUser = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    chat_service = ChatService(db)
+    chat_service = AsyncChatService(db)
 
     try:
-        thread = chat_service.create_thread(
+        thread = await chat_service.create_thread(
             user_id=user.id,
             title=title,
             commit=True
@@ -395,28 +560,28 @@ def create_thread_controller(
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/threads/createThreadAndSendPrompt", response_model=ThreadCreateResponse)
-def create_thread_and_send_message_controller(
+async def create_thread_and_send_message_controller(
     file: UploadFile = File(None),
     message: str = Form(None),
     title: str = Form(None),
-    user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    user: AuthenticatedUser = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    chat_service = ChatService(db)
+    chat_service = AsyncChatService(db)
 
     file_content: str | None = None
     file_name: str | None = None
 
     if file is not None:
         try:
-            content_bytes = file.file.read()
+            content_bytes = await file.read()
             file_content = content_bytes.decode("utf-8")
             file_name = file.filename
         except Exception:
             raise HTTPException(status_code=400, detail="Unable to read PUML file")
 
     try:
-        new_thread, response = chat_service.create_new_thread_with_prompt(
+        new_thread, response = await chat_service.create_new_thread_with_prompt(
             title=title,
             user_id=user.id,
             prompt_message=message,
@@ -437,28 +602,28 @@ def create_thread_and_send_message_controller(
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/chat/sendPrompt", response_model=ChatMessageSchema)
-def send_message_controller(
+async def send_message_controller(
     file: UploadFile = File(None),
     message: str = Form(None),
     thread_id: str = Form(None),
-    user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    user: AuthenticatedUser = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    chat_service = ChatService(db)
+    chat_service = AsyncChatService(db)
 
     file_content: str | None = None
     file_name: str | None = None
 
     if file is not None:
         try:
-            content_bytes = file.file.read()
+            content_bytes = await file.read()
             file_content = content_bytes.decode("utf-8")
             file_name = file.filename
         except Exception:
             raise HTTPException(status_code=400, detail="Unable to read PUML file")
 
     try:
-        response = chat_service.prompt_message(
+        response = await chat_service.prompt_message(
             user_id=user.id,
             thread_id=thread_id,
             prompt_message=message,
@@ -484,14 +649,7 @@ def get_me(user: User = Depends(get_current_user)):
 def refresh_access_token(request: RefreshRequest, db: Session = Depends(get_db)):
     token_hash = hash_refresh_token(request.refresh_token)
 
-    db_token = (
-        db.query(RefreshToken)
-        .filter(
-        RefreshToken.token_hash == token_hash,
-            RefreshToken.revoked == False,
-        )
-        .first()
-    )
+    db_token = get_active_refresh_token(db, token_hash)
 
     if not db_token:
         raise HTTPException(status_code=401, detail="Invalid or revoked refresh token")
@@ -513,45 +671,30 @@ def refresh_access_token(request: RefreshRequest, db: Session = Depends(get_db))
 def logout(request: RefreshRequest, db: Session = Depends(get_db)):
     token_hash = hash_refresh_token(request.refresh_token)
 
-    db_token = (
-        db.query(RefreshToken)
-        .filter(
-            RefreshToken.token_hash == token_hash,
-            RefreshToken.revoked == False,
-        )
-        .first()
-    )
-
-    if not db_token:
+    if not revoke_refresh_token(db, token_hash):
         raise HTTPException(status_code=404, detail="Refresh token not found")
 
-    db_token.revoked = True
     db.commit()
 
     return {"detail": "Logged out successfully"}
 
 
+@app.get("/api/algorithms")
+def list_algorithms():
+    """Registered shrinking algorithms with their capabilities and settings schema."""
+    return [spec.describe() for spec in algorithm_registry.specs()]
+
+
 @app.post("/api/getAlgConfig")
 def get_config_evol(request: ConfigRequest):
-    base_path = os.path.dirname(__file__)
-
-    match request.algorithm:
-        case Algorithm.kruskals:
-            full_path = os.path.join(
-                base_path, "services/shrinking_algorithms/kruskals_config.json"
-            )
-        case Algorithm.evolution:
-            full_path = os.path.join(
-                base_path, "services/shrinking_algorithms/ga_config.json"
-            )
-        case _:
-            # raise HTTPException(status_code=400, detail="Invalid algorithm")
-            return {}
+    try:
+        spec = algorithm_registry.get(request.algorithm)
+    except ValueError:
+        # e.g. "none"
+        return {}
 
     try:
-        with open(full_path, "r") as file:
-            config = json.load(file)
-            return config
+        return spec.load_config()
 
     except Exception as e:
         print(f"Error loading config file: {e}")
@@ -624,6 +767,7 @@ def reset_password_with_code(
     user.password_hash = hash_password(data.new_password)
     entry.used = True
     db.commit()
+    user_cache.invalidate(user.id)
     return {"message": "Password reset successful"}
 
 @app.post("/auth/change-password", status_code=200)
@@ -635,4 +779,5 @@ def change_password(
         raise HTTPException(status_code=400, detail="Current password is incorrect")
     user.password_hash = hash_password(data.new_password)
     db.commit()
+    user_cache.invalidate(user.id)
     return {"detail": "Password changed successfully"}
@@ -0,0 +1,97 @@
+import hashlib
+import zlib
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime, LargeBinary
+from app.db import Base
+from app.config import settings
+
+# blobs smaller than this are stored uncompressed, compression does not pay off for them
+MIN_COMPRESS_SIZE = 256
+
+CODECS = ("none", "zlib", "zstd")
+
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError:
+        raise RuntimeError("zstd compression requires the 'zstandard' package")
+    return zstandard
+
+
+def check_codec(codec: str) -> None:
+    """
+    Raise if new blobs cannot be written with `codec`. Called on startup for
+    the configured FILE_BLOB_COMPRESSION, so a bad setting does not only
+    surface on the first file upload.
+    """
+    if codec not in CODECS:
+        raise ValueError(f"Unknown compression codec: {codec!r}, expected one of {CODECS}")
+    if codec == "zstd":
+        _zstandard()
+
+
+def _compress(data: bytes, codec: str) -> bytes:
+    if codec == "zlib":
+        return zlib.compress(data, 6)
+    if codec == "zstd":
+        return _zstandard().ZstdCompressor().compress(data)
+    raise ValueError(f"Unknown compression codec: {codec!r}")
+
+
+def _decompress(data: bytes, codec: str) -> bytes:
+    if codec == "none":
+        return data
+    if codec == "zlib":
+        return zlib.decompress(data)
+    if codec == "zstd":
+        return _zstandard().ZstdDecompressor().decompress(data)
+    raise ValueError(f"Unknown compression codec: {codec!r}")
+
+
+class ChatFileBlob(Base):
+    """
+    File body stored once per distinct content, keyed by its SHA256.
+    ChatFiles rows reference it, so re-uploading the same diagram costs one row.
+    """
+    __tablename__ = "chat_file_blobs"
+
+    hash = Column(String(64), primary_key=True)  # SHA256 of the utf-8 content
+    compression = Column(String(16), nullable=False, default="none")
+    size = Column(Integer, nullable=False)  # uncompressed size in bytes
+    data = Column(LargeBinary, nullable=False)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    @staticmethod
+    def compute_hash(content: str) -> str:
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+    @classmethod
+    def encode(cls, content: str) -> dict:
+        """Column values for storing the given content."""
+        raw = content.encode("utf-8")
+        codec = settings.file_blob_compression
+
+        data = raw
+        if codec != "none" and len(raw) >= MIN_COMPRESS_SIZE:
+            compressed = _compress(raw, codec)
+            if len(compressed) < len(raw):
+                data = compressed
+            else:
+                codec = "none"
+        else:
+            codec = "none"
+
+        return {
+            "hash": cls.compute_hash(content),
+            "compression": codec,
+            "size": len(raw),
+            "data": data,
+        }
+
+    @property
+    def content(self) -> str:
+        return _decompress(self.data, self.compression).decode("utf-8")
+
+    def __repr__(self):
+        return f"<ChatFileBlob(hash={self.hash}, size={self.size}, compression='{self.compression}')>"
@@ -2,6 +2,7 @@ from datetime import datetime
 from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
 from sqlalchemy.orm import relationship
 from app.db import Base
+from app.models.chat_file_blob import ChatFileBlob
 
 class ChatFiles(Base):
     __tablename__ = "chat_files"
@@ -13,14 +14,28 @@ class ChatFiles(Base):
             "chat_messages.id",
             ondelete="CASCADE",
             onupdate="CASCADE"),
-        nullable=False)
+        nullable=False,
+        index=True)
     file_name = Column(String, nullable=False)
-    file_content = Column(String, nullable=False)
+    blob_hash = Column(
+        String(64),
+        ForeignKey("chat_file_blobs.hash"),
+        nullable=False,
+        index=True)
     uploaded_at = Column(DateTime, nullable=False, default=datetime.utcnow)
     message = relationship(
         "ChatMessage",
         back_populates="files"
     )
+    # the file body is only loaded when file_content is accessed or eager loaded explicitly
+    blob = relationship(
+        "ChatFileBlob",
+        lazy="select"
+    )
+
+    @property
+    def file_content(self) -> str | None:
+        return self.blob.content if self.blob is not None else None
 
     def __repr__(self):
         return f"<ChatFiles(id={self.id}, message_id={self.message_id}, file_name='{self.file_name}', uploaded_at='{self.uploaded_at}')>"
@@ -1,6 +1,6 @@
 from datetime import datetime
 from enum import Enum
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index, JSON, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 from app.db import Base
 
@@ -12,6 +12,10 @@ class RoleEnum(str, Enum):
 
 class ChatMessage(Base):
     __tablename__ = "chat_messages"
+    __table_args__ = (
+        # messages of a thread in time order (rowid/id is implicitly the last column)
+        Index("ix_chat_messages_thread_id_created_at", "thread_id", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     thread_id = Column(
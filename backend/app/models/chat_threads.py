@@ -1,11 +1,15 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from app.db import Base
 
 class ChatThread(Base):
     __tablename__ = "chat_threads"
+    __table_args__ = (
+        # threads of a user by last update, id breaks ties for keyset pagination
+        Index("ix_chat_threads_user_id_updated_at", "user_id", "updated_at", "id"),
+    )
 
     __updatable_fields__ = {"title", "updated_at", "last_message_at", "last_diagram_file_id"}
 
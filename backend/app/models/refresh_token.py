@@ -12,7 +12,7 @@ class RefreshToken(Base):
     id = Column(Integer, primary_key=True, index=True)
     # map to user id
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    token_hash = Column(String, nullable=False)  # SHA256 of refresh token
+    token_hash = Column(String, nullable=False, unique=True, index=True)  # SHA256 of refresh token
     created_at = Column(DateTime, default=datetime.utcnow)
     expires_at = Column(DateTime, nullable=False)
     revoked = Column(Boolean, default=False) # might be useful later
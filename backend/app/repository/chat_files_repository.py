@@ -1,5 +1,46 @@
+from sqlalchemy import delete, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.models.chat_files import ChatFiles
+from app.models.chat_file_blob import ChatFileBlob
+
+
+def _insert_blob_statement(dialect_name: str, values: dict):
+    """
+    INSERT for a blob that is a no-op when the same content already exists,
+    so concurrent uploads of one diagram do not fail on the primary key.
+    Returns None for dialects without ON CONFLICT support.
+    """
+    if dialect_name == "sqlite":
+        insert = sqlite.insert
+    elif dialect_name == "postgresql":
+        insert = postgresql.insert
+    else:
+        return None
+    return insert(ChatFileBlob).values(**values).on_conflict_do_nothing(
+        index_elements=[ChatFileBlob.hash]
+    )
+
+
+def blob_hashes_statement(*conditions):
+    """SELECT of the distinct blob hashes of the files matching `conditions`."""
+    return select(ChatFiles.blob_hash).where(*conditions).distinct()
+
+
+def delete_unreferenced_blobs_statement(blob_hashes):
+    """
+    DELETE of those of the given blobs that no file references anymore.
+    Run it in the transaction that removed the files, after a flush.
+    """
+    referenced = select(ChatFiles.id).where(ChatFiles.blob_hash == ChatFileBlob.hash).exists()
+    return (
+        delete(ChatFileBlob)
+        .where(ChatFileBlob.hash.in_(blob_hashes), ~referenced)
+        # deleted blobs must not be handed out again by the session
+        .execution_options(synchronize_session="fetch")
+    )
+
 
 class ChatFilesRepository:
     def __init__(self, db: Session):
@@ -27,10 +68,12 @@ class ChatFilesRepository:
             The created ChatFiles object.
         """
 
+        blob = self._get_or_create_blob(file_content)
+
         new_file = ChatFiles(
             message_id=message_id,
             file_name=file_name,
-            file_content=file_content
+            blob=blob
         )
 
         self.db.add(new_file)
@@ -38,6 +81,27 @@ class ChatFilesRepository:
         self.db.refresh(new_file)
         return new_file
 
+    def _get_or_create_blob(self, file_content: str) -> ChatFileBlob:
+        """
+        Get the stored blob for the content, storing it first if it is new.
+        """
+
+        blob_hash = ChatFileBlob.compute_hash(file_content)
+        blob = self.db.get(ChatFileBlob, blob_hash)
+        if blob is not None:
+            return blob
+
+        values = ChatFileBlob.encode(file_content)
+        stmt = _insert_blob_statement(self.db.get_bind().dialect.name, values)
+        if stmt is None:
+            blob = ChatFileBlob(**values)
+            self.db.add(blob)
+            self.db.flush()
+            return blob
+
+        self.db.execute(stmt)
+        return self.db.get(ChatFileBlob, blob_hash)
+
     def get_by_message_id(self,
                           message_id: int) -> list[type[ChatFiles]]:
         """
@@ -60,3 +124,89 @@ class ChatFilesRepository:
                 ChatFiles.message_id == message_id
             ).all()
         )
+
+
+class AsyncChatFilesRepository:
+    """
+    Async counterpart of ChatFilesRepository, used by the async endpoints.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def create(self,
+                     message_id: int,
+                     file_name: str,
+                     file_content: str) -> ChatFiles:
+        """
+        Create a new chat file.
+
+        Parameters
+        ----------
+        message_id: int
+            Message ID.
+        file_name: str
+            Name of the file.
+        file_content: str
+            Content of the file.
+
+        Returns
+        -------
+        ChatFiles
+            The created ChatFiles object.
+        """
+
+        blob = await self._get_or_create_blob(file_content)
+
+        new_file = ChatFiles(
+            message_id=message_id,
+            file_name=file_name,
+            blob=blob
+        )
+
+        self.db.add(new_file)
+        await self.db.flush()
+        await self.db.refresh(new_file)
+        return new_file
+
+    async def _get_or_create_blob(self, file_content: str) -> ChatFileBlob:
+        """
+        Get the stored blob for the content, storing it first if it is new.
+        """
+
+        blob_hash = ChatFileBlob.compute_hash(file_content)
+        blob = await self.db.get(ChatFileBlob, blob_hash)
+        if blob is not None:
+            return blob
+
+        values = ChatFileBlob.encode(file_content)
+        stmt = _insert_blob_statement(self.db.get_bind().dialect.name, values)
+        if stmt is None:
+            blob = ChatFileBlob(**values)
+            self.db.add(blob)
+            await self.db.flush()
+            return blob
+
+        await self.db.execute(stmt)
+        return await self.db.get(ChatFileBlob, blob_hash)
+
+    async def get_by_message_id(self,
+                                message_id: int) -> list[ChatFiles]:
+        """
+        List all files for a message.
+
+        Parameters:
+        ----------
+        message_id: int
+            Message ID
+
+        Returns:
+        --------
+        list[ChatFiles]
+            List of ChatFiles objects.
+        """
+
+        result = await self.db.execute(
+            select(ChatFiles).where(ChatFiles.message_id == message_id)
+        )
+        return list(result.scalars().all())
@@ -1,7 +1,22 @@
 from typing import Optional
-from sqlalchemy import asc, desc
+from sqlalchemy import asc, desc, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, selectinload
 from app.models.chat_messages import ChatMessage
+from app.models.chat_files import ChatFiles
+from app.repository.chat_files_repository import (
+    blob_hashes_statement,
+    delete_unreferenced_blobs_statement,
+)
+from app.repository.pagination import keyset_filter, keyset_order, split_page
+
+
+def _files_loader(include_content: bool):
+    """Eager load a message's files, and their bodies only when requested."""
+    if include_content:
+        return selectinload(ChatMessage.files).selectinload(ChatFiles.blob)
+    return selectinload(ChatMessage.files)
+
 
 class ChatMessageRepository:
     def __init__(self, db: Session):
@@ -63,7 +78,8 @@ class ChatMessageRepository:
 
     def get_by_thread_id(self,
                          thread_id: str,
-                         order: str = "ASC") -> list[ChatMessage]:
+                         order: str = "ASC",
+                         include_content: bool = True) -> list[ChatMessage]:
         """
         List all messages for a thread.
 
@@ -73,6 +89,8 @@ class ChatMessageRepository:
             Thread ID
         order: str
             Order of messages, either "ASC" or "DESC".
+        include_content: bool
+            Also load the file bodies of the messages' files.
 
         Returns:
         --------
@@ -84,8 +102,252 @@ class ChatMessageRepository:
 
         return (
             self.db.query(ChatMessage)
-            .options(selectinload(ChatMessage.files))
+            .options(_files_loader(include_content))
             .filter(ChatMessage.thread_id == thread_id)
             .order_by(ordering)
             .all()
         )
+
+    def get_page_by_thread_id(self,
+                              thread_id: str,
+                              limit: int | None,
+                              cursor: str | None = None,
+                              order: str = "ASC",
+                              include_content: bool = False) -> tuple[list[ChatMessage], str | None]:
+        """
+        List one page of messages for a thread, ordered by (created_at, id).
+
+        Parameters:
+        ----------
+        thread_id: str
+            Thread ID
+        limit: int | None
+            Maximum number of messages in the page, None for all.
+        cursor: str | None
+            Cursor returned with the previous page, None for the first page.
+        order: str
+            Order of messages, either "ASC" or "DESC".
+        include_content: bool
+            Also load the file bodies of the messages' files.
+
+        Returns:
+        --------
+        tuple[list[ChatMessage], str | None]
+            The page and the cursor of the next page (None on the last page).
+        """
+
+        query = (
+            self.db.query(ChatMessage)
+            .options(_files_loader(include_content))
+            .filter(ChatMessage.thread_id == thread_id)
+        )
+        if cursor:
+            query = query.filter(keyset_filter(ChatMessage.created_at, ChatMessage.id, cursor, order))
+
+        query = query.order_by(*keyset_order(ChatMessage.created_at, ChatMessage.id, order))
+        if limit is not None:
+            query = query.limit(limit + 1)
+
+        rows = query.all()
+        return split_page(rows, limit, "created_at")
+
+    def delete(self, message_id: int) -> bool:
+        """
+        Delete a message (and its files) by ID. Blobs only its files used are
+        deleted as well. Returns True if something was deleted.
+
+        Parameters:
+        ----------
+        message_id: int
+            Message ID.
+
+        Returns:
+        --------
+        bool
+            True if deleted, False otherwise
+        """
+
+        message = self.get_by_id(message_id)
+        if not message:
+            return False
+
+        blob_hashes = self.db.scalars(
+            blob_hashes_statement(ChatFiles.message_id == message_id)
+        ).all()
+
+        self.db.delete(message)
+        self.db.flush()
+
+        if blob_hashes:
+            self.db.execute(delete_unreferenced_blobs_statement(blob_hashes))
+        return True
+
+
+class AsyncChatMessageRepository:
+    """
+    Async counterpart of ChatMessageRepository, used by the async endpoints.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def create(self,
+                     thread_id: str,
+                     role: str,
+                     content: str) -> ChatMessage:
+        """
+        Create a new chat message.
+
+        Parameters
+        ----------
+        thread_id: str
+            Thread ID.
+        role: int
+            Type of role.
+        content: str
+            Message content.
+
+        Returns
+        -------
+        ChatMessage
+            The created ChatMessage object.
+        """
+
+        new_message = ChatMessage(
+            thread_id=thread_id,
+            role=role,
+            content=content
+        )
+
+        self.db.add(new_message)
+        await self.db.flush()
+        await self.db.refresh(new_message)
+        return new_message
+
+    async def get_by_id(self, message_id: int) -> Optional[ChatMessage]:
+        """
+        Get a chat message by its ID.
+
+        Parameters:
+        ----------
+        message_id: int
+            Message ID.
+
+        Returns:
+        --------
+        Optional[ChatMessage]
+            The ChatMessage object if found, else None.
+        """
+
+        result = await self.db.execute(
+            select(ChatMessage)
+            .options(selectinload(ChatMessage.files))
+            .where(ChatMessage.id == message_id)
+        )
+        return result.scalars().first()
+
+    async def get_by_thread_id(self,
+                               thread_id: str,
+                               order: str = "ASC",
+                               include_content: bool = True) -> list[ChatMessage]:
+        """
+        List all messages for a thread.
+
+        Parameters:
+        ----------
+        thread_id: str
+            Thread ID
+        order: str
+            Order of messages, either "ASC" or "DESC".
+        include_content: bool
+            Also load the file bodies of the messages' files.
+
+        Returns:
+        --------
+        list[ChatMessage]
+            List of ChatMessage objects.
+        """
+
+        ordering = asc(ChatMessage.created_at) if order == "ASC" else desc(ChatMessage.created_at)
+
+        result = await self.db.execute(
+            select(ChatMessage)
+            .options(_files_loader(include_content))
+            .where(ChatMessage.thread_id == thread_id)
+            .order_by(ordering)
+        )
+        return list(result.scalars().all())
+
+    async def get_page_by_thread_id(self,
+                                    thread_id: str,
+                                    limit: int | None,
+                                    cursor: str | None = None,
+                                    order: str = "ASC",
+                                    include_content: bool = False) -> tuple[list[ChatMessage], str | None]:
+        """
+        List one page of messages for a thread, ordered by (created_at, id).
+
+        Parameters:
+        ----------
+        thread_id: str
+            Thread ID
+        limit: int | None
+            Maximum number of messages in the page, None for all.
+        cursor: str | None
+            Cursor returned with the previous page, None for the first page.
+        order: str
+            Order of messages, either "ASC" or "DESC".
+        include_content: bool
+            Also load the file bodies of the messages' files.
+
+        Returns:
+        --------
+        tuple[list[ChatMessage], str | None]
+            The page and the cursor of the next page (None on the last page).
+        """
+
+        stmt = (
+            select(ChatMessage)
+            .options(_files_loader(include_content))
+            .where(ChatMessage.thread_id == thread_id)
+        )
+        if cursor:
+            stmt = stmt.where(keyset_filter(ChatMessage.created_at, ChatMessage.id, cursor, order))
+
+        stmt = stmt.order_by(*keyset_order(ChatMessage.created_at, ChatMessage.id, order))
+        if limit is not None:
+            stmt = stmt.limit(limit + 1)
+
+        result = await self.db.execute(stmt)
+        return split_page(list(result.scalars().all()), limit, "created_at")
+
+    async def delete(self, message_id: int) -> bool:
+        """
+        Delete a message (and its files) by ID. Blobs only its files used are
+        deleted as well. Returns True if something was deleted.
+
+        Parameters:
+        ----------
+        message_id: int
+            Message ID.
+
+        Returns:
+        --------
+        bool
+            True if deleted, False otherwise
+        """
+
+        message = await self.get_by_id(message_id)
+        if not message:
+            return False
+
+        blob_hashes = (await self.db.scalars(
+            blob_hashes_statement(ChatFiles.message_id == message_id)
+        )).all()
+
+        await self.db.delete(message)
+        await self.db.flush()
+
+        if blob_hashes:
+            await self.db.execute(delete_unreferenced_blobs_statement(blob_hashes))
+        return True
@@ -1,7 +1,35 @@
 from typing import Optional, Any
-from sqlalchemy import asc, desc
+from sqlalchemy import asc, delete, desc, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.models.chat_threads import ChatThread
+from app.models.chat_messages import ChatMessage
+from app.models.chat_files import ChatFiles
+from app.repository.chat_files_repository import (
+    blob_hashes_statement,
+    delete_unreferenced_blobs_statement,
+)
+from app.repository.pagination import keyset_filter, keyset_order, split_page
+
+
+def _thread_message_ids(thread_id: str):
+    return select(ChatMessage.id).where(ChatMessage.thread_id == thread_id)
+
+
+def _delete_thread_contents_statements(thread_id: str):
+    """
+    DELETEs of the thread's files and messages. The foreign keys cascade, but
+    SQLite only enforces them when asked to, so they are removed explicitly.
+    """
+    return (
+        delete(ChatFiles)
+        .where(ChatFiles.message_id.in_(_thread_message_ids(thread_id)))
+        .execution_options(synchronize_session="fetch"),
+        delete(ChatMessage)
+        .where(ChatMessage.thread_id == thread_id)
+        .execution_options(synchronize_session="fetch"),
+    )
+
 
 class ChatThreadRepository:
     def __init__(self, db: Session):
@@ -89,9 +117,46 @@ class ChatThreadRepository:
             .all()
         )
 
+    def get_page_by_user_id(self,
+                            user_id: int,
+                            limit: int | None,
+                            cursor: str | None = None,
+                            order: str = "DESC") -> tuple[list[ChatThread], str | None]:
+        """
+        List one page of threads for user, ordered by (updated_at, id).
+
+        Parameters:
+        ----------
+        user_id: int
+            User ID.
+        limit: int | None
+            Maximum number of threads in the page, None for all.
+        cursor: str | None
+            Cursor returned with the previous page, None for the first page.
+        order: str
+            Order by time {ASC or DESC}.
+
+        Returns:
+        --------
+        tuple[list[ChatThread], str | None]
+            The page and the cursor of the next page (None on the last page).
+        """
+
+        query = self.db.query(ChatThread).filter(ChatThread.user_id == user_id)
+        if cursor:
+            query = query.filter(keyset_filter(ChatThread.updated_at, ChatThread.id, cursor, order))
+
+        query = query.order_by(*keyset_order(ChatThread.updated_at, ChatThread.id, order))
+        if limit is not None:
+            query = query.limit(limit + 1)
+
+        rows = query.all()
+        return split_page(rows, limit, "updated_at")
+
     def delete(self, thread_id: str) -> bool:
         """
-        Delete a thread by ID. Returns True if something was deleted.
+        Delete a thread by ID, with its messages, files and the blobs only
+        they used. Returns True if something was deleted.
 
         Parameters:
         ----------
@@ -107,8 +172,18 @@ class ChatThreadRepository:
         if not thread:
             return False
 
+        blob_hashes = self.db.scalars(
+            blob_hashes_statement(ChatFiles.message_id.in_(_thread_message_ids(thread_id)))
+        ).all()
+
+        # the thread goes first, it references its last diagram file
         self.db.delete(thread)
         self.db.flush()
+        for statement in _delete_thread_contents_statements(thread_id):
+            self.db.execute(statement)
+
+        if blob_hashes:
+            self.db.execute(delete_unreferenced_blobs_statement(blob_hashes))
         return True
 
     def update(self,
@@ -143,3 +218,194 @@ class ChatThreadRepository:
         self.db.flush()
         self.db.refresh(thread)
         return thread
+
+
+class AsyncChatThreadRepository:
+    """
+    Async counterpart of ChatThreadRepository, used by the async endpoints.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self._updatable_fields = ChatThread.get_updatable_fields()
+
+    async def create(self,
+                     user_id: int,
+                     title: str) -> ChatThread:
+        """
+        Create a new chat thread.
+
+        Parameters
+        ----------
+        user_id: int
+            User ID.
+        title: str
+            Thread title.
+
+        Returns
+        -------
+        ChatThread
+            The created ChatThread object.
+        """
+
+        new_thread = ChatThread(
+            user_id=user_id,
+            title=title
+        )
+
+        self.db.add(new_thread)
+        await self.db.flush()
+        await self.db.refresh(new_thread)
+        return new_thread
+
+    async def get_by_id(self,
+                        thread_id: str) -> Optional[ChatThread]:
+        """
+        Get a single thread by its string ID.
+
+        Parameters:
+        ----------
+        thread_id: str
+            Thread ID
+
+        Returns:
+        --------
+        Optional[ChatThread]
+            ChatThread object or None if not found.
+        """
+
+        result = await self.db.execute(
+            select(ChatThread).where(ChatThread.id == thread_id)
+        )
+        return result.scalars().first()
+
+    async def get_all_by_user_id(self,
+                                 user_id: int,
+                                 order = "ASC") -> list[ChatThread]:
+        """
+        List all threads for user.
+
+        Parameters:
+        ----------
+        user_id: int
+            User ID.
+        order: str
+            Order by time {ASC or DESC}.
+
+        Returns:
+        --------
+        list[ChatThread]
+            Ordered list of ChatThread objects.
+        """
+
+        ordering = asc(ChatThread.updated_at) if order == "ASC" else desc(ChatThread.updated_at)
+
+        result = await self.db.execute(
+            select(ChatThread)
+            .where(ChatThread.user_id == user_id)
+            .order_by(ordering)
+        )
+        return list(result.scalars().all())
+
+    async def get_page_by_user_id(self,
+                                  user_id: int,
+                                  limit: int | None,
+                                  cursor: str | None = None,
+                                  order: str = "DESC") -> tuple[list[ChatThread], str | None]:
+        """
+        List one page of threads for user, ordered by (updated_at, id).
+
+        Parameters:
+        ----------
+        user_id: int
+            User ID.
+        limit: int | None
+            Maximum number of threads in the page, None for all.
+        cursor: str | None
+            Cursor returned with the previous page, None for the first page.
+        order: str
+            Order by time {ASC or DESC}.
+
+        Returns:
+        --------
+        tuple[list[ChatThread], str | None]
+            The page and the cursor of the next page (None on the last page).
+        """
+
+        stmt = select(ChatThread).where(ChatThread.user_id == user_id)
+        if cursor:
+            stmt = stmt.where(keyset_filter(ChatThread.updated_at, ChatThread.id, cursor, order))
+
+        stmt = stmt.order_by(*keyset_order(ChatThread.updated_at, ChatThread.id, order))
+        if limit is not None:
+            stmt = stmt.limit(limit + 1)
+
+        result = await self.db.execute(stmt)
+        return split_page(list(result.scalars().all()), limit, "updated_at")
+
+    async def delete(self, thread_id: str) -> bool:
+        """
+        Delete a thread by ID, with its messages, files and the blobs only
+        they used. Returns True if something was deleted.
+
+        Parameters:
+        ----------
+        thread_id: str
+            Thread ID.
+
+        Returns:
+        --------
+        bool
+            True if deleted, False otherwise
+        """
+
+        thread = await self.get_by_id(thread_id)
+        if not thread:
+            return False
+
+        blob_hashes = (await self.db.scalars(
+            blob_hashes_statement(ChatFiles.message_id.in_(_thread_message_ids(thread_id)))
+        )).all()
+
+        # the thread goes first, it references its last diagram file
+        await self.db.delete(thread)
+        await self.db.flush()
+        for statement in _delete_thread_contents_statements(thread_id):
+            await self.db.execute(statement)
+
+        if blob_hashes:
+            await self.db.execute(delete_unreferenced_blobs_statement(blob_hashes))
+        return True
+
+    async def update(self,
+                     thread_id: str,
+                     **kwargs: Any) -> Optional[ChatThread]:
+        """
+        Update allowed fields of a ChatThread by ID.
+
+        Parameters:
+        ----------
+        thread_id: str
+            ID of the chat thread.
+        kwargs: Any
+            Fields to update (must be in _updatable_fields).
+
+        Returns:
+        --------
+        Optional[ChatThread]
+            Updated thread or None if not found.
+        """
+
+        thread = await self.get_by_id(thread_id)
+        if not thread:
+            return None
+
+        for key, value in kwargs.items():
+            if key not in self._updatable_fields:
+                raise ValueError(f"Field '{key}' is not allowed to be updated.")
+
+            setattr(thread, key, value)
+
+        await self.db.flush()
+        await self.db.refresh(thread)
+        return thread
@@ -0,0 +1,66 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import and_, asc, desc, or_
+
+MAX_PAGE_LIMIT = 200
+
+
+def encode_cursor(timestamp: datetime, row_id: Any) -> str:
+    """
+    Encode the sort key of the last row of a page into an opaque cursor.
+    """
+    payload = json.dumps({"t": timestamp.isoformat(), "id": row_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, Any]:
+    """
+    Decode a cursor created by encode_cursor. Raises ValueError for malformed cursors.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(payload["t"]), payload["id"]
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError("Invalid pagination cursor.") from e
+
+
+def keyset_order(timestamp_column, id_column, order: str) -> list:
+    """
+    ORDER BY clause of a keyset page; the id breaks ties between equal timestamps.
+    """
+    direction = asc if order == "ASC" else desc
+    return [direction(timestamp_column), direction(id_column)]
+
+
+def keyset_filter(timestamp_column, id_column, cursor: str, order: str):
+    """
+    WHERE clause selecting the rows that come after the cursor in the given order.
+    """
+    timestamp, row_id = decode_cursor(cursor)
+
+    if order == "ASC":
+        return or_(
+            timestamp_column > timestamp,
+            and_(timestamp_column == timestamp, id_column > row_id),
+        )
+    return or_(
+        timestamp_column < timestamp,
+        and_(timestamp_column == timestamp, id_column < row_id),
+    )
+
+
+def split_page(rows: list, limit: int | None, timestamp_attr: str) -> tuple[list, str | None]:
+    """
+    Cut rows fetched with limit + 1 down to a page and build the cursor of the
+    next page, or None when this is the last page (or there is no limit).
+    """
+    if limit is None or len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(getattr(last, timestamp_attr), last.id)
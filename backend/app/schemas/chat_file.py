@@ -10,3 +10,12 @@ class ChatFileSchema(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class ChatFileSummarySchema(BaseModel):
+    id: int
+    file_name: str
+    uploaded_at: datetime
+
+    class Config:
+        from_attributes = True
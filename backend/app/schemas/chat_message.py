@@ -3,7 +3,7 @@ from typing import List
 
 from pydantic import BaseModel
 from app.models.chat_messages import RoleEnum
-from app.schemas.chat_file import ChatFileSchema
+from app.schemas.chat_file import ChatFileSchema, ChatFileSummarySchema
 
 
 class ChatMessageSchema(BaseModel):
@@ -17,3 +17,17 @@ class ChatMessageSchema(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class ChatMessageSummarySchema(BaseModel):
+    """Message without file contents, only the file names."""
+    id: int
+    thread_id: str
+    role: RoleEnum
+    content: str
+    created_at: datetime
+
+    files: List[ChatFileSummarySchema] = []
+
+    class Config:
+        from_attributes = True
@@ -1,12 +1,39 @@
-from pydantic import BaseModel
-from enum import StrEnum
+from typing import Literal, Optional
 
-
-class Algorithm(StrEnum):
-    evolution = "evol"
-    kruskals = "kruskals"
-    none = "none"
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class ConfigRequest(BaseModel):
-    algorithm: Algorithm
+    algorithm: str
+
+
+class AlgorithmSettings(BaseModel):
+    """
+    Request settings of a shrinking algorithm, validated and translated to its
+    initialize() parameters. Unknown keys (e.g. the budget) are ignored and
+    unset fields fall back to the algorithm's config file.
+    """
+    model_config = ConfigDict(extra="ignore", populate_by_name=True)
+
+
+class KruskalSettings(AlgorithmSettings):
+    pass
+
+
+class GeneticSettings(AlgorithmSettings):
+    population_size: Optional[int] = Field(None, alias="population", ge=1)
+    generations: Optional[int] = Field(None, alias="iterations", ge=1)
+    islands: Optional[int] = Field(None, ge=1)
+    migration_interval: Optional[int] = Field(None, ge=1)
+    seed: Optional[int] = Field(None, ge=0, lt=2**32)
+
+
+class GreedySettings(AlgorithmSettings):
+    target_ratio: Optional[float] = Field(None, gt=0, le=1)
+
+
+class CommunitySettings(AlgorithmSettings):
+    method: Optional[Literal["label_propagation", "louvain"]] = None
+    target_ratio: Optional[float] = Field(None, gt=0, le=1)
+    resolution: Optional[float] = Field(None, gt=0)
+    seed: Optional[int] = Field(None, ge=0, lt=2**32)
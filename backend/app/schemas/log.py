@@ -0,0 +1,8 @@
+from typing import Any
+from pydantic import BaseModel
+
+
+class LogRecordSchema(BaseModel):
+    level: str = "info"
+    message: str = ""
+    extra: list[Any] = []
@@ -0,0 +1,672 @@
+from datetime import datetime
+
+from app.services.openai_service import AsyncOpenAIService
+
+from app.models.chat_threads import ChatThread
+from app.models.chat_messages import ChatMessage
+from app.models.chat_files import ChatFiles
+
+from app.repository.chat_threads_repository import AsyncChatThreadRepository
+from app.repository.chat_messages_repository import AsyncChatMessageRepository
+from app.repository.chat_files_repository import AsyncChatFilesRepository
+
+from app.services.chat_common import (
+    PendingPrompt,
+    build_ai_messages,
+    check_file_attached,
+    check_order,
+    check_thread_access,
+    last_file_changes,
+    last_message_changes,
+    new_file_fields,
+    new_message_fields,
+    new_thread_fields,
+    prompt_file_fields,
+    prompt_message_fields,
+    rename_changes,
+)
+
+
+class AsyncChatService:
+    """
+    Async counterpart of ChatService, used by the async chat endpoints.
+    """
+
+    def __init__(self, db_session):
+        self.db_session = db_session
+
+    async def retrieve_threads(self, user_id: int, order: str = "ASC") -> list[ChatThread]:
+        """
+        Retrieve chat threads for a user.
+
+        Parameters:
+        -----------
+        user_id: int
+            User ID.
+        order: str
+            Order by time {ASC or DESC}.
+
+        Returns:
+        --------
+        list[ChatThread]
+            Ordered list of ChatThread objects.
+        """
+
+        check_order(order)
+
+        repo = AsyncChatThreadRepository(self.db_session)
+        return await repo.get_all_by_user_id(user_id, order)
+
+    async def retrieve_threads_page(
+        self,
+        user_id: int,
+        limit: int | None = None,
+        cursor: str | None = None,
+        order: str = "DESC",
+    ) -> tuple[list[ChatThread], str | None]:
+        """
+        Retrieve one page of chat threads for a user.
+
+        Parameters:
+        -----------
+        user_id: int
+            User ID.
+        limit: int | None
+            Page size, None for all threads.
+        cursor: str | None
+            Cursor of the page, None for the first page.
+        order: str
+            Order by time {ASC or DESC}.
+
+        Returns:
+        --------
+        tuple[list[ChatThread], str | None]
+            The page and the cursor of the next page (None on the last page).
+        """
+
+        check_order(order)
+
+        repo = AsyncChatThreadRepository(self.db_session)
+        return await repo.get_page_by_user_id(user_id, limit=limit, cursor=cursor, order=order)
+
+    async def create_thread(
+        self, user_id: int, title: str | None, commit: bool = False
+    ) -> ChatThread:
+        """
+        Create a new chat thread for a user.
+
+        Parameters:
+        -----------
+        user_id: int
+            User ID.
+        title: str | None
+            Title of the chat thread.
+
+        Returns:
+        --------
+        ChatThread
+            The created ChatThread object.
+        """
+
+        repo = AsyncChatThreadRepository(self.db_session)
+
+        model = await repo.create(**new_thread_fields(user_id=user_id, title=title))
+
+        if commit:
+            await self.db_session.commit()
+
+        return model
+
+    async def create_new_thread_with_prompt(
+        self,
+        user_id: int,
+        title: str | None,
+        prompt_message: str,
+        prompt_file: str | None = None,
+        prompt_file_name: str | None = None,
+    ) -> tuple[ChatThread, ChatMessage]:
+        """
+        Create a new chat thread for a user.
+
+        Parameters:
+        -----------
+        user_id: int
+            User ID.
+        title: str | None
+            Title of the chat thread.
+
+        Returns:
+        --------
+        ChatThread
+            The created ChatThread object.
+        """
+
+        # Create new thread together with the prompt in one short transaction
+        thread = await self.create_thread(user_id=user_id, title=title)
+
+        prompt = await self._record_prompt(
+            user_id=user_id,
+            thread_id=thread.id,
+            prompt_message=prompt_message,
+            prompt_file=prompt_file,
+            prompt_file_name=prompt_file_name,
+            discard_thread=True,
+        )
+
+        await self.db_session.commit()
+
+        # Answer outside of the transaction, the new thread is dropped on failure
+        output_message = await self._answer_prompt(user_id=user_id, prompt=prompt)
+
+        return thread, output_message
+
+    async def delete_thread(self, user_id: int, thread_id: str, commit: bool = False) -> None:
+        """
+        Delete a chat thread for a user.
+
+        Parameters:
+        -----------
+        user_id: int
+            User ID.
+        thread_id: str
+            Thread ID.
+        """
+
+        repo = AsyncChatThreadRepository(self.db_session)
+        model = await repo.get_by_id(thread_id)
+
+        check_thread_access(model, user_id, "delete this thread")
+
+        result = await repo.delete(thread_id)
+
+        if not result:
+            raise RuntimeError("Failed to delete thread.")
+
+        if commit:
+            await self.db_session.commit()
+
+    async def update_last_message_in_thread(
+        self, user_id: int, thread_id: str, timestamp: datetime, commit: bool = False
+    ) -> ChatThread:
+        """
+        Update the last message timestamp in a chat thread.
+
+        Parameters:
+        -----------
+        user_id: int
+            User ID.
+        thread_id: str
+            Thread ID.
+
+        Returns:
+        --------
+        ChatThread
+            The updated ChatThread object.
+        """
+
+        repo = AsyncChatThreadRepository(self.db_session)
+        thread = await repo.get_by_id(thread_id)
+
+        check_thread_access(thread, user_id, "update this thread")
+
+        updated_model = await repo.update(
+            thread_id=thread_id, **last_message_changes(thread, timestamp)
+        )
+
+        if not updated_model:
+            raise RuntimeError("Failed to update thread.")
+
+        if commit:
+            await self.db_session.commit()
+
+        return updated_model
+
+    async def update_last_file_in_thread(
+        self, user_id: int, thread_id: str, file_id: int, commit: bool = False
+    ) -> ChatThread:
+        """
+        Update the last diagram file ID in a chat thread.
+
+        Parameters:
+        -----------
+        user_id: int
+            User ID.
+        thread_id: str
+            Thread ID.
+        file_id: int
+            File ID to set as last_diagram_file_id.
+
+        Returns:
+        --------
+        ChatThread
+            The updated ChatThread object.
+        """
+
+        repo = AsyncChatThreadRepository(self.db_session)
+        thread = await repo.get_by_id(thread_id)
+
+        check_thread_access(thread, user_id, "update this thread")
+
+        updated_model = await repo.update(
+            thread_id=thread_id, **last_file_changes(thread, file_id)
+        )
+
+        if not updated_model:
+            raise RuntimeError("Failed to update thread.")
+
+        if commit:
+            await self.db_session.commit()
+
+        return updated_model
+
+    async def rename_thread(
+        self, user_id: int, thread_id: str, title: str | None, commit: bool = False
+    ) -> ChatThread:
+        """
+        Update a chat thread's title.
+
+        Parameters:
+        -----------
+        user_id: int
+            User ID.
+        thread_id: str
+            Thread ID.
+        title: str | None
+            New title for the chat thread.
+
+        Returns:
+        --------
+        ChatThread
+            The updated ChatThread object.
+        """
+
+        repo = AsyncChatThreadRepository(self.db_session)
+        model = await repo.get_by_id(thread_id)
+
+        check_thread_access(model, user_id, "update this thread")
+
+        updated_model = await repo.update(
+            thread_id=thread_id, **rename_changes(model, title)
+        )
+
+        if not updated_model:
+            raise RuntimeError("Failed to update thread.")
+
+        if commit:
+            await self.db_session.commit()
+
+        return updated_model
+
+    async def retrieve_messages(
+        self, user_id: int, thread_id: str, order: str = "ASC"
+    ) -> list[ChatMessage]:
+        """
+        Retrieve chat messages for a thread.
+
+        Parameters:
+        -----------
+        user_id: int
+            User ID.
+        thread_id: str
+            Thread ID.
+        order: str
+            Order by time {ASC or DESC}.
+
+        Returns:
+        --------
+        list[ChatMessage]
+            List of ChatMessage objects.
+        """
+
+        repo = AsyncChatThreadRepository(self.db_session)
+
+        thread = await repo.get_by_id(thread_id)
+
+        check_thread_access(thread, user_id)
+
+        repo = AsyncChatMessageRepository(self.db_session)
+
+        check_order(order)
+
+        return await repo.get_by_thread_id(thread_id, order)
+
+    async def retrieve_messages_page(
+        self,
+        user_id: int,
+        thread_id: str,
+        limit: int | None = None,
+        cursor: str | None = None,
+        order: str = "ASC",
+        include_files: bool = False,
+    ) -> tuple[list[ChatMessage], str | None]:
+        """
+        Retrieve one page of chat messages for a thread.
+
+        Parameters:
+        -----------
+        user_id: int
+            User ID.
+        thread_id: str
+            Thread ID.
+        limit: int | None
+            Page size, None for all messages.
+        cursor: str | None
+            Cursor of the page, None for the first page.
+        order: str
+            Order by time {ASC or DESC}.
+        include_files: bool
+            Load the file contents of the messages' files.
+
+        Returns:
+        --------
+        tuple[list[ChatMessage], str | None]
+            The page and the cursor of the next page (None on the last page).
+        """
+
+        repo = AsyncChatThreadRepository(self.db_session)
+
+        thread = await repo.get_by_id(thread_id)
+
+        check_thread_access(thread, user_id)
+
+        check_order(order)
+
+        repo = AsyncChatMessageRepository(self.db_session)
+        return await repo.get_page_by_thread_id(
+            thread_id,
+            limit=limit,
+            cursor=cursor,
+            order=order,
+            include_content=include_files,
+        )
+
+    async def record_message(
+        self,
+        user_id: int,
+        thread_id: str,
+        role: str,
+        content: str,
+        commit: bool = False,
+    ) -> ChatMessage:
+        """
+        Record a new chat message in a thread.
+
+        Parameters:
+        -----------
+        user_id: int
+            User ID.
+        thread_id: str
+            Thread ID.
+        role: str
+            Role of the message sender.
+        content: str
+            Content of the message.
+
+        Returns:
+        --------
+        ChatMessage
+            The created ChatMessage object.
+        """
+
+        thread_repo = AsyncChatThreadRepository(self.db_session)
+
+        thread = await thread_repo.get_by_id(thread_id)
+
+        check_thread_access(thread, user_id)
+
+        message_repo = AsyncChatMessageRepository(self.db_session)
+
+        model = await message_repo.create(
+            **new_message_fields(thread_id=thread_id, role=role, content=content)
+        )
+
+        if commit:
+            await self.db_session.commit()
+
+        return model
+
+    async def record_file(
+        self,
+        user_id: int,
+        message_id: int,
+        file_content: str,
+        file_name: str | None,
+        commit: bool = False,
+    ) -> ChatFiles:
+        """
+        Record a new chat file associated with a message.
+
+        Parameters:
+        -----------
+        user_id: int
+            User ID.
+        message_id: int
+            Message ID.
+        file_content: str
+            Content of the file.
+        file_name: str
+            Name of the file.
+
+        Returns:
+        --------
+        ChatFiles
+            The created ChatFiles object.
+
+        Warnings:
+        --------
+        This method does not update the last_diagram_file_id in the associated thread.
+        """
+
+        message_repo = AsyncChatMessageRepository(self.db_session)
+        message = await message_repo.get_by_id(message_id)
+
+        if not message:
+            raise ValueError("Message not found.")
+
+        thread_repo = AsyncChatThreadRepository(self.db_session)
+        thread = await thread_repo.get_by_id(message.thread_id)
+
+        check_thread_access(thread, user_id, "access this message's thread")
+
+        file_repo = AsyncChatFilesRepository(self.db_session)
+
+        file = await file_repo.create(
+            **new_file_fields(
+                message_id=message_id, file_name=file_name, file_content=file_content
+            )
+        )
+
+        if commit:
+            await self.db_session.commit()
+
+        return file
+
+    async def prompt_message(
+        self,
+        user_id: int,
+        thread_id: str,
+        prompt_message: str,
+        prompt_file: str | None = None,
+        prompt_file_name: str | None = None,
+    ) -> ChatMessage:
+        """
+        Send a prompt message to AI and get the response.
+
+        Parameters:
+        -----------
+        user_id: int
+            User ID.
+        thread_id: str
+            Thread ID.
+        prompt_message: str
+            Content of the prompt message.
+        prompt_file: str | None
+            Content of the prompt file.
+        prompt_file_name: str | None
+            Name of the prompt file.
+
+        Returns:
+        --------
+        str
+            AI generated response.
+        """
+
+        prompt = await self._record_prompt(
+            user_id=user_id,
+            thread_id=thread_id,
+            prompt_message=prompt_message,
+            prompt_file=prompt_file,
+            prompt_file_name=prompt_file_name,
+        )
+
+        await self.db_session.commit()
+
+        # Answer outside of the transaction, the prompt is dropped on failure
+        return await self._answer_prompt(user_id=user_id, prompt=prompt)
+
+    async def _record_prompt(
+        self,
+        user_id: int,
+        thread_id: str,
+        prompt_message: str,
+        prompt_file: str | None = None,
+        prompt_file_name: str | None = None,
+        discard_thread: bool = False,
+    ) -> PendingPrompt:
+        """
+        Record a user prompt and its optional file without committing.
+
+        Returns:
+        --------
+        PendingPrompt
+            The recorded prompt, to be answered once it is committed.
+        """
+
+        thread = await AsyncChatThreadRepository(self.db_session).get_by_id(thread_id)
+
+        check_thread_access(thread, user_id)
+
+        # Create initial prompt message in the thread
+        input_message = await AsyncChatMessageRepository(self.db_session).create(
+            **prompt_message_fields(thread_id=thread_id, content=prompt_message)
+        )
+
+        file_fields = prompt_file_fields(
+            message_id=input_message.id,
+            file_content=prompt_file,
+            file_name=prompt_file_name,
+        )
+
+        if file_fields is None:
+            return PendingPrompt(
+                thread_id=thread_id,
+                message_id=input_message.id,
+                discard_thread=discard_thread,
+            )
+
+        # Create file associated with the input message
+        file = await AsyncChatFilesRepository(self.db_session).create(**file_fields)
+
+        # Refresh the message to load the relationship with files
+        await self.db_session.refresh(input_message)
+
+        check_file_attached(input_message)
+
+        return PendingPrompt(
+            thread_id=thread_id,
+            message_id=input_message.id,
+            file_id=file.id,
+            discard_thread=discard_thread,
+        )
+
+    async def _answer_prompt(self, user_id: int, prompt: PendingPrompt) -> ChatMessage:
+        """
+        Get the AI response for an already committed prompt and record it.
+
+        The AI call runs outside of any transaction. The response is recorded
+        in a second short transaction together with the thread bookkeeping.
+        If either step fails, the prompt (or the whole thread when
+        it was created for the prompt) is removed again, so a retry starts clean.
+
+        Parameters:
+        -----------
+        user_id: int
+            User ID.
+        prompt: PendingPrompt
+            The committed prompt.
+
+        Returns:
+        --------
+        ChatMessage
+            The recorded AI response message.
+        """
+
+        try:
+            generated_message = await self.sent_to_ai(
+                user_id=user_id, thread_id=prompt.thread_id
+            )
+
+            # Record AI response message in the thread
+            output_message = await AsyncChatMessageRepository(self.db_session).create(
+                **prompt.answer_fields(generated_message)
+            )
+
+            thread_repo = AsyncChatThreadRepository(self.db_session)
+            thread = await thread_repo.get_by_id(prompt.thread_id)
+
+            check_thread_access(thread, user_id, "update this thread")
+
+            # Update last_message_at and last_diagram_file_id in the thread
+            updated_thread = await thread_repo.update(
+                thread_id=prompt.thread_id,
+                **prompt.answer_changes(thread, output_message.created_at),
+            )
+
+            if not updated_thread:
+                raise RuntimeError("Failed to update thread.")
+
+            await self.db_session.commit()
+        except Exception:
+            await self._discard_prompt(prompt)
+            raise
+
+        return output_message
+
+    async def _discard_prompt(self, prompt: PendingPrompt) -> None:
+        """
+        Remove a committed prompt message (and its files) after a failed answer.
+
+        Parameters:
+        -----------
+        prompt: PendingPrompt
+            The prompt whose answer failed.
+        """
+
+        await self.db_session.rollback()
+
+        await AsyncChatMessageRepository(self.db_session).delete(prompt.message_id)
+
+        if prompt.discarded_thread_id is not None:
+            await AsyncChatThreadRepository(self.db_session).delete(prompt.discarded_thread_id)
+
+        await self.db_session.commit()
+
+    async def sent_to_ai(self, user_id: int, thread_id: str) -> str:
+        thread_repo = AsyncChatThreadRepository(self.db_session)
+        thread = await thread_repo.get_by_id(thread_id)
+
+        check_thread_access(thread, user_id)
+
+        message_repo = AsyncChatMessageRepository(self.db_session)
+        messages = await message_repo.get_by_thread_id(thread_id=thread_id, order="ASC")
+
+        # Prepend the messages from the repository with the system prompt exactly once
+        ai_messages = build_ai_messages(messages)
+
+        # Release the read transaction before the slow network call
+        await self.db_session.commit()
+
+        openai = AsyncOpenAIService()
+        ai_response = await openai.chat(ai_messages)
+
+        return ai_response
@@ -0,0 +1,236 @@
+"""
+Logic shared by ChatService and AsyncChatService that does no I/O:
+access checks, domain conversions, the rows of a prompt and its answer,
+and building the AI conversation. The services only load and store models
+around these helpers.
+"""
+from dataclasses import dataclass
+from datetime import datetime
+
+from app.models.chat_threads import ChatThread
+from app.models.chat_messages import ChatMessage, RoleEnum
+from app.models.chat_files import ChatFiles
+
+from app.domain.chat_thread import ChatThreadDomain
+from app.domain.chat_message import ChatMessageDomain
+from app.domain.chat_files import ChatFileDomain
+
+SYSTEM_PROMPT_RULES = """
+You are an AI agent that modifies and helps with PlantUML (PUML) diagrams.
+
+When responding to a request that modifies a PUML file:
+- You MUST return the complete, updated PUML document.
+- The response MUST contain exactly one PUML block.
+- The PUML block MUST start with "@startuml" and end with "@enduml".
+- Do NOT split the PUML into multiple parts.
+- Describe any modifications you make underneath the PUML block.
+- If you have NOT made any changes, then you should not return the PUML document.
+"""
+
+
+def check_order(order: str) -> None:
+    if order not in ("ASC", "DESC"):
+        raise ValueError("Order must be either 'ASC' or 'DESC'.")
+
+
+def check_thread_access(
+    thread: ChatThread | None, user_id: int, action: str = "access this thread"
+) -> None:
+    """
+    Raise ValueError if the thread does not exist and PermissionError if it
+    belongs to another user. `action` completes the permission message.
+    """
+
+    if not thread:
+        raise ValueError("Thread not found.")
+    if thread.user_id != user_id:
+        raise PermissionError(f"User does not have permission to {action}.")
+
+
+def _to_chat_thread_domain(chat_thread: ChatThread) -> ChatThreadDomain:
+    return ChatThreadDomain(
+        user_id=chat_thread.user_id,
+        title=chat_thread.title,
+        created_at=chat_thread.created_at,
+        updated_at=chat_thread.updated_at,
+        last_message_at=chat_thread.last_message_at,
+        last_diagram_file_id=chat_thread.last_diagram_file_id,
+    )
+
+
+def _to_chat_message_domain(chat_message: ChatMessage) -> ChatMessageDomain:
+    return ChatMessageDomain(
+        thread_id=chat_message.thread_id,
+        role=chat_message.role,
+        content=chat_message.content,
+        created_at=chat_message.created_at,
+    )
+
+
+def _to_chat_file_domain(chat_file: ChatFiles) -> ChatFileDomain:
+    return ChatFileDomain(
+        message_id=chat_file.message_id,
+        file_name=chat_file.file_name,
+        file_content=chat_file.file_content,
+        uploaded_at=chat_file.uploaded_at,
+    )
+
+
+def new_thread_fields(user_id: int, title: str | None) -> dict:
+    """Validated repository create() arguments of a new thread."""
+
+    domain_thread = ChatThreadDomain.create(user_id=user_id, title=title)
+    return {"user_id": domain_thread.user_id, "title": domain_thread.title}
+
+
+def new_message_fields(thread_id: str, role: str, content: str) -> dict:
+    """Validated repository create() arguments of a new message."""
+
+    domain_message = ChatMessageDomain.create(
+        thread_id=thread_id, role=role, content=content
+    )
+    return {
+        "thread_id": domain_message.thread_id,
+        "role": domain_message.role,
+        "content": domain_message.content,
+    }
+
+
+def new_file_fields(message_id: int, file_name: str | None, file_content: str) -> dict:
+    """Validated repository create() arguments of a new file."""
+
+    domain_file = ChatFileDomain.create(
+        message_id=message_id, file_name=file_name, file_content=file_content
+    )
+    return {
+        "message_id": domain_file.message_id,
+        "file_name": domain_file.file_name,
+        "file_content": domain_file.file_content,
+    }
+
+
+def prompt_message_fields(thread_id: str, content: str) -> dict:
+    """Repository create() arguments of the user's prompt message."""
+
+    return new_message_fields(
+        thread_id=thread_id, role=RoleEnum.user.value, content=content
+    )
+
+
+def prompt_file_fields(
+    message_id: int, file_content: str | None, file_name: str | None
+) -> dict | None:
+    """Repository create() arguments of the prompt's file, None without a file."""
+
+    if not file_content:
+        return None
+    return new_file_fields(
+        message_id=message_id, file_name=file_name, file_content=file_content
+    )
+
+
+def check_file_attached(message: ChatMessage) -> None:
+    if not message.files:
+        raise RuntimeError("File was not properly attached to message")
+
+
+def last_message_changes(thread: ChatThread, timestamp: datetime) -> dict:
+    """Repository update() arguments for a new last message in the thread."""
+
+    domain_thread = _to_chat_thread_domain(thread)
+
+    domain_thread.change_last_message_at(timestamp)
+    domain_thread.change_updated_at(timestamp)
+
+    return {
+        "last_message_at": domain_thread.last_message_at,
+        "updated_at": domain_thread.updated_at,
+    }
+
+
+def last_file_changes(thread: ChatThread, file_id: int) -> dict:
+    """Repository update() arguments for a new last diagram file in the thread."""
+
+    domain_thread = _to_chat_thread_domain(thread)
+
+    domain_thread.change_last_diagram_file_id(file_id)
+
+    return {"last_diagram_file_id": domain_thread.last_diagram_file_id}
+
+
+def rename_changes(thread: ChatThread, title: str | None) -> dict:
+    """Repository update() arguments for renaming the thread."""
+
+    domain_thread = _to_chat_thread_domain(thread)
+
+    domain_thread.rename_title(title)
+
+    return {"title": domain_thread.title}
+
+
+@dataclass(frozen=True)
+class PendingPrompt:
+    """
+    A committed prompt waiting for its AI answer. It decides which rows the
+    answer creates and changes, and which ones are removed if it fails.
+    """
+
+    thread_id: str
+    message_id: int
+    file_id: int | None = None
+    # the thread was created for this prompt and is removed together with it
+    discard_thread: bool = False
+
+    def answer_fields(self, content: str) -> dict:
+        """Repository create() arguments of the AI response message."""
+
+        return new_message_fields(
+            thread_id=self.thread_id, role=RoleEnum.assistant.value, content=content
+        )
+
+    def answer_changes(self, thread: ChatThread, timestamp: datetime) -> dict:
+        """Repository update() arguments of the thread once the answer is recorded."""
+
+        changes = last_message_changes(thread, timestamp)
+        if self.file_id is not None:
+            changes.update(last_file_changes(thread, self.file_id))
+        return changes
+
+    @property
+    def discarded_thread_id(self) -> str | None:
+        """Thread to delete along with the prompt message after a failed answer."""
+
+        return self.thread_id if self.discard_thread else None
+
+
+def _to_ai_message_list(messages: list[ChatMessage]) -> list[dict]:
+    ai_messages = []
+
+    for msg in messages:
+
+        full_content = msg.content
+
+        if msg.files:
+            for f in msg.files:
+                full_content += (
+                    f"\n\n--- FILE: {f.file_name} ---\n"
+                    f"{f.file_content}\n"
+                    f"--- END FILE ---"
+                )
+
+        ai_messages.append(
+            {
+                "role": msg.role.value if hasattr(msg.role, "value") else msg.role,
+                "content": full_content,
+            }
+        )
+
+    return ai_messages
+
+
+def build_ai_messages(messages: list[ChatMessage]) -> list[dict]:
+    """The thread's messages for the AI, preceded by the system prompt exactly once."""
+
+    return [{"role": "system", "content": SYSTEM_PROMPT_RULES}] + _to_ai_message_list(
+        messages
+    )
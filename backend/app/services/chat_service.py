@@ -3,70 +3,28 @@ from datetime import datetime
 from app.services.openai_service import OpenAIService
 
 from app.models.chat_threads import ChatThread
-from app.models.chat_messages import ChatMessage, RoleEnum
+from app.models.chat_messages import ChatMessage
 from app.models.chat_files import ChatFiles
 
 from app.repository.chat_threads_repository import ChatThreadRepository
 from app.repository.chat_messages_repository import ChatMessageRepository
 from app.repository.chat_files_repository import ChatFilesRepository
 
-from app.domain.chat_thread import ChatThreadDomain
-from app.domain.chat_message import ChatMessageDomain
-from app.domain.chat_files import ChatFileDomain
-
-
-def _to_chat_thread_domain(chat_thread: ChatThread) -> ChatThreadDomain:
-    return ChatThreadDomain(
-        user_id=chat_thread.user_id,
-        title=chat_thread.title,
-        created_at=chat_thread.created_at,
-        updated_at=chat_thread.updated_at,
-        last_message_at=chat_thread.last_message_at,
-        last_diagram_file_id=chat_thread.last_diagram_file_id,
-    )
-
-
-def _to_chat_message_domain(chat_message: ChatMessage) -> ChatMessageDomain:
-    return ChatMessageDomain(
-        thread_id=chat_message.thread_id,
-        role=chat_message.role,
-        content=chat_message.content,
-        created_at=chat_message.created_at,
-    )
-
-
-def _to_chat_file_domain(chat_file: ChatFiles) -> ChatFileDomain:
-    return ChatFileDomain(
-        message_id=chat_file.message_id,
-        file_name=chat_file.file_name,
-        file_content=chat_file.file_content,
-        uploaded_at=chat_file.uploaded_at,
-    )
-
-
-def _to_ai_message_list(messages: list[ChatMessage]) -> list[dict]:
-    ai_messages = []
-
-    for msg in messages:
-
-        full_content = msg.content
-
-        if msg.files:
-            for f in msg.files:
-                full_content += (
-                    f"\n\n--- FILE: {f.file_name} ---\n"
-                    f"{f.file_content}\n"
-                    f"--- END FILE ---"
-                )
-
-        ai_messages.append(
-            {
-                "role": msg.role.value if hasattr(msg.role, "value") else msg.role,
-                "content": full_content,
-            }
-        )
-
-    return ai_messages
+from app.services.chat_common import (
+    PendingPrompt,
+    build_ai_messages,
+    check_file_attached,
+    check_order,
+    check_thread_access,
+    last_file_changes,
+    last_message_changes,
+    new_file_fields,
+    new_message_fields,
+    new_thread_fields,
+    prompt_file_fields,
+    prompt_message_fields,
+    rename_changes,
+)
 
 
 class ChatService:
@@ -90,8 +48,7 @@ class ChatService:
             Ordered list of ChatThread objects.
         """
 
-        if order not in ("ASC", "DESC"):
-            raise ValueError("Order must be either 'ASC' or 'DESC'.")
+        check_order(order)
 
         repo = ChatThreadRepository(self.db_session)
         return repo.get_all_by_user_id(user_id, order)
@@ -117,9 +74,7 @@ class ChatService:
 
         repo = ChatThreadRepository(self.db_session)
 
-        domain_thread = ChatThreadDomain.create(user_id=user_id, title=title)
-
-        model = repo.create(user_id=domain_thread.user_id, title=domain_thread.title)
+        model = repo.create(**new_thread_fields(user_id=user_id, title=title))
 
         if commit:
             self.db_session.commit()
@@ -163,60 +118,23 @@ class ChatService:
         # )
         # return model
 
-        # Create new thread
+        # Create new thread together with the prompt in one short transaction
         thread = self.create_thread(user_id=user_id, title=title)
 
-        # Create initial prompt message in the thread
-        input_message = self.record_message(
+        prompt = self._record_prompt(
             user_id=user_id,
             thread_id=thread.id,
-            role=RoleEnum.user.value,
-            content=prompt_message,
-        )
-
-        # if there is a prompt file, create it
-        if prompt_file:
-            # Create file associated with the input message
-            file = self.record_file(
-                user_id=user_id,
-                message_id=input_message.id,
-                file_content=prompt_file,
-                file_name=prompt_file_name,
-            )
-
-            # Update the last_diagram_file_id in the thread
-            self.update_last_file_in_thread(
-                user_id=user_id, thread_id=thread.id, file_id=file.id
-            )
-
-            # Flush to persist file to database
-            self.db_session.flush()
-
-            # Refresh the message to load the relationship with files
-            self.db_session.refresh(input_message)
-
-            # Verify file is attached
-            if not input_message.files or len(input_message.files) == 0:
-                raise RuntimeError("File was not properly attached to message")
-
-        # Send to AI and get response
-        generated_message = self.sent_to_ai(user_id=user_id, thread_id=thread.id)
-
-        # Record AI response message in the thread
-        output_message = self.record_message(
-            user_id=user_id,
-            thread_id=thread.id,
-            role=RoleEnum.assistant.value,
-            content=generated_message,
-        )
-
-        # Update the last_message_at in the thread
-        self.update_last_message_in_thread(
-            user_id=user_id, thread_id=thread.id, timestamp=output_message.created_at
+            prompt_message=prompt_message,
+            prompt_file=prompt_file,
+            prompt_file_name=prompt_file_name,
+            discard_thread=True,
         )
 
         self.db_session.commit()
 
+        # Answer outside of the transaction, the new thread is dropped on failure
+        output_message = self._answer_prompt(user_id=user_id, prompt=prompt)
+
         return thread, output_message
 
     def delete_thread(self, user_id: int, thread_id: str, commit: bool = False) -> None:
@@ -234,12 +152,7 @@ class ChatService:
         repo = ChatThreadRepository(self.db_session)
         model = repo.get_by_id(thread_id)
 
-        if not model:
-            raise ValueError("Thread not found.")
-        if model.user_id != user_id:
-            raise PermissionError(
-                "User does not have permission to delete this thread."
-            )
+        check_thread_access(model, user_id, "delete this thread")
 
         result = repo.delete(thread_id)
 
@@ -271,22 +184,10 @@ class ChatService:
         repo = ChatThreadRepository(self.db_session)
         thread = repo.get_by_id(thread_id)
 
-        if not thread:
-            raise ValueError("Thread not found.")
-        if thread.user_id != user_id:
-            raise PermissionError(
-                "User does not have permission to update this thread."
-            )
-
-        domain_thread = _to_chat_thread_domain(thread)
-
-        domain_thread.change_last_message_at(timestamp)
-        domain_thread.change_updated_at(timestamp)
+        check_thread_access(thread, user_id, "update this thread")
 
         updated_model = repo.update(
-            thread_id=thread_id,
-            last_message_at=domain_thread.last_message_at,
-            updated_at=domain_thread.updated_at,
+            thread_id=thread_id, **last_message_changes(thread, timestamp)
         )
 
         if not updated_model:
@@ -321,19 +222,10 @@ class ChatService:
         repo = ChatThreadRepository(self.db_session)
         thread = repo.get_by_id(thread_id)
 
-        if not thread:
-            raise ValueError("Thread not found.")
-        if thread.user_id != user_id:
-            raise PermissionError(
-                "User does not have permission to update this thread."
-            )
-
-        domain_thread = _to_chat_thread_domain(thread)
-
-        domain_thread.change_last_diagram_file_id(file_id)
+        check_thread_access(thread, user_id, "update this thread")
 
         updated_model = repo.update(
-            thread_id=thread_id, last_diagram_file_id=domain_thread.last_diagram_file_id
+            thread_id=thread_id, **last_file_changes(thread, file_id)
         )
 
         if not updated_model:
@@ -368,18 +260,11 @@ class ChatService:
         repo = ChatThreadRepository(self.db_session)
         model = repo.get_by_id(thread_id)
 
-        if not model:
-            raise ValueError("Thread not found.")
-        if model.user_id != user_id:
-            raise PermissionError(
-                "User does not have permission to update this thread."
-            )
-
-        domain_thread = _to_chat_thread_domain(model)
-
-        domain_thread.rename_title(title)
+        check_thread_access(model, user_id, "update this thread")
 
-        updated_model = repo.update(thread_id=thread_id, title=domain_thread.title)
+        updated_model = repo.update(
+            thread_id=thread_id, **rename_changes(model, title)
+        )
 
         if not updated_model:
             raise RuntimeError("Failed to update thread.")
@@ -414,17 +299,11 @@ class ChatService:
 
         thread = repo.get_by_id(thread_id)
 
-        if not thread:
-            raise ValueError("Thread not found.")
-        if thread.user_id != user_id:
-            raise PermissionError(
-                "User does not have permission to access this thread."
-            )
+        check_thread_access(thread, user_id)
 
         repo = ChatMessageRepository(self.db_session)
 
-        if order not in ("ASC", "DESC"):
-            raise ValueError("Order must be either 'ASC' or 'DESC'.")
+        check_order(order)
 
         return repo.get_by_thread_id(thread_id, order)
 
@@ -460,23 +339,12 @@ class ChatService:
 
         thread = thread_repo.get_by_id(thread_id)
 
-        if not thread:
-            raise ValueError("Thread not found.")
-        if thread.user_id != user_id:
-            raise PermissionError(
-                "User does not have permission to access this thread."
-            )
+        check_thread_access(thread, user_id)
 
         message_repo = ChatMessageRepository(self.db_session)
 
-        domain_message = ChatMessageDomain.create(
-            thread_id=thread_id, role=role, content=content
-        )
-
         model = message_repo.create(
-            thread_id=domain_message.thread_id,
-            role=domain_message.role,
-            content=domain_message.content,
+            **new_message_fields(thread_id=thread_id, role=role, content=content)
         )
 
         if commit:
@@ -525,23 +393,14 @@ class ChatService:
         thread_repo = ChatThreadRepository(self.db_session)
         thread = thread_repo.get_by_id(message.thread_id)
 
-        if not thread:
-            raise ValueError("Thread not found.")
-        if thread.user_id != user_id:
-            raise PermissionError(
-                "User does not have permission to access this message's thread."
-            )
+        check_thread_access(thread, user_id, "access this message's thread")
 
         file_repo = ChatFilesRepository(self.db_session)
 
-        domain_file = ChatFileDomain.create(
-            message_id=message_id, file_name=file_name, file_content=file_content
-        )
-
         file = file_repo.create(
-            message_id=domain_file.message_id,
-            file_name=domain_file.file_name,
-            file_content=domain_file.file_content,
+            **new_file_fields(
+                message_id=message_id, file_name=file_name, file_content=file_content
+            )
         )
 
         if commit:
@@ -579,88 +438,160 @@ class ChatService:
             AI generated response.
         """
 
-        # Create initial prompt message in the thread
-        input_message = self.record_message(
+        prompt = self._record_prompt(
             user_id=user_id,
             thread_id=thread_id,
-            role=RoleEnum.user.value,
-            content=prompt_message,
+            prompt_message=prompt_message,
+            prompt_file=prompt_file,
+            prompt_file_name=prompt_file_name,
         )
 
-        # if there is a prompt file, create it
-        if prompt_file:
-            # Create file associated with the input message
-            file = self.record_file(
-                user_id=user_id,
-                message_id=input_message.id,
-                file_content=prompt_file,
-                file_name=prompt_file_name,
-            )
+        self.db_session.commit()
 
-            # Update the last_diagram_file_id in the thread
-            self.update_last_file_in_thread(
-                user_id=user_id, thread_id=thread_id, file_id=file.id
-            )
+        # Answer outside of the transaction, the prompt is dropped on failure
+        return self._answer_prompt(user_id=user_id, prompt=prompt)
+
+    def _record_prompt(
+        self,
+        user_id: int,
+        thread_id: str,
+        prompt_message: str,
+        prompt_file: str | None = None,
+        prompt_file_name: str | None = None,
+        discard_thread: bool = False,
+    ) -> PendingPrompt:
+        """
+        Record a user prompt and its optional file without committing.
 
-            # Flush to persist file to database
-            self.db_session.flush()
+        Returns:
+        --------
+        PendingPrompt
+            The recorded prompt, to be answered once it is committed.
+        """
 
-            # Refresh the message to load the relationship with files
-            self.db_session.refresh(input_message)
+        thread = ChatThreadRepository(self.db_session).get_by_id(thread_id)
 
-            # Verify file is attached
-            if not input_message.files or len(input_message.files) == 0:
-                raise RuntimeError("File was not properly attached to message")
+        check_thread_access(thread, user_id)
 
-        # Send to AI and get response
-        generated_message = self.sent_to_ai(user_id=user_id, thread_id=thread_id)
+        # Create initial prompt message in the thread
+        input_message = ChatMessageRepository(self.db_session).create(
+            **prompt_message_fields(thread_id=thread_id, content=prompt_message)
+        )
 
-        # Record AI response message in the thread
-        output_message = self.record_message(
-            user_id=user_id,
-            thread_id=thread_id,
-            role=RoleEnum.assistant.value,
-            content=generated_message,
+        file_fields = prompt_file_fields(
+            message_id=input_message.id,
+            file_content=prompt_file,
+            file_name=prompt_file_name,
         )
 
-        # Update the last_message_at in the thread
-        self.update_last_message_in_thread(
-            user_id=user_id, thread_id=thread_id, timestamp=output_message.created_at
+        if file_fields is None:
+            return PendingPrompt(
+                thread_id=thread_id,
+                message_id=input_message.id,
+                discard_thread=discard_thread,
+            )
+
+        # Create file associated with the input message
+        file = ChatFilesRepository(self.db_session).create(**file_fields)
+
+        # Refresh the message to load the relationship with files
+        self.db_session.refresh(input_message)
+
+        check_file_attached(input_message)
+
+        return PendingPrompt(
+            thread_id=thread_id,
+            message_id=input_message.id,
+            file_id=file.id,
+            discard_thread=discard_thread,
         )
 
-        self.db_session.commit()
+    def _answer_prompt(self, user_id: int, prompt: PendingPrompt) -> ChatMessage:
+        """
+        Get the AI response for an already committed prompt and record it.
+
+        The AI call runs outside of any transaction. The response is recorded
+        in a second short transaction together with the thread bookkeeping.
+        If either step fails, the prompt (or the whole thread when
+        it was created for the prompt) is removed again, so a retry starts clean.
+
+        Parameters:
+        -----------
+        user_id: int
+            User ID.
+        prompt: PendingPrompt
+            The committed prompt.
+
+        Returns:
+        --------
+        ChatMessage
+            The recorded AI response message.
+        """
+
+        try:
+            generated_message = self.sent_to_ai(
+                user_id=user_id, thread_id=prompt.thread_id
+            )
+
+            # Record AI response message in the thread
+            output_message = ChatMessageRepository(self.db_session).create(
+                **prompt.answer_fields(generated_message)
+            )
+
+            thread_repo = ChatThreadRepository(self.db_session)
+            thread = thread_repo.get_by_id(prompt.thread_id)
+
+            check_thread_access(thread, user_id, "update this thread")
+
+            # Update last_message_at and last_diagram_file_id in the thread
+            updated_thread = thread_repo.update(
+                thread_id=prompt.thread_id,
+                **prompt.answer_changes(thread, output_message.created_at),
+            )
+
+            if not updated_thread:
+                raise RuntimeError("Failed to update thread.")
+
+            self.db_session.commit()
+        except Exception:
+            self._discard_prompt(prompt)
+            raise
 
         return output_message
 
+    def _discard_prompt(self, prompt: PendingPrompt) -> None:
+        """
+        Remove a committed prompt message (and its files) after a failed answer.
+
+        Parameters:
+        -----------
+        prompt: PendingPrompt
+            The prompt whose answer failed.
+        """
+
+        self.db_session.rollback()
+
+        ChatMessageRepository(self.db_session).delete(prompt.message_id)
+
+        if prompt.discarded_thread_id is not None:
+            ChatThreadRepository(self.db_session).delete(prompt.discarded_thread_id)
+
+        self.db_session.commit()
+
     def sent_to_ai(self, user_id: int, thread_id: str) -> str:
         thread_repo = ChatThreadRepository(self.db_session)
         thread = thread_repo.get_by_id(thread_id)
 
-        # Prepend the messages from the repository with the system prompt exactly once
-        SYSTEM_PROMPT_RULES = """
-        You are an AI agent that modifies and helps with PlantUML (PUML) diagrams.
-
-        When responding to a request that modifies a PUML file:
-        - You MUST return the complete, updated PUML document.
-        - The response MUST contain exactly one PUML block.
-        - The PUML block MUST start with "@startuml" and end with "@enduml".
-        - Do NOT split the PUML into multiple parts.
-        - Describe any modifications you make underneath the PUML block.
-        - If you have NOT made any changes, then you should not return the PUML document.
-        """
-
-        if not thread:
-            raise ValueError("Thread not found.")
-        if thread.user_id != user_id:
-            raise PermissionError(
-                "User does not have permission to access this thread."
-            )
+        check_thread_access(thread, user_id)
 
         message_repo = ChatMessageRepository(self.db_session)
         messages = message_repo.get_by_thread_id(thread_id=thread_id, order="ASC")
 
-        ai_messages = _to_ai_message_list(messages)
-        ai_messages = [{"role": "system", "content": SYSTEM_PROMPT_RULES}] + ai_messages
+        # Prepend the messages from the repository with the system prompt exactly once
+        ai_messages = build_ai_messages(messages)
+
+        # Release the read transaction before the slow network call
+        self.db_session.commit()
 
         openai = OpenAIService()
         ai_response = openai.chat(ai_messages)
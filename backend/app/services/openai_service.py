@@ -1,4 +1,4 @@
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
 
 from app.config import settings
 
@@ -13,3 +13,15 @@ class OpenAIService:
             messages=messages
         )
         return response.choices[0].message.content
+
+
+class AsyncOpenAIService:
+    def __init__(self):
+        self.client = AsyncOpenAI(api_key=settings.openai_api_key)
+
+    async def chat(self, messages: list[dict], model: str = "gpt-4o-mini") -> str:
+        response = await self.client.chat.completions.create(
+            model=model,
+            messages=messages
+        )
+        return response.choices[0].message.content
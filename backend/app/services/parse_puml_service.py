@@ -1,5 +1,8 @@
 import json
 import re
+from functools import lru_cache
+
+PARSER_CONFIG_PATH = "app/services/parser_config.json"
 
 class PUMLParser:
     def __init__(self, config_path="parser_config.json"):
@@ -279,3 +282,12 @@ class PUMLParser:
                 }
 
         return None
+
+
+@lru_cache(maxsize=None)
+def get_parser(config_path=PARSER_CONFIG_PATH) -> PUMLParser:
+    """
+    Shared parser per config file. The parser keeps no per-file state, so one
+    instance can serve every request without reloading its config.
+    """
+    return PUMLParser(config_path)
@@ -0,0 +1,53 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class TokenBucketRateLimiter:
+    """
+    In-process token bucket per client key. Each client may spend `burst`
+    tokens at once, refilled at `rate_per_second`. The number of tracked
+    clients is bounded, least recently seen clients are dropped first.
+    """
+
+    def __init__(self, rate_per_second: float, burst: float, max_clients: int = 10000):
+        self.rate_per_second = rate_per_second
+        self.burst = burst
+        self.max_clients = max_clients
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate_per_second > 0
+
+    def acquire(self, key: str, cost: float = 1) -> float:
+        """
+        Spend `cost` tokens for `key`.
+
+        Returns 0 if the request is allowed, otherwise the number of seconds
+        after which it would be.
+        """
+        if not self.enabled:
+            return 0.0
+
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated_at) * self.rate_per_second)
+
+            if cost > self.burst:
+                # can never fit, refuse without draining the bucket
+                retry_after = (cost - tokens) / self.rate_per_second
+            elif tokens >= cost:
+                tokens -= cost
+                retry_after = 0.0
+            else:
+                retry_after = (cost - tokens) / self.rate_per_second
+
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+
+        return retry_after
@@ -0,0 +1,74 @@
+import asyncio
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from app.db import SessionLocal
+from app.models.refresh_token import RefreshToken
+from app.util import logger
+
+
+def get_active_refresh_token(db: Session, token_hash: str) -> Optional[RefreshToken]:
+    """
+    Look up a non-revoked refresh token by its hash (unique index on token_hash).
+    """
+    return (
+        db.query(RefreshToken)
+        .filter(
+            RefreshToken.token_hash == token_hash,
+            RefreshToken.revoked == False,
+        )
+        .first()
+    )
+
+
+def revoke_refresh_token(db: Session, token_hash: str) -> bool:
+    """
+    Revoke a refresh token with a single UPDATE. Returns False if no active token matched.
+    """
+    updated = (
+        db.query(RefreshToken)
+        .filter(
+            RefreshToken.token_hash == token_hash,
+            RefreshToken.revoked == False,
+        )
+        .update({"revoked": True}, synchronize_session=False)
+    )
+    return updated > 0
+
+
+def purge_refresh_tokens(db: Session, now: datetime | None = None) -> int:
+    """
+    Delete expired and revoked refresh tokens. Returns the number of deleted rows.
+    """
+    now = now or datetime.utcnow()
+    deleted = (
+        db.query(RefreshToken)
+        .filter(or_(RefreshToken.expires_at < now, RefreshToken.revoked == True))
+        .delete(synchronize_session=False)
+    )
+    db.commit()
+    return deleted
+
+
+def _purge_with_new_session() -> int:
+    db = SessionLocal()
+    try:
+        return purge_refresh_tokens(db)
+    finally:
+        db.close()
+
+
+async def purge_refresh_tokens_periodically(interval_seconds: int) -> None:
+    """
+    Background loop purging refresh tokens every interval_seconds, until cancelled.
+    """
+    while True:
+        try:
+            deleted = await asyncio.to_thread(_purge_with_new_session)
+            logger.log("Purged %d expired or revoked refresh tokens", deleted, level="info")
+        except Exception as e:
+            logger.log("Refresh token purge failed: %s", e, level="error")
+        await asyncio.sleep(interval_seconds)
@@ -1,11 +1,54 @@
+import secrets
+import time
 from abc import ABC, abstractmethod
-from typing import Any, Dict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+
+@dataclass
+class Budget:
+    """
+    Limits for one compute() call, None means unlimited. Algorithms that
+    search iteratively stop when the budget is exhausted and return their
+    best solution so far.
+    """
+    max_seconds: Optional[float] = None
+    max_evaluations: Optional[int] = None
+    evaluations: int = 0
+    started_at: float = field(default_factory=time.monotonic)
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started_at
+
+    def remaining_seconds(self) -> Optional[float]:
+        if self.max_seconds is None:
+            return None
+        return max(0.0, self.max_seconds - self.elapsed())
+
+    def remaining_evaluations(self) -> Optional[int]:
+        if self.max_evaluations is None:
+            return None
+        return max(0, self.max_evaluations - self.evaluations)
+
+    def charge(self, evaluations: int = 1) -> None:
+        self.evaluations += evaluations
+
+    def allows(self, evaluations: int = 0) -> bool:
+        """Whether there is time left and room for `evaluations` more evaluations."""
+        if self.max_seconds is not None and self.elapsed() >= self.max_seconds:
+            return False
+        remaining = self.remaining_evaluations()
+        return remaining is None or evaluations <= remaining
+
 
 class ShrinkingAlgorithm(ABC):
     """
     Interface for all diagram-shrinking algorithms.
     """
 
+    # seed the last compute() ran with, None for deterministic algorithms
+    last_seed: Optional[int] = None
+
     def __init__(self, **params: Any) -> None:
         """
         Optional shared init – you can store hyperparameters here.
@@ -20,8 +63,30 @@ class ShrinkingAlgorithm(ABC):
         raise NotImplementedError
 
     @abstractmethod
-    def compute(self, parsed_puml: Dict[str, Any]) -> Dict[str, Any]:
+    def compute(
+        self,
+        parsed_puml: Dict[str, Any],
+        budget: Optional[Budget] = None,
+        seed: Optional[int] = None,
+    ) -> Dict[str, Any]:
         """
         Run the algorithm on parsed PUML data and return the reduced PUML data.
+
+        Iterative algorithms must honor `budget` and return their best-so-far
+        solution once it is exhausted. Without a budget they run to completion.
+        Randomized algorithms run with `seed` when given (see run_seed).
         """
         raise NotImplementedError
+
+    def reset(self) -> None:
+        """
+        Drop the state of the last compute() (diagram, graphs, embeddings...),
+        keeping the parameters. Called before a pooled instance goes idle.
+        """
+        self.last_seed = None
+
+    def run_seed(self, seed: Optional[int] = None) -> int:
+        """Seed of a run: `seed`, else the configured `self.seed`, else a random one."""
+        if seed is None:
+            seed = getattr(self, "seed", None)
+        return seed if seed is not None else secrets.randbits(32)
@@ -0,0 +1,176 @@
+import json
+import math
+import os
+from typing import Any, Dict, Optional
+
+import networkx as nx
+
+from app.services.shrinking_algorithms.base import Budget, ShrinkingAlgorithm
+from embedding.embedding import uml_dict_to_graph
+
+METHODS = ("label_propagation", "louvain")
+
+
+class CommunitySummaryAlgorithm(ShrinkingAlgorithm):
+    """
+    Community based diagram summarization.
+    Implements ShrinkingAlgorithm interface.
+
+    Classes are clustered with a near-linear community detection and every
+    community is summarized by its best connected classes. The reduced diagram
+    keeps `target_ratio` of the classes: one representative per community
+    first, then the endpoints of the strongest edge between each pair of
+    connected communities, then more members of each community in proportion
+    to its size. Edges between kept classes are kept.
+    """
+
+    def initialize(self, **params: Any) -> None:
+        """
+        Initialize the algorithm with parameters.
+
+        Supported parameters:
+        - config_path: path to JSON config file
+        - method: "label_propagation" (default) or "louvain"
+        - target_ratio: share of classes to keep, in (0, 1]
+        - resolution: Louvain resolution, higher values give smaller communities
+        - seed: Louvain seed, drawn per compute() when missing (see last_seed)
+        """
+        config_path = params.get("config_path", "community_config.json")
+        self.config = self.load_config(config_path)
+
+        self.method = params.get("method", self.config.get("method", "label_propagation"))
+        if self.method not in METHODS:
+            raise ValueError(f"Unknown community detection method: {self.method!r}")
+        self.target_ratio = params.get("target_ratio", self.config.get("target_ratio", 0.2))
+        if not 0 < self.target_ratio <= 1:
+            raise ValueError(f"target_ratio must be in (0, 1], got {self.target_ratio!r}")
+        self.resolution = params.get("resolution", self.config.get("resolution", 1.0))
+        self.seed = params.get("seed", self.config.get("seed"))
+        self.reset()
+
+    def reset(self) -> None:
+        super().reset()
+        self.PUML = None
+        self.communities = []
+
+    def load_config(self, config_path):
+        """Load configuration from JSON file."""
+        base_path = os.path.dirname(os.path.abspath(__file__))
+        full_path = os.path.join(base_path, config_path)
+
+        try:
+            with open(full_path, "r") as file:
+                return json.load(file)
+        except Exception as e:
+            print(f"Error loading config file: {e}")
+            return {}
+
+    def compute(
+        self,
+        parsed_puml: Dict[str, Any],
+        budget: Optional[Budget] = None,
+        seed: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        Summarize parsed PUML data by communities and return the reduced PUML data.
+
+        Args:
+            parsed_puml: Dictionary with 'classes' and 'edges' keys
+            budget: unused, community detection runs once
+            seed: Louvain seed of this run, overrides the configured one
+
+        Returns:
+            Reduced PUML dictionary with same structure
+        """
+        self.last_seed = None
+        self.PUML = parsed_puml
+        G = uml_dict_to_graph(parsed_puml)
+        if len(G) == 0:
+            return {"classes": {}, "edges": []}
+
+        # without node and edge data, to_undirected() deep-copies them
+        undirected = nx.Graph()
+        undirected.add_nodes_from(G)
+        undirected.add_edges_from(G.edges())
+        self.communities = self.detect_communities(undirected, seed)
+        kept = self.select_classes(undirected, self.communities)
+        return self.extract_solution(G, kept)
+
+    def detect_communities(self, G, seed=None):
+        """Communities of `G` as lists of nodes, largest first."""
+        if self.method == "louvain":
+            self.last_seed = self.run_seed(seed)
+            communities = nx.community.louvain_communities(
+                G, resolution=self.resolution, seed=self.last_seed
+            )
+        else:
+            communities = nx.community.label_propagation_communities(G)
+
+        communities = [sorted(community) for community in communities]
+        communities.sort(key=lambda community: (-len(community), community[0]))
+        return communities
+
+    def select_classes(self, G, communities):
+        """Node ids of the kept classes, see the class docstring for the order."""
+        target = max(1, math.ceil(self.target_ratio * len(G)))
+        degree = dict(G.degree())
+        label = {}
+        for i, community in enumerate(communities):
+            community.sort(key=lambda node: (-degree[node], node))
+            for node in community:
+                label[node] = i
+
+        kept = {}
+
+        def keep(*nodes):
+            new = [node for node in dict.fromkeys(nodes) if node not in kept]
+            if len(kept) + len(new) > target:
+                return
+            kept.update(dict.fromkeys(new))
+
+        for community in communities:
+            keep(community[0])
+
+        # strongest link of each pair of connected communities: the pair's edge
+        # count, then the edge with the best connected endpoints
+        links = {}
+        for u, v in G.edges():
+            if label[u] == label[v]:
+                continue
+            pair = tuple(sorted((label[u], label[v])))
+            count, best = links.get(pair, (0, None))
+            if best is None or degree[u] + degree[v] > degree[best[0]] + degree[best[1]]:
+                best = (u, v)
+            links[pair] = (count + 1, best)
+
+        for pair, (_, (u, v)) in sorted(links.items(), key=lambda item: (-item[1][0], item[0])):
+            if len(kept) >= target:
+                break
+            keep(u, v)
+
+        # fill up each community in proportion to its size
+        candidates = sorted(
+            (position / len(community), -len(community), node)
+            for community in communities
+            for position, node in enumerate(community)
+            if node not in kept
+        )
+        for _, _, node in candidates[:target - len(kept)]:
+            keep(node)
+
+        return kept
+
+    def extract_solution(self, G, kept):
+        """
+        Build the reduced PUML dictionary, compatible with PUMLParser.reparse_file().
+        Kept classes keep all their members.
+        """
+        names = {G.nodes[node]["name"] for node in kept}
+        classes = {
+            name: info for name, info in self.PUML["classes"].items() if name in names
+        }
+        edges = [
+            edge for edge in self.PUML["edges"]
+            if edge["source"] in names and edge["target"] in names
+        ]
+        return {"classes": classes, "edges": edges}
@@ -1,12 +1,18 @@
 import os
 from app.services.shrinking_algorithms.base import ShrinkingAlgorithm
-from app.services.shrinking_algorithms.kruskal_algorithm import KruskalsAlgorithm
-from app.services.shrinking_algorithms.genetic_algorithm import GeneticAlgorithm
+from app.services.shrinking_algorithms.registry import algorithm_registry
 
 DEFAULT_ALGO = "kruskal"
 ENV_VAR_NAME = "SHRINKING_ALGORITHM"
 
 
+def load_algorithm_class(name: str) -> type[ShrinkingAlgorithm]:
+    """
+    Import the module of the named algorithm and return its class.
+    """
+    return algorithm_registry.get(name).load()
+
+
 def get_algorithm(algorithm: str | None = None) -> ShrinkingAlgorithm:
     """
     Factory that reads env var and returns the right algorithm instance.
@@ -16,10 +22,4 @@ def get_algorithm(algorithm: str | None = None) -> ShrinkingAlgorithm:
     else:
         name = algorithm
 
-    if name == "kruskal":
-        return KruskalsAlgorithm()
-    if name == "genetic":
-        return GeneticAlgorithm()
-
-    # later: add more algorithms here
-    raise ValueError(f"Unknown algorithm: {name!r}")
+    return load_algorithm_class(name)()
@@ -1,12 +1,80 @@
 import json
+import multiprocessing
 import os
 import random
-from typing import Any, Dict
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Optional
 
 import numpy as np
+from scipy.sparse import csr_matrix
 
-from app.services.shrinking_algorithms.base import ShrinkingAlgorithm
-from embedding.embedding import uml_dict_to_graph, embed_graph
+from app.services.shrinking_algorithms.base import Budget, ShrinkingAlgorithm
+from app.util import logger
+from embedding.embedding import (
+    CompactGraph,
+    uml_dict_to_graph,
+    embed_graph,
+    embed_graph_structural,
+    embed_graphs_structural,
+    embed_subgraphs_from_vectors,
+    node2vec_vectors,
+)
+
+EMBEDDINGS = ("node2vec", "node2vec_shared", "structural")
+
+# worker processes of the island model, shared by all runs, see _island_pool
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _island_pool() -> ProcessPoolExecutor:
+    """
+    Process pool for island runs, started on first use and reused afterwards
+    so runs do not pay for interpreter start-up and imports in every worker.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn, forking a threaded server process is not safe
+            _pool = ProcessPoolExecutor(
+                max_workers=os.cpu_count() or 1,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def _discard_island_pool(pool):
+    """Drop a broken pool so the next run starts a new one."""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _evolve_island(params, run_state, population, fitness_values, generations, seed,
+                   max_seconds, max_evaluations):
+    """
+    Evolve one island's population in a worker process within the given
+    budget. `params` are the initialize() parameters and `run_state` the
+    per-diagram data of the run, see GeneticAlgorithm.run_state.
+    Returns the final population with its fitness, the best individual seen
+    on the way and the number of evaluations spent.
+    """
+    ga = GeneticAlgorithm(**params)
+    ga.load_run_state(run_state)
+    ga.rng = random.Random(seed)
+    ga.budget = Budget(max_seconds=max_seconds, max_evaluations=max_evaluations)
+    population, fitness_values = ga.evolve(population, generations, fitness_values)
+    return (
+        population,
+        fitness_values,
+        ga.best_individual,
+        ga.best_fitness,
+        ga.budget.evaluations,
+    )
 
 
 class GeneticAlgorithm(ShrinkingAlgorithm):
@@ -31,6 +99,20 @@ class GeneticAlgorithm(ShrinkingAlgorithm):
         - crossover_rate: probability of crossover
         - exclusion_threshold: threshold below which elements are excluded
         - inclusion_threshold: threshold above which elements are included
+        - embedding: "node2vec" (default), "node2vec_shared" which trains
+          Node2Vec once on the full diagram and embeds candidates as the mean
+          of their classes' vectors, or "structural", the array based
+          structural features of a CompactGraph. Both are much cheaper per
+          candidate than "node2vec".
+        - islands: number of subpopulations of population_size individuals,
+          each evolved in its own process (1 disables the island model)
+        - migration_interval: generations between migrations, each island's
+          best individual then replaces the worst individual of the next island
+        - elitism: number of best individuals copied unchanged into the next
+          generation, they keep their fitness and are not re-evaluated
+        - seed: seed of the population, the operators and the embeddings, runs
+          with the same seed and settings return the same diagram. Without
+          one a random seed is drawn per compute() (see last_seed)
         """
         config_path = params.get("config_path", "ga_config.json")
         self.config = self.load_config(config_path)
@@ -41,13 +123,26 @@ class GeneticAlgorithm(ShrinkingAlgorithm):
         self.crossover_rate = params.get("crossover_rate", self.config.get("crossover_rate", 0.7))
         self.exclusion_threshold = params.get("exclusion_threshold", self.config.get("exclusion_threshold", 0.5))
         self.inclusion_threshold = params.get("inclusion_threshold", self.config.get("inclusion_threshold", 0.6))
+        self.embedding = params.get("embedding", self.config.get("embedding", "node2vec"))
+        if self.embedding not in EMBEDDINGS:
+            raise ValueError(f"Unknown embedding: {self.embedding!r}")
+
+        self.islands = max(1, params.get("islands", self.config.get("islands", 1)))
+        self.migration_interval = max(1, params.get("migration_interval", self.config.get("migration_interval", 10)))
+        self.elitism = max(0, params.get("elitism", self.config.get("elitism", 1)))
+        self.seed = params.get("seed", self.config.get("seed"))
 
         upper_limit = params.get("upper_limit", self.config.get("upper_limit", 100))
         lower_limit = params.get("lower_limit", self.config.get("lower_limit", 1))
 
         self.population_size = max(lower_limit, min(upper_limit, self.population_size))
         self.generations = max(lower_limit, min(upper_limit, self.generations))
+        self.elitism = min(self.elitism, self.population_size - 1)
+        self.reset()
 
+    def reset(self) -> None:
+        super().reset()
+        self.PUML = None
         self.elements = []
         self.element_types = []
         self.population = []
@@ -55,6 +150,12 @@ class GeneticAlgorithm(ShrinkingAlgorithm):
         self.best_fitness = -float('inf')
         self.original_embedding = None
         self.G_full = None
+        self.compact_graph = None
+        self.node_vectors = None
+        self.gene_to_node = None
+        self.gene_to_edge = None
+        self.budget = Budget()
+        self.rng = random.Random()
 
     def load_config(self, config_path):
         """Load docker configuration from JSON file."""
@@ -66,23 +167,49 @@ class GeneticAlgorithm(ShrinkingAlgorithm):
             with open(full_path, "r") as file:
                 return json.load(file)
         except Exception as e:
-            print(f"Error loading config file: {e}")
+            logger.log("Error loading config file: %s", e, level="error")
             return {}
 
-    def compute(self, parsed_puml: Dict[str, Any]) -> Dict[str, Any]:
+    def compute(
+        self,
+        parsed_puml: Dict[str, Any],
+        budget: Optional[Budget] = None,
+        seed: Optional[int] = None,
+    ) -> Dict[str, Any]:
         """
         Run the genetic algorithm on parsed PUML data and return the reduced PUML data.
 
         Args:
             parsed_puml: Dictionary with 'classes' and 'edges' keys
+            budget: optional time/evaluation limits, the best individual found
+                when it runs out is returned (at least one individual is
+                always evaluated, and the full diagram is always embedded)
+            seed: seed of this run, overrides the configured one
 
         Returns:
             Reduced PUML dictionary with same structure
         """
+        self.budget = budget or Budget()
+        self.best_individual = None
+        self.best_fitness = -float('inf')
+        self.last_seed = self.run_seed(seed)
+        # per run generator, concurrent runs share no random state
+        self.rng = random.Random(self.last_seed)
         self.PUML = parsed_puml
         self._extract_elements()
-        self.G_full = uml_dict_to_graph(self.PUML)
-        self.original_embedding = embed_graph(self.G_full)
+        self.compact_graph = CompactGraph.from_uml(self.PUML)
+        self._build_element_index()
+
+        if self.embedding == "structural":
+            self.G_full = self.compact_graph.subgraph()
+            self.original_embedding = embed_graph_structural(self.G_full, seed=self.last_seed)
+        elif self.embedding == "node2vec_shared":
+            self.G_full = uml_dict_to_graph(self.PUML)
+            self.node_vectors = node2vec_vectors(self.G_full, seed=self.last_seed)
+            self.original_embedding = self.node_vectors.mean(axis=0)
+        else:
+            self.G_full = uml_dict_to_graph(self.PUML)
+            self.original_embedding = embed_graph(self.G_full, seed=self.last_seed)
 
         best_individual = self.solve()
         reduced_diagram = self.extract_solution(best_individual)
@@ -113,46 +240,123 @@ class GeneticAlgorithm(ShrinkingAlgorithm):
             self.elements.append(("edge", edge, None))
             self.element_types.append("edge")
 
+    def _build_element_index(self):
+        """
+        Precompute which classes and edges of the compact graph each gene
+        brings into a candidate, as sparse (genes x nodes) and
+        (genes x edges) incidence matrices. Mirrors decode_individual: a
+        class, attribute or method gene includes its class, an edge gene
+        includes the edge and both its endpoint classes.
+        """
+        name_to_id = self.compact_graph.name_to_id
+        node_genes, nodes, edge_genes, edges = [], [], [], []
+
+        for gene, (element_type, key, _) in enumerate(self.elements):
+            if element_type == "edge":
+                source = name_to_id.get(key["source"])
+                target = name_to_id.get(key["target"])
+                if source is None or target is None:
+                    continue
+                node_genes += [gene, gene]
+                nodes += [source, target]
+                edge_genes.append(gene)
+                edges.append(self.compact_graph.edge_to_id[(source, target)])
+            else:
+                node_genes.append(gene)
+                nodes.append(name_to_id[key])
+
+        genes = len(self.elements)
+        self.gene_to_node = csr_matrix(
+            (np.ones(len(nodes)), (node_genes, nodes)),
+            shape=(genes, self.compact_graph.number_of_nodes()),
+        )
+        self.gene_to_edge = csr_matrix(
+            (np.ones(len(edges)), (edge_genes, edges)),
+            shape=(genes, self.compact_graph.number_of_edges()),
+        )
+
+    def decode_masks(self, population):
+        """
+        Vectorized decode of individuals into (individuals x classes) and
+        (individuals x edges) inclusion masks of the compact graph.
+        """
+        included = (np.asarray(population) >= self.inclusion_threshold).astype(float)
+        node_masks = (self.gene_to_node.T @ included.T).T > 0
+        edge_masks = (self.gene_to_edge.T @ included.T).T > 0
+        return node_masks, edge_masks
+
     def initialize_population(self):
         """Generate initial random population."""
-        self.population = []
-        for _ in range(self.population_size):
-            individual = [random.random() for _ in range(len(self.elements))]
-            self.population.append(individual)
+        self.population = self.random_population()
+
+    def random_population(self):
+        return [
+            [self.rng.random() for _ in range(len(self.elements))]
+            for _ in range(self.population_size)
+        ]
 
     def fitness_function(self, individual):
         """
         Evaluate fitness of an individual.
         """
+        return self.evaluate_population([individual])[0]
 
-        G_shrunk = uml_dict_to_graph(self.decode_individual(individual))
-
-        emb_orig = self.original_embedding
-        emb_shrunk = embed_graph(G_shrunk)
-
-        similarity = self._cosine_sim(emb_orig, emb_shrunk)
-
-        compression_ratio = (
-            (len(self.G_full) - len(G_shrunk)) / len(self.G_full)
-        )
-        compression_ratio = max(compression_ratio, 1e-8)
-
-        return similarity / compression_ratio
-
-
-    def selection(self):
+    def evaluate_population(self, population):
+        """
+        Fitness of every individual: similarity of its embedding to the
+        original diagram's, divided by the compression ratio. Individuals are
+        decoded to masks without building diagram dicts. The structural and
+        shared Node2Vec embeddings score all individuals with one batched
+        call. The "node2vec" embedding trains a model per individual, so it
+        checks the budget before each one after the first; individuals left
+        when it runs out get a fitness of -inf.
+        """
+        node_masks, edge_masks = self.decode_masks(population)
+        evaluated = len(population)
+
+        if self.embedding == "structural":
+            embeddings = embed_graphs_structural(
+                self.compact_graph, node_masks, edge_masks, seed=self.last_seed
+            )
+        elif self.embedding == "node2vec_shared":
+            embeddings = embed_subgraphs_from_vectors(self.node_vectors, node_masks)
+        else:
+            embeddings = []
+            for node_mask, edge_mask in zip(node_masks, edge_masks):
+                # evaluations are charged after the loop, count the ones done so far
+                if embeddings and not self.budget.allows(len(embeddings) + 1):
+                    break
+                subgraph = self.compact_graph.subgraph(node_mask, edge_mask)
+                embeddings.append(self._embed_node2vec(subgraph.to_networkx()))
+            embeddings = np.vstack(embeddings)
+            evaluated = len(embeddings)
+        self.budget.charge(evaluated)
+        sizes = node_masks[:evaluated].sum(axis=1)
+
+        similarity = self._cosine_sims(self.original_embedding, embeddings)
+
+        classes = self.compact_graph.number_of_nodes()
+        compression_ratio = (classes - sizes) / classes
+        compression_ratio = np.maximum(compression_ratio, 1e-8)
+
+        fitness = np.full(len(population), -np.inf)
+        fitness[:evaluated] = similarity / compression_ratio
+        return fitness
+
+    def selection(self, fitness_values):
         """
         Tournament selection: pick random individuals and select the best.
+        Uses the fitness values of the current population instead of
+        re-scoring the contestants.
         Returns selected parents for reproduction.
         """
-        tournament_size = 3
+        tournament_size = min(3, len(self.population))
         selected = []
 
         for _ in range(self.population_size):
-            tournament = random.sample(self.population, tournament_size)
-            tournament_fitness = [(ind, self.fitness_function(ind)) for ind in tournament]
-            winner = max(tournament_fitness, key=lambda x: x[1])
-            selected.append(winner[0])
+            tournament = self.rng.sample(range(len(self.population)), tournament_size)
+            winner = max(tournament, key=lambda i: fitness_values[i])
+            selected.append(self.population[winner])
 
         return selected
 
@@ -160,10 +364,10 @@ class GeneticAlgorithm(ShrinkingAlgorithm):
         """
         Single-point crossover: create two offspring from two parents.
         """
-        if random.random() > self.crossover_rate:
+        if self.rng.random() > self.crossover_rate:
             return parent1[:], parent2[:]
 
-        crossover_point = random.randint(1, len(parent1) - 1)
+        crossover_point = self.rng.randint(1, len(parent1) - 1)
 
         offspring1 = parent1[:crossover_point] + parent2[crossover_point:]
         offspring2 = parent2[:crossover_point] + parent1[crossover_point:]
@@ -177,8 +381,8 @@ class GeneticAlgorithm(ShrinkingAlgorithm):
         mutated = individual[:]
 
         for i in range(len(mutated)):
-            if random.random() < self.mutation_rate:
-                mutated[i] = random.random()
+            if self.rng.random() < self.mutation_rate:
+                mutated[i] = self.rng.random()
 
 
         return mutated
@@ -188,18 +392,36 @@ class GeneticAlgorithm(ShrinkingAlgorithm):
         Run the genetic algorithm for specified number of generations.
         Returns the best individual found.
         """
-        self.initialize_population()
+        if self.islands > 1:
+            return self.solve_islands()
 
-        for generation in range(self.generations):
-            print(f"Generation {generation + 1}")
-            fitness_values = [(ind, self.fitness_function(ind)) for ind in self.population]
+        self.initialize_population()
+        self.evolve(self.population, self.generations)
 
-            current_best = max(fitness_values, key=lambda x: x[1])
-            if current_best[1] > self.best_fitness:
-                self.best_fitness = current_best[1]
-                self.best_individual = current_best[0][:]
+        return self.best_individual
 
-            selected = self.selection()
+    def evolve(self, population, generations, fitness_values=None):
+        """
+        Evolve `population` for `generations` generations, tracking the best
+        individual. Every individual is evaluated once: the elite keeps its
+        fitness, so each generation evaluates at most
+        ``population_size - elitism`` offspring. Stops early, before a
+        generation the budget has no room for.
+        Returns the last generation and its fitness values.
+        """
+        self.population = population
+        if fitness_values is None:
+            fitness_values = self.evaluate_population(self.population)
+
+        for generation in range(generations):
+            self._update_best(fitness_values)
+            offspring_count = self.population_size - min(self.elitism, len(self.population))
+            if not self.budget.allows(offspring_count):
+                break
+            logger.log("Generation %d", generation + 1, level="debug")
+
+            selected = self.selection(fitness_values)
+            elite = np.argsort(fitness_values)[::-1][:self.elitism]
             new_population = []
 
             for i in range(0, len(selected), 2):
@@ -213,7 +435,103 @@ class GeneticAlgorithm(ShrinkingAlgorithm):
 
                 new_population.extend([offspring1, offspring2])
 
-            self.population = new_population[:self.population_size]
+            offspring = new_population[:self.population_size - len(elite)]
+            self.population = [self.population[i] for i in elite] + offspring
+            fitness_values = np.concatenate([
+                np.asarray(fitness_values)[elite],
+                self.evaluate_population(offspring) if offspring else [],
+            ])
+
+        self._update_best(fitness_values)
+        return self.population, fitness_values
+
+    def _update_best(self, fitness_values):
+        best_index = int(np.argmax(fitness_values))
+        if fitness_values[best_index] > self.best_fitness:
+            self.best_fitness = fitness_values[best_index]
+            self.best_individual = self.population[best_index][:]
+
+    def island_params(self):
+        """initialize() parameters that island workers rebuild this algorithm from."""
+        return {
+            "population_size": self.population_size,
+            "generations": self.generations,
+            "mutation_rate": self.mutation_rate,
+            "crossover_rate": self.crossover_rate,
+            "exclusion_threshold": self.exclusion_threshold,
+            "inclusion_threshold": self.inclusion_threshold,
+            "embedding": self.embedding,
+            "elitism": self.elitism,
+        }
+
+    def run_state(self):
+        """Per-diagram data evaluate_population needs, sent to island workers."""
+        return {
+            "compact_graph": self.compact_graph,
+            "gene_to_node": self.gene_to_node,
+            "gene_to_edge": self.gene_to_edge,
+            "original_embedding": self.original_embedding,
+            "node_vectors": self.node_vectors,
+            "last_seed": self.last_seed,
+        }
+
+    def load_run_state(self, run_state):
+        for name, value in run_state.items():
+            setattr(self, name, value)
+
+    def solve_islands(self):
+        """
+        Island model: evolve `islands` populations in separate processes for
+        `migration_interval` generations at a time, then migrate each island's
+        best individual to the next island (ring topology), replacing its worst.
+        """
+        populations = [self.random_population() for _ in range(self.islands)]
+        fitness = [None] * self.islands
+        params = self.island_params()
+        run_state = self.run_state()
+        offspring_count = self.population_size - min(self.elitism, self.population_size)
+        pool = _island_pool()
+
+        remaining = self.generations
+        # the first epoch always runs so every island evaluates its population
+        while remaining > 0 and (
+            remaining == self.generations or self.budget.allows(self.islands * offspring_count)
+        ):
+            step = min(self.migration_interval, remaining)
+            # islands share what is left of the budget
+            max_evaluations = self.budget.remaining_evaluations()
+            if max_evaluations is not None:
+                max_evaluations //= self.islands
+            try:
+                futures = [
+                    pool.submit(
+                        _evolve_island, params, run_state, population, values, step,
+                        self.rng.getrandbits(32), self.budget.remaining_seconds(), max_evaluations,
+                    )
+                    for population, values in zip(populations, fitness)
+                ]
+                results = [future.result() for future in futures]
+            except BrokenProcessPool:
+                _discard_island_pool(pool)
+                raise
+
+            populations, fitness, migrants = [], [], []
+            for population, values, best_individual, best_fitness, evaluations in results:
+                self.budget.charge(evaluations)
+                populations.append(population)
+                fitness.append(values)
+                migrants.append((best_individual, best_fitness))
+                if best_fitness > self.best_fitness:
+                    self.best_fitness = best_fitness
+                    self.best_individual = best_individual[:]
+
+            remaining -= step
+            if remaining > 0:
+                for i, (migrant, migrant_fitness) in enumerate(migrants):
+                    target = (i + 1) % len(populations)
+                    worst = int(np.argmin(fitness[target]))
+                    populations[target][worst] = migrant[:]
+                    fitness[target][worst] = migrant_fitness
 
         return self.best_individual
 
@@ -282,13 +600,21 @@ class GeneticAlgorithm(ShrinkingAlgorithm):
     def extract_solution(self, individual):
         """
         Convert the best individual to a reduced PUML diagram structure.
+        Only the winner is decoded into dicts, candidates are scored from
+        decode_masks.
         Compatible with PUMLParser.reparse_file() method.
         """
         return self.decode_individual(individual)
 
-    def _cosine_sim(self, a, b):
-        a = a.ravel()
-        b = b.ravel()
-        return np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b))
-
+    def _embed_node2vec(self, G):
+        """Node2Vec embedding of a candidate, Node2Vec cannot train on an empty graph."""
+        if len(G) == 0:
+            return np.zeros_like(self.original_embedding)
+        return embed_graph(G, seed=self.last_seed)
 
+    def _cosine_sims(self, a, B):
+        """Cosine similarity of vector `a` to every row of `B`."""
+        a = a.ravel()
+        B = np.atleast_2d(B)
+        norms = np.linalg.norm(B, axis=1) * np.linalg.norm(a)
+        return np.divide(B @ a, norms, out=np.zeros(len(B)), where=norms > 0)
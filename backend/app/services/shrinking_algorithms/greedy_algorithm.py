@@ -0,0 +1,217 @@
+import json
+import math
+import os
+from typing import Any, Dict, Optional
+
+from app.services.shrinking_algorithms.base import Budget, ShrinkingAlgorithm
+
+# on equal scores members go first, then edges, classes last
+_MEMBER, _EDGE, _CLASS = 0, 1, 2
+
+
+class GreedyImportanceAlgorithm(ShrinkingAlgorithm):
+    """
+    Greedy importance ranking for diagram shrinking.
+    Implements ShrinkingAlgorithm interface.
+
+    Classes, members and edges get a cheap importance score and the lowest
+    ranked elements are removed until `target_ratio` of all elements is left.
+    Removing a class also removes its members and edges. One sort of all
+    elements, so O((V + E) log(V + E)) for V classes and members and E edges.
+    """
+
+    def initialize(self, **params: Any) -> None:
+        """
+        Initialize the algorithm with parameters.
+
+        Supported parameters:
+        - config_path: path to JSON config file
+        - target_ratio: share of classes, members and edges to keep, in (0, 1]
+        - degree_weight: weight of a class' relation weighted degree in its score
+        - member_weight: weight of a class' member count in its score
+        - relation_weights: weight of each relation kind ("extension", ...),
+          unknown kinds weigh 1
+        - visibility_weights: factor of each member visibility ("public", ...)
+        """
+        config_path = params.get("config_path", "greedy_config.json")
+        self.config = self.load_config(config_path)
+
+        self.target_ratio = params.get("target_ratio", self.config.get("target_ratio", 0.5))
+        if not 0 < self.target_ratio <= 1:
+            raise ValueError(f"target_ratio must be in (0, 1], got {self.target_ratio!r}")
+        self.degree_weight = params.get("degree_weight", self.config.get("degree_weight", 1.0))
+        self.member_weight = params.get("member_weight", self.config.get("member_weight", 0.25))
+        self.relation_weights = params.get("relation_weights", self.config.get("relation_weights", {}))
+        self.visibility_weights = params.get("visibility_weights", self.config.get("visibility_weights", {}))
+        self.reset()
+
+    def reset(self) -> None:
+        super().reset()
+        self.PUML = None
+        self.class_scores = {}
+
+    def load_config(self, config_path):
+        """Load configuration from JSON file."""
+        base_path = os.path.dirname(os.path.abspath(__file__))
+        full_path = os.path.join(base_path, config_path)
+
+        try:
+            with open(full_path, "r") as file:
+                return json.load(file)
+        except Exception as e:
+            print(f"Error loading config file: {e}")
+            return {}
+
+    def compute(
+        self,
+        parsed_puml: Dict[str, Any],
+        budget: Optional[Budget] = None,
+        seed: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        Rank the elements of parsed PUML data and return the reduced PUML data.
+
+        Args:
+            parsed_puml: Dictionary with 'classes' and 'edges' keys
+            budget: unused, the ranking is a single pass
+            seed: unused, the algorithm is deterministic
+
+        Returns:
+            Reduced PUML dictionary with same structure
+        """
+        self.PUML = parsed_puml
+        classes = parsed_puml["classes"]
+        edges = [
+            edge for edge in parsed_puml["edges"]
+            if edge["source"] in classes and edge["target"] in classes
+        ]
+
+        self.class_scores = self.score_classes(classes, edges)
+        ranked = self.rank_elements(classes, edges)
+        return self.remove_lowest(classes, edges, ranked)
+
+    def relation_weight(self, edge):
+        # parser relations look like "extension-right"
+        kind = edge.get("relation", "association").split("-")[0]
+        return self.relation_weights.get(kind, 1)
+
+    def score_classes(self, classes, edges):
+        """
+        Score of each class: its relation weighted degree and member count,
+        each normalized by the diagram's maximum.
+        """
+        degree = dict.fromkeys(classes, 0.0)
+        for edge in edges:
+            weight = self.relation_weight(edge)
+            degree[edge["source"]] += weight
+            degree[edge["target"]] += weight
+
+        members = {
+            name: len(info.get("attributes", [])) + len(info.get("methods", []))
+            for name, info in classes.items()
+        }
+
+        max_degree = max(degree.values(), default=0) or 1
+        max_members = max(members.values(), default=0) or 1
+        return {
+            name: self.degree_weight * degree[name] / max_degree
+            + self.member_weight * members[name] / max_members
+            for name in classes
+        }
+
+    def rank_elements(self, classes, edges):
+        """
+        All elements as (score, kind, index, element) sorted from least to
+        most important. A member scores its class' score times its visibility
+        factor and an edge its normalized relation weight times the score of
+        its weaker endpoint, so both go before the classes they belong to.
+        """
+        ranked = []
+        for name, info in classes.items():
+            score = self.class_scores[name]
+            ranked.append((score, _CLASS, len(ranked), name))
+            for group in ("attributes", "methods"):
+                for i, member in enumerate(info.get(group, [])):
+                    visibility = self.visibility_weights.get(member.get("visibility"), 1.0)
+                    ranked.append((score * visibility, _MEMBER, len(ranked), (name, group, i)))
+
+        max_relation = max((self.relation_weight(edge) for edge in edges), default=0) or 1
+        for i, edge in enumerate(edges):
+            endpoints = min(self.class_scores[edge["source"]], self.class_scores[edge["target"]])
+            score = self.relation_weight(edge) / max_relation * endpoints
+            ranked.append((score, _EDGE, len(ranked), i))
+
+        ranked.sort()
+        return ranked
+
+    def remove_lowest(self, classes, edges, ranked):
+        """
+        Walk the ranking and remove elements until the target size is reached.
+        A class whose removal (with its members and edges) would overshoot the
+        target is skipped, so cheaper elements further up get removed instead.
+        """
+        total = len(ranked)
+        target = max(1, math.ceil(self.target_ratio * total))
+        remaining = total
+
+        incident = {name: [] for name in classes}
+        for i, edge in enumerate(edges):
+            incident[edge["source"]].append(i)
+            incident[edge["target"]].append(i)
+        members_left = {
+            name: len(info.get("attributes", [])) + len(info.get("methods", []))
+            for name, info in classes.items()
+        }
+
+        removed_classes, removed_members, removed_edges = set(), set(), set()
+        for _, kind, _, element in ranked:
+            if remaining <= target:
+                break
+
+            if kind == _MEMBER:
+                name = element[0]
+                if name in removed_classes:
+                    continue
+                removed_members.add(element)
+                members_left[name] -= 1
+                remaining -= 1
+
+            elif kind == _EDGE:
+                if element in removed_edges:
+                    continue
+                removed_edges.add(element)
+                remaining -= 1
+
+            else:
+                edges_left = [i for i in incident[element] if i not in removed_edges]
+                cost = 1 + members_left[element] + len(set(edges_left))
+                if remaining - cost < target:
+                    continue
+                removed_classes.add(element)
+                removed_edges.update(edges_left)
+                remaining -= cost
+
+        return self.extract_solution(classes, edges, removed_classes, removed_members, removed_edges)
+
+    def extract_solution(self, classes, edges, removed_classes, removed_members, removed_edges):
+        """
+        Build the reduced PUML dictionary, compatible with PUMLParser.reparse_file().
+        """
+        reduced_classes = {}
+        for name, info in classes.items():
+            if name in removed_classes:
+                continue
+            reduced_classes[name] = {
+                **info,
+                "attributes": [
+                    member for i, member in enumerate(info.get("attributes", []))
+                    if (name, "attributes", i) not in removed_members
+                ],
+                "methods": [
+                    member for i, member in enumerate(info.get("methods", []))
+                    if (name, "methods", i) not in removed_members
+                ],
+            }
+
+        reduced_edges = [edge for i, edge in enumerate(edges) if i not in removed_edges]
+        return {"classes": reduced_classes, "edges": reduced_edges}
@@ -1,7 +1,7 @@
 import os
 import json
-from typing import Any, Dict
-from app.services.shrinking_algorithms.base import ShrinkingAlgorithm
+from typing import Any, Dict, Optional
+from app.services.shrinking_algorithms.base import Budget, ShrinkingAlgorithm
 
 class KruskalsAlgorithm(ShrinkingAlgorithm):
     """
@@ -18,7 +18,10 @@ class KruskalsAlgorithm(ShrinkingAlgorithm):
         """
         config_path = params.get("config_path", "kruskals_config.json")
         self.weights_map = self.load_weights(config_path)
+        self.reset()
 
+    def reset(self) -> None:
+        super().reset()
         self.PUML = None
         self.size = 0
         self.edges = []
@@ -50,12 +53,19 @@ class KruskalsAlgorithm(ShrinkingAlgorithm):
 
         return 1
 
-    def compute(self, parsed_puml: Dict[str, Any]) -> Dict[str, Any]:
+    def compute(
+        self,
+        parsed_puml: Dict[str, Any],
+        budget: Optional[Budget] = None,
+        seed: Optional[int] = None,
+    ) -> Dict[str, Any]:
         """
         Run Kruskal's algorithm on parsed PUML data and return the MST.
 
         Args:
             parsed_puml: Dictionary with 'classes' and 'edges' keys
+            budget: unused, the MST is computed in a single near-linear pass
+            seed: unused, the algorithm is deterministic
 
         Returns:
             Reduced PUML dictionary with MST edges
@@ -0,0 +1,215 @@
+import importlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from importlib.metadata import entry_points
+from typing import Any, Dict, Iterator, Optional
+
+from app.config import settings
+from app.schemas.config import (
+    AlgorithmSettings,
+    CommunitySettings,
+    GeneticSettings,
+    GreedySettings,
+    KruskalSettings,
+)
+from app.services.shrinking_algorithms.base import ShrinkingAlgorithm
+from app.util import logger
+
+# installed packages can add algorithms with an entry point in this group
+# whose object is an AlgorithmSpec, e.g. in pyproject.toml:
+#   [project.entry-points."shrinking_diagrams.algorithms"]
+#   my_algorithm = "my_package.specs:MY_ALGORITHM"
+ENTRY_POINT_GROUP = "shrinking_diagrams.algorithms"
+
+# configurations with idle pooled instances, least recently used ones are dropped
+MAX_POOLED_CONFIGS = 64
+
+CONFIG_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+@dataclass(frozen=True)
+class AlgorithmSpec:
+    """
+    Description of a shrinking algorithm. The implementation (``path``,
+    "module:Class") is only imported when the algorithm is first used.
+
+    :param name: Name the algorithm is selected by.
+    :param path: "module:Class" of the ShrinkingAlgorithm.
+    :param settings_schema: Request settings, translated to initialize() parameters.
+    :param config_path: JSON config served by /api/getAlgConfig, if any.
+    :param aliases: Other accepted names, e.g. frontend ids.
+    :param supports_budget: compute() honors the time/evaluation budget.
+    :param supports_progress: The algorithm reports progress while it runs.
+    :param parallel: The algorithm can use several processes.
+    """
+    name: str
+    path: str
+    settings_schema: type[AlgorithmSettings] = AlgorithmSettings
+    config_path: Optional[str] = None
+    aliases: tuple[str, ...] = ()
+    supports_budget: bool = False
+    supports_progress: bool = False
+    parallel: bool = False
+
+    def load(self) -> type[ShrinkingAlgorithm]:
+        """Import the module of the algorithm and return its class."""
+        module_name, class_name = self.path.split(":")
+        return getattr(importlib.import_module(module_name), class_name)
+
+    def parse_settings(self, request_settings: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        initialize() parameters for the given request settings.
+        Raises ValueError (pydantic's ValidationError) on invalid values.
+        """
+        return self.settings_schema.model_validate(request_settings).model_dump(exclude_none=True)
+
+    def load_config(self) -> Dict[str, Any]:
+        if self.config_path is None:
+            return {}
+        with open(self.config_path, "r") as file:
+            return json.load(file)
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "aliases": list(self.aliases),
+            "supports_budget": self.supports_budget,
+            "supports_progress": self.supports_progress,
+            "parallel": self.parallel,
+            "settings": self.settings_schema.model_json_schema(by_alias=True),
+        }
+
+
+BUILTIN_ALGORITHMS = (
+    AlgorithmSpec(
+        name="kruskal",
+        path="app.services.shrinking_algorithms.kruskal_algorithm:KruskalsAlgorithm",
+        settings_schema=KruskalSettings,
+        config_path=os.path.join(CONFIG_DIR, "kruskals_config.json"),
+        aliases=("kruskals",),
+    ),
+    AlgorithmSpec(
+        name="genetic",
+        path="app.services.shrinking_algorithms.genetic_algorithm:GeneticAlgorithm",
+        settings_schema=GeneticSettings,
+        config_path=os.path.join(CONFIG_DIR, "ga_config.json"),
+        aliases=("evol",),
+        supports_budget=True,
+        parallel=True,
+    ),
+    AlgorithmSpec(
+        name="greedy",
+        path="app.services.shrinking_algorithms.greedy_algorithm:GreedyImportanceAlgorithm",
+        settings_schema=GreedySettings,
+        config_path=os.path.join(CONFIG_DIR, "greedy_config.json"),
+    ),
+    AlgorithmSpec(
+        name="community",
+        path="app.services.shrinking_algorithms.community_algorithm:CommunitySummaryAlgorithm",
+        settings_schema=CommunitySettings,
+        config_path=os.path.join(CONFIG_DIR, "community_config.json"),
+    ),
+)
+
+
+class AlgorithmRegistry:
+    """
+    Shrinking algorithms by name, the built-in ones plus those found through
+    entry points on first lookup.
+
+    Instances are pooled per configuration (algorithm and initialize()
+    parameters): `acquire` hands out an idle instance or creates one, and up to
+    `pool_size` idle instances per configuration are kept afterwards, so
+    repeated requests skip loading configs and initialization.
+    """
+
+    def __init__(self, specs=BUILTIN_ALGORITHMS, pool_size: int = 0, discover: bool = True):
+        self.pool_size = pool_size
+        self._specs: Dict[str, AlgorithmSpec] = {}
+        self._names: Dict[str, AlgorithmSpec] = {}
+        self._discovered = not discover
+        self._pool: OrderedDict[tuple, list[ShrinkingAlgorithm]] = OrderedDict()
+        self._lock = threading.Lock()
+
+        for spec in specs:
+            self.register(spec)
+
+    def register(self, spec: AlgorithmSpec) -> None:
+        for name in (spec.name, *spec.aliases):
+            if name in self._names:
+                raise ValueError(f"Algorithm name already registered: {name!r}")
+        self._specs[spec.name] = spec
+        for name in (spec.name, *spec.aliases):
+            self._names[name] = spec
+
+    def discover(self) -> None:
+        """Register the algorithms of the ENTRY_POINT_GROUP entry points (once)."""
+        with self._lock:
+            if self._discovered:
+                return
+            self._discovered = True
+
+            for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+                try:
+                    spec = entry_point.load()
+                    if not isinstance(spec, AlgorithmSpec):
+                        raise TypeError(f"expected an AlgorithmSpec, got {type(spec).__name__}")
+                    self.register(spec)
+                except Exception as e:
+                    logger.log(
+                        "Skipping algorithm entry point %s: %s", entry_point.name, e, level="error"
+                    )
+
+    def get(self, name: str) -> AlgorithmSpec:
+        self.discover()
+        try:
+            return self._names[name]
+        except KeyError:
+            raise ValueError(f"Unknown algorithm: {name!r}") from None
+
+    def specs(self) -> list[AlgorithmSpec]:
+        self.discover()
+        return list(self._specs.values())
+
+    def create(self, name: str, params: Optional[Dict[str, Any]] = None) -> ShrinkingAlgorithm:
+        """New, unpooled instance initialized with `params`."""
+        return self.get(name).load()(**(params or {}))
+
+    @contextmanager
+    def acquire(self, name: str, params: Optional[Dict[str, Any]] = None) -> Iterator[ShrinkingAlgorithm]:
+        """
+        Instance initialized with `params` for the duration of the block.
+        It is reset and returned to the pool unless the block raised. Per-run
+        inputs such as the seed belong in compute(), not in `params`, or
+        every run gets a configuration of its own.
+        """
+        params = params or {}
+        key = (self.get(name).name, json.dumps(params, sort_keys=True, default=str))
+
+        with self._lock:
+            idle = self._pool.get(key)
+            algorithm = idle.pop() if idle else None
+
+        if algorithm is None:
+            algorithm = self.create(name, params)
+
+        yield algorithm
+
+        if self.pool_size <= 0:
+            return
+        # idle instances must not keep the last diagram and its graphs alive
+        algorithm.reset()
+        with self._lock:
+            idle = self._pool.setdefault(key, [])
+            self._pool.move_to_end(key)
+            if len(idle) < self.pool_size:
+                idle.append(algorithm)
+            while len(self._pool) > MAX_POOLED_CONFIGS:
+                self._pool.popitem(last=False)
+
+
+algorithm_registry = AlgorithmRegistry(pool_size=settings.algorithm_pool_size)
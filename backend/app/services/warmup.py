@@ -0,0 +1,71 @@
+import os
+import tempfile
+import time
+
+from app.services.parse_puml_service import get_parser
+from app.services.shrinking_algorithms.base import Budget
+from app.services.shrinking_algorithms.registry import algorithm_registry
+from app.util import logger
+
+# small enough to shrink in well under a second, but touches classes,
+# members and edges so parsing, embedding and decoding code paths all run
+WARMUP_DIAGRAM = """@startuml
+class A {
+  +id: int
+  +name(): str
+}
+class B {
+  +value: int
+}
+class C {
+}
+A --> B
+B --> C
+C --> A
+@enduml
+"""
+
+# keeps the synthetic shrink cheap for algorithms that support a budget
+WARMUP_EVALUATIONS = 4
+
+
+def parse_algorithm_names(value: str) -> list[str]:
+    return [name.strip().lower() for name in value.split(",") if name.strip()]
+
+
+def warm_up(algorithms: list[str], shrink: bool = True) -> None:
+    """
+    Preload the parser config and the given shrinking algorithms, optionally
+    running each of them once on a tiny synthetic diagram so lazy imports and
+    first-call initialization happen before the worker takes traffic. The
+    instances are acquired from the algorithm registry and stay in its pool.
+    """
+    started = time.perf_counter()
+    parser = get_parser()
+
+    parsed = None
+    if shrink and algorithms:
+        with tempfile.NamedTemporaryFile("w", delete=False, suffix=".puml") as tmp:
+            tmp.write(WARMUP_DIAGRAM)
+            source_path = tmp.name
+        try:
+            parsed = parser.parse_file(source_path)
+        finally:
+            os.remove(source_path)
+
+    for name in algorithms:
+        try:
+            spec = algorithm_registry.get(name)
+            # parameters of a request without settings, so the warmed instance
+            # is pooled for the requests that use the algorithm's config
+            params = spec.parse_settings({})
+            with algorithm_registry.acquire(spec.name, params) as alg:
+                if parsed:
+                    budget = Budget(max_evaluations=WARMUP_EVALUATIONS) if spec.supports_budget else None
+                    alg.compute(parsed, budget=budget)
+        except Exception as e:
+            logger.log("Warm-up of algorithm %s failed: %s", name, e, level="error")
+
+    logger.log(
+        "Warm-up of %s finished in %.2f s", algorithms, time.perf_counter() - started, level="info"
+    )
@@ -0,0 +1,57 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db import Base
+# imported so that create_all() knows every table
+from app.models.user import User
+from app.models.refresh_token import RefreshToken
+from app.models.chat_threads import ChatThread
+from app.models.chat_messages import ChatMessage
+from app.models.chat_files import ChatFiles
+from app.models.chat_file_blob import ChatFileBlob
+
+
+def _seed_user():
+    return User(id=1, email="user@example.com", password_hash="x")
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def db():
+    """Session on a fresh in-memory database with user 1."""
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(engine)
+    session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    session.add(_seed_user())
+    session.commit()
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
+
+
+@pytest.fixture
+async def async_db():
+    """Async counterpart of `db`, for tests marked with pytest.mark.anyio."""
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+        session.add(_seed_user())
+        await session.commit()
+        try:
+            yield session
+        finally:
+            await engine.dispose()
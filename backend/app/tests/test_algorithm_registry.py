@@ -0,0 +1,86 @@
+import pytest
+
+from app.services.shrinking_algorithms import registry as registry_module
+from app.services.shrinking_algorithms.registry import (
+    BUILTIN_ALGORITHMS,
+    AlgorithmRegistry,
+    AlgorithmSpec,
+)
+
+
+def test_aliases_resolve_to_the_same_spec():
+    registry = AlgorithmRegistry(discover=False)
+
+    assert registry.get("evol") is registry.get("genetic")
+    assert registry.get("kruskals").name == "kruskal"
+    with pytest.raises(ValueError):
+        registry.get("none")
+
+
+def test_settings_are_validated_and_translated():
+    spec = AlgorithmRegistry(discover=False).get("evol")
+
+    params = spec.parse_settings({"population": 20, "iterations": 5, "max_seconds": 3})
+
+    assert params == {"population_size": 20, "generations": 5}
+    with pytest.raises(ValueError):
+        spec.parse_settings({"population": 0})
+
+
+def test_instances_are_pooled_per_configuration():
+    registry = AlgorithmRegistry(discover=False, pool_size=1)
+
+    with registry.acquire("greedy", {"target_ratio": 0.5}) as first:
+        pass
+    with registry.acquire("greedy", {"target_ratio": 0.5}) as second:
+        with registry.acquire("greedy", {"target_ratio": 0.5}) as busy:
+            pass
+    with registry.acquire("greedy", {"target_ratio": 0.3}) as other:
+        pass
+
+    assert second is first
+    assert busy is not first
+    assert other is not first and other.target_ratio == 0.3
+
+
+def test_pooled_instances_drop_the_last_run():
+    registry = AlgorithmRegistry(discover=False, pool_size=1)
+    diagram = {
+        "classes": {name: {"id": i} for i, name in enumerate("ABCD")},
+        "edges": [{"source": "A", "target": "B", "relation": "association"},
+                  {"source": "C", "target": "D", "relation": "association"}],
+    }
+
+    with registry.acquire("community", {"method": "louvain"}) as alg:
+        alg.compute(diagram, seed=7)
+        assert alg.last_seed == 7
+    with registry.acquire("community", {"method": "louvain"}) as again:
+        assert again is alg
+        assert again.PUML is None and again.communities == [] and again.last_seed is None
+        again.compute(diagram, seed=8)
+        assert again.last_seed == 8
+
+
+def test_entry_points_add_algorithms(monkeypatch):
+    plugin = AlgorithmSpec(
+        name="plugin",
+        path="app.services.shrinking_algorithms.greedy_algorithm:GreedyImportanceAlgorithm",
+    )
+
+    class FakeEntryPoint:
+        def __init__(self, name, value):
+            self.name = name
+            self.value = value
+
+        def load(self):
+            return self.value
+
+    monkeypatch.setattr(
+        registry_module,
+        "entry_points",
+        lambda group: [FakeEntryPoint("plugin", plugin), FakeEntryPoint("broken", object())],
+    )
+    registry = AlgorithmRegistry()
+
+    assert registry.get("plugin") is plugin
+    assert [spec.name for spec in registry.specs()] == [s.name for s in BUILTIN_ALGORITHMS] + ["plugin"]
@@ -0,0 +1,79 @@
+import pytest
+from sqlalchemy import func, select
+
+from app.models.chat_threads import ChatThread
+from app.models.chat_messages import ChatMessage
+from app.models.chat_files import ChatFiles
+from app.models.chat_file_blob import ChatFileBlob
+
+from app.services import async_chat_service as async_chat_service_module
+from app.services.async_chat_service import AsyncChatService
+
+pytestmark = pytest.mark.anyio
+
+
+def _mock_ai(monkeypatch, reply=None, error=None):
+    class FakeAsyncOpenAIService:
+        async def chat(self, messages):
+            if error:
+                raise error
+            return reply
+
+    monkeypatch.setattr(
+        async_chat_service_module, "AsyncOpenAIService", FakeAsyncOpenAIService
+    )
+
+
+async def test_async_prompt_message_records_prompt_and_response(async_db, monkeypatch):
+    _mock_ai(monkeypatch, reply="Hello back")
+    chat_service = AsyncChatService(async_db)
+    thread = await chat_service.create_thread(user_id=1, title="Thread", commit=True)
+
+    response = await chat_service.prompt_message(
+        user_id=1,
+        thread_id=thread.id,
+        prompt_message="Hello",
+        prompt_file="@startuml\n@enduml",
+        prompt_file_name="diagram.puml",
+    )
+
+    messages = await chat_service.retrieve_messages(user_id=1, thread_id=thread.id)
+    assert [m.content for m in messages] == ["Hello", "Hello back"]
+    assert messages[0].files[0].file_name == "diagram.puml"
+    assert response.files == []
+
+
+async def test_async_failed_ai_call_discards_new_thread(async_db, monkeypatch):
+    _mock_ai(monkeypatch, error=RuntimeError("AI unavailable"))
+    chat_service = AsyncChatService(async_db)
+
+    with pytest.raises(RuntimeError):
+        await chat_service.create_new_thread_with_prompt(
+            user_id=1,
+            title="Thread",
+            prompt_message="Hello",
+            prompt_file="@startuml\n@enduml",
+            prompt_file_name="diagram.puml",
+        )
+
+    for model in (ChatThread, ChatMessage, ChatFiles):
+        count = await async_db.scalar(select(func.count()).select_from(model))
+        assert count == 0
+
+
+async def test_deleting_a_thread_drops_its_files_and_blobs(async_db, monkeypatch):
+    _mock_ai(monkeypatch, reply="Done")
+    chat_service = AsyncChatService(async_db)
+    thread, _ = await chat_service.create_new_thread_with_prompt(
+        user_id=1,
+        title="Thread",
+        prompt_message="Hello",
+        prompt_file="@startuml\nclass A\n@enduml",
+        prompt_file_name="diagram.puml",
+    )
+
+    await chat_service.delete_thread(user_id=1, thread_id=thread.id, commit=True)
+
+    for model in (ChatMessage, ChatFiles, ChatFileBlob):
+        count = await async_db.scalar(select(func.count()).select_from(model))
+        assert count == 0
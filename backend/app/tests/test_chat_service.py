@@ -0,0 +1,175 @@
+import sys
+from datetime import datetime
+
+import pytest
+
+from app.models.chat_threads import ChatThread
+from app.models.chat_messages import ChatMessage
+from app.models.chat_files import ChatFiles
+from app.models.chat_file_blob import ChatFileBlob, check_codec
+
+from app.repository.chat_messages_repository import ChatMessageRepository
+from app.services import chat_service as chat_service_module
+from app.services.chat_common import PendingPrompt
+from app.services.chat_service import ChatService
+
+
+def _mock_ai(monkeypatch, reply=None, error=None):
+    class FakeOpenAIService:
+        def chat(self, messages):
+            if error:
+                raise error
+            return reply
+
+    monkeypatch.setattr(chat_service_module, "OpenAIService", FakeOpenAIService)
+
+
+def test_prompt_message_records_prompt_and_response(db, monkeypatch):
+    _mock_ai(monkeypatch, reply="Hello back")
+    chat_service = ChatService(db)
+    thread = chat_service.create_thread(user_id=1, title="Thread", commit=True)
+
+    response = chat_service.prompt_message(
+        user_id=1,
+        thread_id=thread.id,
+        prompt_message="Hello",
+        prompt_file="@startuml\n@enduml",
+        prompt_file_name="diagram.puml",
+    )
+
+    messages = chat_service.retrieve_messages(user_id=1, thread_id=thread.id)
+    assert [m.content for m in messages] == ["Hello", "Hello back"]
+    assert response.content == "Hello back"
+
+    db.refresh(thread)
+    assert thread.last_diagram_file_id == messages[0].files[0].id
+    assert thread.last_message_at == response.created_at
+
+
+def test_failed_ai_call_discards_prompt(db, monkeypatch):
+    _mock_ai(monkeypatch, error=RuntimeError("AI unavailable"))
+    chat_service = ChatService(db)
+    thread = chat_service.create_thread(user_id=1, title="Thread", commit=True)
+
+    with pytest.raises(RuntimeError):
+        chat_service.prompt_message(
+            user_id=1,
+            thread_id=thread.id,
+            prompt_message="Hello",
+            prompt_file="@startuml\n@enduml",
+            prompt_file_name="diagram.puml",
+        )
+
+    assert db.query(ChatMessage).count() == 0
+    assert db.query(ChatFiles).count() == 0
+    assert db.query(ChatFileBlob).count() == 0
+    assert db.get(ChatThread, thread.id).last_diagram_file_id is None
+
+
+def test_failed_ai_call_discards_new_thread(db, monkeypatch):
+    _mock_ai(monkeypatch, error=RuntimeError("AI unavailable"))
+    chat_service = ChatService(db)
+
+    with pytest.raises(RuntimeError):
+        chat_service.create_new_thread_with_prompt(
+            user_id=1,
+            title="Thread",
+            prompt_message="Hello",
+        )
+
+    assert db.query(ChatThread).count() == 0
+    assert db.query(ChatMessage).count() == 0
+
+
+def test_pending_prompt_decides_answer_and_discard():
+    thread = ChatThread(
+        id="t", user_id=1, title="Thread",
+        created_at=datetime(2024, 1, 1), updated_at=datetime(2024, 1, 1),
+    )
+    answered_at = datetime(2024, 1, 2)
+
+    prompt = PendingPrompt(thread_id="t", message_id=3)
+    assert prompt.answer_fields("Hi")["role"] == "assistant"
+    assert prompt.answer_changes(thread, answered_at) == {
+        "last_message_at": answered_at,
+        "updated_at": answered_at,
+    }
+    assert prompt.discarded_thread_id is None
+
+    prompt = PendingPrompt(thread_id="t", message_id=3, file_id=4, discard_thread=True)
+    assert prompt.answer_changes(thread, answered_at)["last_diagram_file_id"] == 4
+    assert prompt.discarded_thread_id == "t"
+
+
+def test_identical_files_share_one_blob(db):
+    chat_service = ChatService(db)
+    thread = chat_service.create_thread(user_id=1, title="Thread", commit=True)
+    diagram = "@startuml\n" + "class A {\n  +x: int\n}\n" * 50 + "@enduml"
+
+    for name in ("first.puml", "second.puml"):
+        message = chat_service.record_message(
+            user_id=1, thread_id=thread.id, role="user", content="Here"
+        )
+        chat_service.record_file(
+            user_id=1, message_id=message.id, file_content=diagram, file_name=name
+        )
+    db.commit()
+
+    assert db.query(ChatFiles).count() == 2
+    blob = db.query(ChatFileBlob).one()
+    assert blob.compression == "zlib"
+    assert len(blob.data) < blob.size
+    assert [f.file_content for f in db.query(ChatFiles)] == [diagram, diagram]
+
+
+def test_deleting_a_thread_drops_blobs_only_it_used(db, monkeypatch):
+    _mock_ai(monkeypatch, reply="Done")
+    chat_service = ChatService(db)
+    shared, own = "@startuml\nclass Shared\n@enduml", "@startuml\nclass Own\n@enduml"
+
+    kept, _ = chat_service.create_new_thread_with_prompt(
+        user_id=1, title="Kept", prompt_message="Hi", prompt_file=shared, prompt_file_name="a.puml"
+    )
+    deleted, _ = chat_service.create_new_thread_with_prompt(
+        user_id=1, title="Deleted", prompt_message="Hi", prompt_file=shared, prompt_file_name="a.puml"
+    )
+    chat_service.prompt_message(
+        user_id=1, thread_id=deleted.id, prompt_message="More", prompt_file=own, prompt_file_name="b.puml"
+    )
+
+    chat_service.delete_thread(user_id=1, thread_id=deleted.id, commit=True)
+
+    assert db.query(ChatMessage).filter_by(thread_id=deleted.id).count() == 0
+    assert db.query(ChatFiles).count() == 1
+    assert [blob.hash for blob in db.query(ChatFileBlob)] == [ChatFileBlob.compute_hash(shared)]
+
+
+def test_blob_codec_is_checked(monkeypatch):
+    check_codec("zlib")
+    with pytest.raises(ValueError):
+        check_codec("lz4")
+
+    monkeypatch.setitem(sys.modules, "zstandard", None)
+    with pytest.raises(RuntimeError):
+        check_codec("zstd")
+
+
+def test_message_pages_follow_cursor(db):
+    chat_service = ChatService(db)
+    thread = chat_service.create_thread(user_id=1, title="Thread", commit=True)
+    for i in range(5):
+        chat_service.record_message(
+            user_id=1, thread_id=thread.id, role="user", content=f"message {i}"
+        )
+    db.commit()
+
+    repo = ChatMessageRepository(db)
+    contents, cursor = [], None
+    while True:
+        page, cursor = repo.get_page_by_thread_id(thread.id, limit=2, cursor=cursor)
+        assert len(page) <= 2
+        contents += [m.content for m in page]
+        if cursor is None:
+            break
+
+    assert contents == [f"message {i}" for i in range(5)]
@@ -0,0 +1,54 @@
+import pytest
+
+from app.services.shrinking_algorithms.community_algorithm import CommunitySummaryAlgorithm
+
+
+def _diagram():
+    """Two five-class cliques joined by the edge A0 -> B0."""
+    names = [f"{group}{i}" for group in "AB" for i in range(5)]
+    edges = [
+        {"source": f"{group}{i}", "target": f"{group}{j}", "relation": "association"}
+        for group in "AB"
+        for i in range(5)
+        for j in range(i + 1, 5)
+    ]
+    edges.append({"source": "A0", "target": "B0", "relation": "dependency-right"})
+    return {
+        "classes": {name: {"id": i, "attributes": [], "methods": []} for i, name in enumerate(names)},
+        "edges": edges,
+    }
+
+
+@pytest.mark.parametrize("method", ["label_propagation", "louvain"])
+def test_keeps_representatives_and_bridge(method):
+    alg = CommunitySummaryAlgorithm()
+    alg.initialize(method=method, target_ratio=0.2, seed=0)
+
+    reduced = alg.compute(_diagram())
+
+    assert sorted(sorted(c) for c in alg.communities) == [list(range(5)), list(range(5, 10))]
+    assert set(reduced["classes"]) == {"A0", "B0"}
+    assert reduced["edges"] == [{"source": "A0", "target": "B0", "relation": "dependency-right"}]
+
+
+def test_fills_up_to_target_size():
+    alg = CommunitySummaryAlgorithm()
+    alg.initialize(target_ratio=0.6)
+
+    reduced = alg.compute(_diagram())
+
+    assert len(reduced["classes"]) == 6
+    assert {name[0] for name in reduced["classes"]} == {"A", "B"}
+    for edge in reduced["edges"]:
+        assert edge["source"] in reduced["classes"] and edge["target"] in reduced["classes"]
+
+
+def test_empty_diagram_reports_no_seed():
+    alg = CommunitySummaryAlgorithm()
+    alg.initialize(method="louvain")
+    alg.compute(_diagram())
+
+    reduced = alg.compute({"classes": {}, "edges": []})
+
+    assert reduced == {"classes": {}, "edges": []}
+    assert alg.last_seed is None
@@ -0,0 +1,169 @@
+import networkx as nx
+import numpy as np
+import pytest
+
+from embedding.embedding import (
+    CompactGraph,
+    uml_dict_to_graph,
+    embed_graph_structural,
+    embed_graphs_structural,
+    embed_subgraphs_from_vectors,
+    node2vec_vectors,
+)
+from embedding.embedding import graph_builder
+from embedding.embedding.graph_builder import _compact_betweenness, centrality_rank_vector, cycle_rank
+from embedding.embedding.seeded_node2vec import SeededNode2Vec
+
+
+def _random_diagram(rng, classes):
+    names = [f"C{i}" for i in range(classes)]
+    edges = [
+        {"source": names[rng.integers(classes)], "target": names[rng.integers(classes)]}
+        for _ in range(int(rng.integers(0, 3 * classes + 1)))
+    ]
+    uml = {"classes": {name: {"id": name} for name in names}, "edges": edges}
+
+    kept = {name for name in names if rng.random() < 0.7}
+    reduced = {
+        "classes": {name: uml["classes"][name] for name in names if name in kept},
+        "edges": [
+            e for e in edges
+            if e["source"] in kept and e["target"] in kept and rng.random() < 0.7
+        ],
+    }
+    return uml, reduced
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_compact_metrics_match_networkx(seed):
+    rng = np.random.default_rng(seed)
+    uml, reduced = _random_diagram(rng, classes=int(rng.integers(1, 30)))
+
+    G = uml_dict_to_graph(reduced)
+    compact = CompactGraph.from_uml(uml)
+    subgraph = compact.subgraph(*compact.masks_from_uml(reduced))
+
+    assert subgraph.number_of_nodes() == G.number_of_nodes()
+    assert subgraph.number_of_edges() == G.number_of_edges()
+    assert np.allclose(embed_graph_structural(subgraph), embed_graph_structural(G))
+
+    if len(G):
+        expected = nx.betweenness_centrality(G, normalized=True)
+        assert np.allclose(
+            _compact_betweenness(subgraph, subgraph.nodes()),
+            [expected[node] for node in sorted(expected)],
+        )
+
+
+def _complete_digraph_edges(n):
+    return [(u, v) for u in range(n) for v in range(n) if u != v]
+
+
+@pytest.mark.parametrize("nodes, edges, expected", [
+    (4, [(0, 1), (1, 2), (0, 2), (2, 3)], 0),
+    (2, [(0, 0), (0, 1)], 1),
+    (3, [(0, 1), (1, 2), (2, 0)], 1),
+    # a 3-cycle and a 2-cycle joined by an edge that is on no cycle
+    (5, [(0, 1), (1, 2), (2, 0), (2, 3), (3, 4), (4, 3)], 2),
+    # far too many simple cycles to enumerate
+    (30, _complete_digraph_edges(30), 30 * 29 - 30 + 1),
+])
+def test_cycle_rank_known_values(nodes, edges, expected):
+    G = nx.DiGraph()
+    G.add_nodes_from(range(nodes))
+    G.add_edges_from(edges)
+    src, dst = zip(*edges)
+    compact = CompactGraph([f"C{i}" for i in range(nodes)], src, dst)
+
+    assert cycle_rank(G) == expected
+    assert cycle_rank(compact.subgraph()) == expected
+
+
+def test_cycle_rank_of_undirected_graphs():
+    # a triangle and a separate edge
+    G = nx.Graph([(0, 1), (1, 2), (2, 0), (3, 4)])
+
+    assert cycle_rank(G) == 1
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_sampled_betweenness_matches_across_graph_types(monkeypatch, seed):
+    monkeypatch.setattr(graph_builder, "EXACT_BETWEENNESS_MAX_NODES", 10)
+    rng = np.random.default_rng(seed)
+    uml, reduced = _random_diagram(rng, classes=40)
+
+    G = uml_dict_to_graph(reduced)
+    compact = CompactGraph.from_uml(uml)
+    subgraph = compact.subgraph(*compact.masks_from_uml(reduced))
+    assert len(G) > 10
+
+    sampled = centrality_rank_vector(G, pivots=5, seed=3)
+
+    assert np.array_equal(sampled, centrality_rank_vector(G, pivots=5, seed=3))
+    assert np.allclose(sampled, centrality_rank_vector(subgraph, pivots=5, seed=3))
+    assert not np.allclose(sampled, centrality_rank_vector(G, exact_max_nodes=len(G)))
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_batched_embeddings_match_single(seed):
+    rng = np.random.default_rng(seed)
+    classes = int(rng.integers(1, 30))
+    compact = CompactGraph(
+        [f"C{i}" for i in range(classes)],
+        src=rng.integers(classes, size=2 * classes),
+        dst=rng.integers(classes, size=2 * classes),
+    )
+    node_masks = rng.random((6, classes)) < 0.7
+    edge_masks = rng.random((6, compact.number_of_edges())) < 0.7
+
+    batched = embed_graphs_structural(compact, node_masks, edge_masks)
+
+    assert batched.shape == (6, 17)
+    for row, node_mask, edge_mask in zip(batched, node_masks, edge_masks):
+        assert np.allclose(row, embed_graph_structural(compact.subgraph(node_mask, edge_mask)))
+
+
+def test_subgraph_drops_edges_of_excluded_nodes():
+    compact = CompactGraph(["A", "B", "C"], src=[0, 1, 1], dst=[1, 2, 2])
+
+    subgraph = compact.subgraph(node_mask=np.array([True, True, False]))
+
+    assert compact.number_of_edges() == 2  # parallel edges are merged
+    assert subgraph.number_of_edges() == 1
+    assert list(subgraph.degrees()) == [1, 1]
+
+
+def test_subgraph_embeddings_average_node_vectors():
+    vectors = np.array([[1.0, 0.0], [0.0, 1.0], [1.0, 1.0]])
+    masks = np.array([[True, True, False], [False, False, True], [False, False, False]])
+
+    embeddings = embed_subgraphs_from_vectors(vectors, masks)
+
+    assert np.allclose(embeddings, [[0.5, 0.5], [1.0, 1.0], [0.0, 0.0]])
+
+
+def test_seeded_node2vec_is_reproducible():
+    G = nx.DiGraph([(0, 1), (1, 2), (2, 0), (2, 3)])
+
+    first = node2vec_vectors(G, dimensions=8, walk_length=5, num_walks=5, seed=7)
+    second = node2vec_vectors(G, dimensions=8, walk_length=5, num_walks=5, seed=7)
+
+    assert np.array_equal(first, second)
+
+
+def test_seeded_node2vec_walks_are_reproducible():
+    # SeededNode2Vec reimplements a private node2vec method, this catches
+    # library changes that break the walks or their seeding
+    G = nx.DiGraph([(0, 1), (1, 2), (2, 0), (2, 3), (3, 1)])
+
+    def walks(seed):
+        return SeededNode2Vec(G, seed, walk_length=6, num_walks=4, quiet=True).walks
+
+    first = walks(3)
+
+    assert first == walks(3)
+    assert first != walks(4)
+    assert len(first) == 4 * len(G)
+    for walk in first:
+        assert len(walk) == 6
+        assert all(G.has_edge(int(a), int(b)) for a, b in zip(walk, walk[1:]))
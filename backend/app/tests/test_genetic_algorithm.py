@@ -0,0 +1,146 @@
+from app.services.shrinking_algorithms.base import Budget
+from app.services.shrinking_algorithms.genetic_algorithm import GeneticAlgorithm
+
+
+def _diagram(classes=12):
+    names = [f"C{i}" for i in range(classes)]
+    return {
+        "classes": {
+            name: {
+                "id": i,
+                "attributes": [{"name": "x", "visibility": "public", "datatype": "int"}],
+                "methods": [],
+            }
+            for i, name in enumerate(names)
+        },
+        "edges": [
+            {"source": names[i], "target": names[(i * 7 + 3) % classes], "relation": "dependency-right"}
+            for i in range(classes)
+        ],
+    }
+
+
+def test_each_generation_evaluates_only_non_elite_offspring(monkeypatch):
+    ga = GeneticAlgorithm()
+    ga.initialize(population_size=10, generations=4, elitism=3, embedding="structural", seed=0)
+
+    evaluated = []
+    evaluate = ga.evaluate_population
+    monkeypatch.setattr(ga, "evaluate_population", lambda pop: evaluated.append(len(pop)) or evaluate(pop))
+
+    reduced = ga.compute(_diagram())
+
+    assert evaluated == [10] + [7] * 4
+    assert set(reduced["classes"]) <= set(_diagram()["classes"])
+
+
+def test_elite_is_carried_over_unchanged():
+    ga = GeneticAlgorithm()
+    ga.initialize(population_size=8, generations=1, elitism=1, embedding="structural", seed=1)
+    ga.PUML = _diagram()
+    ga.compute(ga.PUML)
+
+    population = ga.random_population()
+    fitness = ga.evaluate_population(population)
+    best = population[int(fitness.argmax())]
+
+    next_population, next_fitness = ga.evolve(population, 1, fitness)
+
+    assert next_population[0] == best
+    assert next_fitness[0] == fitness.max()
+
+
+def test_decode_masks_match_decoded_diagrams():
+    diagram = _diagram()
+    diagram["edges"].append({"source": "C0", "target": "Unknown", "relation": "dependency-right"})
+    ga = GeneticAlgorithm()
+    ga.initialize(population_size=4, generations=1, embedding="structural", seed=2)
+    ga.compute(diagram)
+
+    population = ga.random_population()
+    node_masks, edge_masks = ga.decode_masks(population)
+
+    for individual, node_mask, edge_mask in zip(population, node_masks, edge_masks):
+        expected_nodes, expected_edges = ga.compact_graph.masks_from_uml(ga.decode_individual(individual))
+        assert (node_mask == expected_nodes).all()
+        assert (edge_mask == expected_edges).all()
+
+
+def test_evaluation_budget_stops_evolution_early():
+    ga = GeneticAlgorithm()
+    ga.initialize(population_size=10, generations=50, elitism=2, embedding="structural", seed=3)
+
+    budget = Budget(max_evaluations=30)
+    reduced = ga.compute(_diagram(), budget=budget)
+
+    # initial population plus two generations of 8 offspring
+    assert budget.evaluations == 26
+    assert set(reduced["classes"]) <= set(_diagram()["classes"])
+
+
+def test_expired_time_budget_returns_best_of_initial_population():
+    ga = GeneticAlgorithm()
+    ga.initialize(population_size=6, generations=50, embedding="structural", seed=4)
+
+    budget = Budget(max_seconds=0)
+    ga.compute(_diagram(), budget=budget)
+
+    assert budget.evaluations == 6
+    assert ga.best_individual is not None
+
+
+def test_same_seed_gives_same_diagram():
+    def run(seed):
+        ga = GeneticAlgorithm()
+        ga.initialize(population_size=8, generations=5, embedding="structural", seed=seed)
+        return ga.compute(_diagram()), ga.last_seed
+
+    first, first_seed = run(42)
+    second, second_seed = run(42)
+
+    assert first == second
+    assert first_seed == second_seed == 42
+
+    _, drawn = run(None)
+    assert drawn is not None
+
+
+def test_islands_are_reproducible_and_respect_the_evaluation_cap():
+    def run():
+        ga = GeneticAlgorithm()
+        ga.initialize(
+            population_size=6, generations=20, elitism=1, islands=2, migration_interval=3,
+            embedding="structural", seed=11,
+        )
+        budget = Budget(max_evaluations=40)
+        reduced = ga.compute(_diagram(), budget=budget)
+        return reduced, ga.best_fitness, budget.evaluations
+
+    first, first_fitness, evaluations = run()
+    second, second_fitness, _ = run()
+
+    assert first == second and first_fitness == second_fitness
+    # two islands of 6 plus two generations of 5 offspring each, then the
+    # remaining 8 evaluations do not fit another generation on both islands
+    assert evaluations == 32
+
+
+def test_node2vec_checks_the_deadline_per_individual():
+    ga = GeneticAlgorithm()
+    ga.initialize(population_size=4, generations=3, embedding="node2vec", seed=5)
+
+    budget = Budget(max_seconds=0)
+    ga.compute(_diagram(), budget=budget)
+
+    assert budget.evaluations == 1
+    assert ga.best_individual is not None
+
+
+def test_node2vec_stops_at_the_evaluation_cap():
+    ga = GeneticAlgorithm()
+    ga.initialize(population_size=4, generations=3, embedding="node2vec", seed=5)
+
+    budget = Budget(max_evaluations=2)
+    ga.compute(_diagram(), budget=budget)
+
+    assert budget.evaluations == 2
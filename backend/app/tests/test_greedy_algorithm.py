@@ -0,0 +1,60 @@
+import pytest
+
+from app.services.shrinking_algorithms.greedy_algorithm import GreedyImportanceAlgorithm
+
+
+def _member(name, visibility="public"):
+    return {"name": name, "visibility": visibility, "datatype": "int"}
+
+
+def _diagram():
+    return {
+        "classes": {
+            "Hub": {"id": 0, "attributes": [_member("a"), _member("b", "private")], "methods": []},
+            "Base": {"id": 1, "attributes": [_member("c")], "methods": []},
+            "Leaf": {"id": 2, "attributes": [_member("d", "private")], "methods": []},
+            "Island": {"id": 3, "attributes": [], "methods": []},
+        },
+        "edges": [
+            {"source": "Hub", "target": "Base", "relation": "extension-right"},
+            {"source": "Hub", "target": "Leaf", "relation": "dependency-right"},
+            {"source": "Base", "target": "Leaf", "relation": "association"},
+        ],
+    }
+
+
+def _size(diagram):
+    return len(diagram["classes"]) + len(diagram["edges"]) + sum(
+        len(info["attributes"]) + len(info["methods"]) for info in diagram["classes"].values()
+    )
+
+
+@pytest.mark.parametrize("ratio", [0.2, 0.5, 0.8, 1.0])
+def test_shrinks_to_target_ratio(ratio):
+    alg = GreedyImportanceAlgorithm()
+    alg.initialize(target_ratio=ratio)
+
+    reduced = alg.compute(_diagram())
+
+    target = max(1, -(-ratio * _size(_diagram()) // 1))
+    assert _size(reduced) == target
+    for edge in reduced["edges"]:
+        assert edge["source"] in reduced["classes"] and edge["target"] in reduced["classes"]
+
+
+def test_least_important_elements_go_first():
+    alg = GreedyImportanceAlgorithm()
+    alg.initialize(target_ratio=0.5)
+
+    reduced = alg.compute(_diagram())
+
+    assert "Island" not in reduced["classes"]
+    assert "Hub" in reduced["classes"]
+    assert {"source": "Hub", "target": "Base", "relation": "extension-right"} in reduced["edges"]
+    assert [m["name"] for m in reduced["classes"]["Hub"]["attributes"]] == ["a"]
+
+
+def test_rejects_invalid_target_ratio():
+    alg = GreedyImportanceAlgorithm()
+    with pytest.raises(ValueError):
+        alg.initialize(target_ratio=0)
@@ -0,0 +1,24 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+
+# loaded on first use of a shrinking algorithm, never on API startup
+HEAVY_MODULES = ("gensim", "node2vec", "networkx", "scipy")
+
+
+def test_api_startup_does_not_import_algorithm_dependencies():
+    code = (
+        "import json, sys, app.main; "
+        f"print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+    )
+    env = dict(os.environ, OPENAI_API_KEY=os.environ.get("OPENAI_API_KEY", "test"))
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+
+    assert json.loads(result.stdout.strip().splitlines()[-1]) == []
@@ -0,0 +1,58 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main as main_module
+from app.config import settings
+from app.main import app
+from app.services.rate_limiter import TokenBucketRateLimiter
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def logged(monkeypatch):
+    messages = []
+    monkeypatch.setattr(
+        main_module.logger, "log", lambda msg, *args, level="info": messages.append((level, msg))
+    )
+    monkeypatch.setattr(
+        main_module, "log_rate_limiter", TokenBucketRateLimiter(rate_per_second=1, burst=3)
+    )
+    return messages
+
+
+def test_accepts_a_batch_of_records(logged):
+    response = client.post("/api/logs", json=[
+        {"level": "INFO", "message": "first"},
+        {"level": "ERROR", "message": "second", "extra": [1, "two"]},
+    ])
+
+    assert response.status_code == 200
+    assert response.json() == {"status": "ok", "accepted": 2}
+    assert logged == [("INFO", "first"), ("ERROR", "second 1 two")]
+
+
+def test_accepts_a_single_record(logged):
+    response = client.post("/api/logs", json={"level": "DEBUG", "message": "single"})
+
+    assert response.json()["accepted"] == 1
+    assert logged == [("DEBUG", "single")]
+
+
+def test_rejects_oversized_batches(logged, monkeypatch):
+    monkeypatch.setattr(settings, "log_ingest_max_batch", 2)
+
+    response = client.post("/api/logs", json=[{"message": str(i)} for i in range(3)])
+
+    assert response.status_code == 413
+    assert logged == []
+
+
+def test_rate_limited_clients_get_retry_after(logged):
+    assert client.post("/api/logs", json=[{"message": "a"}, {"message": "b"}]).status_code == 200
+
+    response = client.post("/api/logs", json=[{"message": "c"}, {"message": "d"}])
+
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+    assert [msg for _, msg in logged] == ["a", "b"]
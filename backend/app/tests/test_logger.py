@@ -0,0 +1,28 @@
+import logging
+
+from app.util import logger
+
+
+class _Payload:
+    def __init__(self, text):
+        self.text = text
+        self.calls = 0
+
+    def __str__(self):
+        self.calls += 1
+        return self.text
+
+
+def test_truncate_caps_long_payloads():
+    assert str(logger.truncate("short", limit=10)) == "short"
+    assert str(logger.truncate("x" * 25, limit=10)) == "x" * 10 + "... [truncated 15 chars]"
+    assert str(logger.truncate("x" * 25, limit=0)) == "x" * 25
+
+
+def test_disabled_level_skips_formatting(monkeypatch):
+    monkeypatch.setattr(logger._logger, "level", logging.INFO)
+    payload = _Payload("diagram")
+
+    logger.log("Reduced PUML: %s", logger.truncate(payload), level="debug")
+
+    assert payload.calls == 0
@@ -0,0 +1,37 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.warmup import WARMUP_DIAGRAM
+
+client = TestClient(app)
+
+
+def _process(algorithm, settings):
+    return client.post(
+        "/api/processPUML",
+        files={"file": ("diagram.puml", WARMUP_DIAGRAM)},
+        data={"algorithm": algorithm, "settings": settings},
+    )
+
+
+@pytest.mark.parametrize("settings", ["[]", "5", '"text"'])
+def test_settings_must_be_an_object(settings):
+    assert _process("kruskals", settings).status_code == 400
+
+
+def test_budget_is_rejected_by_single_pass_algorithms():
+    response = _process("greedy", json.dumps({"max_seconds": 1}))
+
+    assert response.status_code == 400
+    assert "max_seconds" in response.json()["detail"]
+
+
+def test_shrinks_with_budget():
+    settings = {"population": 4, "iterations": 2, "max_evaluations": 6}
+    response = _process("evol", json.dumps(settings))
+
+    assert response.status_code == 200
+    assert set(response.json()["reduced"]["classes"]) <= {"A", "B", "C"}
@@ -0,0 +1,61 @@
+from sqlalchemy import event
+
+from app.repository.chat_threads_repository import ChatThreadRepository
+from app.repository.chat_messages_repository import ChatMessageRepository
+from app.repository.chat_files_repository import ChatFilesRepository
+
+
+def _query_plans(db, run_query) -> list[str]:
+    """
+    Run a repository call and return the SQLite query plan of every SELECT it issued.
+    """
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    engine = db.get_bind()
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        run_query()
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+    plans = []
+    with engine.connect() as conn:
+        for statement, parameters in statements:
+            rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+            plans.append("\n".join(row[-1] for row in rows))
+    return plans
+
+
+def test_messages_by_thread_use_thread_created_at_index(db):
+    repo = ChatMessageRepository(db)
+    plans = _query_plans(db, lambda: repo.get_by_thread_id("thread", order="ASC"))
+
+    assert "ix_chat_messages_thread_id_created_at" in plans[0]
+    assert "TEMP B-TREE" not in plans[0]
+
+
+def test_threads_by_user_use_user_updated_at_index(db):
+    repo = ChatThreadRepository(db)
+    plans = _query_plans(db, lambda: repo.get_all_by_user_id(1, order="DESC"))
+
+    assert "ix_chat_threads_user_id_updated_at" in plans[0]
+    assert "TEMP B-TREE" not in plans[0]
+
+
+def test_thread_pages_use_user_updated_at_index(db):
+    repo = ChatThreadRepository(db)
+    plans = _query_plans(db, lambda: repo.get_page_by_user_id(1, limit=10, order="DESC"))
+
+    assert "ix_chat_threads_user_id_updated_at" in plans[0]
+    assert "TEMP B-TREE" not in plans[0]
+
+
+def test_files_by_message_use_message_id_index(db):
+    repo = ChatFilesRepository(db)
+    plans = _query_plans(db, lambda: repo.get_by_message_id(1))
+
+    assert "ix_chat_files_message_id" in plans[0]
@@ -0,0 +1,28 @@
+from app.services import rate_limiter as rate_limiter_module
+from app.services.rate_limiter import TokenBucketRateLimiter
+
+
+def test_bucket_refills_over_time(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(rate_limiter_module.time, "monotonic", lambda: now[0])
+    limiter = TokenBucketRateLimiter(rate_per_second=10, burst=100)
+
+    assert limiter.acquire("client", cost=100) == 0
+    assert limiter.acquire("client", cost=20) == 2.0
+    assert limiter.acquire("other", cost=50) == 0  # buckets are per client
+
+    now[0] += 2
+    assert limiter.acquire("client", cost=20) == 0
+
+
+def test_oversized_request_does_not_drain_bucket():
+    limiter = TokenBucketRateLimiter(rate_per_second=10, burst=100)
+
+    assert limiter.acquire("client", cost=101) > 0
+    assert limiter.acquire("client", cost=100) == 0
+
+
+def test_zero_rate_disables_limit():
+    limiter = TokenBucketRateLimiter(rate_per_second=0, burst=0)
+
+    assert limiter.acquire("client", cost=10**6) == 0
@@ -0,0 +1,38 @@
+from datetime import datetime, timedelta
+
+from app.models.refresh_token import RefreshToken
+from app.services.refresh_token_service import (
+    get_active_refresh_token,
+    purge_refresh_tokens,
+    revoke_refresh_token,
+)
+
+
+def _add_token(db, token_hash, expires_in_days=7, revoked=False):
+    db.add(RefreshToken(
+        user_id=1,
+        token_hash=token_hash,
+        expires_at=datetime.utcnow() + timedelta(days=expires_in_days),
+        revoked=revoked,
+    ))
+    db.commit()
+
+
+def test_revoke_refresh_token(db):
+    _add_token(db, "active")
+
+    assert revoke_refresh_token(db, "active")
+    db.commit()
+
+    assert get_active_refresh_token(db, "active") is None
+    assert not revoke_refresh_token(db, "active")
+    assert not revoke_refresh_token(db, "unknown")
+
+
+def test_purge_removes_expired_and_revoked_tokens(db):
+    _add_token(db, "active")
+    _add_token(db, "expired", expires_in_days=-1)
+    _add_token(db, "revoked", revoked=True)
+
+    assert purge_refresh_tokens(db) == 2
+    assert [t.token_hash for t in db.query(RefreshToken)] == ["active"]
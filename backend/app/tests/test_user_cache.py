@@ -0,0 +1,37 @@
+from app.services import user_cache as user_cache_module
+from app.services.user_cache import AuthenticatedUser, UserCache
+
+
+def test_user_cache_evicts_least_recently_used():
+    cache = UserCache(max_size=2, ttl_seconds=60)
+    for user_id in (1, 2):
+        cache.put(AuthenticatedUser(id=user_id, email=f"{user_id}@example.com"))
+
+    assert cache.get(1) is not None  # 1 is now the most recently used
+    cache.put(AuthenticatedUser(id=3, email="3@example.com"))
+
+    assert cache.get(2) is None
+    assert cache.get(1).email == "1@example.com"
+    assert cache.get(3) is not None
+
+
+def test_user_cache_expires_and_invalidates(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(user_cache_module.time, "monotonic", lambda: now[0])
+
+    cache = UserCache(max_size=10, ttl_seconds=60)
+    cache.put(AuthenticatedUser(id=1, email="1@example.com"))
+    cache.put(AuthenticatedUser(id=2, email="2@example.com"))
+
+    cache.invalidate(2)
+    assert cache.get(2) is None
+
+    now[0] += 61
+    assert cache.get(1) is None
+
+
+def test_disabled_user_cache_stores_nothing():
+    cache = UserCache(max_size=10, ttl_seconds=0)
+    cache.put(AuthenticatedUser(id=1, email="1@example.com"))
+
+    assert cache.get(1) is None
@@ -0,0 +1,37 @@
+from app.services import warmup as warmup_module
+from app.services.shrinking_algorithms.registry import AlgorithmRegistry
+from app.services.warmup import parse_algorithm_names, warm_up
+
+
+def test_warm_up_pools_the_instances_requests_use(monkeypatch):
+    registry = AlgorithmRegistry(discover=False, pool_size=1)
+    monkeypatch.setattr(warmup_module, "algorithm_registry", registry)
+
+    warm_up(parse_algorithm_names("evol, Greedy,unknown"))
+
+    for name in ("evol", "greedy"):
+        spec = registry.get(name)
+        [warmed] = registry._pool[(spec.name, "{}")]
+        with registry.acquire(name, spec.parse_settings({})) as alg:
+            assert alg is warmed
+
+
+def test_warm_up_respects_the_budget(monkeypatch):
+    registry = AlgorithmRegistry(discover=False, pool_size=1)
+    monkeypatch.setattr(warmup_module, "algorithm_registry", registry)
+    budgets = []
+
+    genetic = registry.get("genetic").load()
+    compute = genetic.compute
+
+    def spy(self, parsed_puml, budget=None, seed=None):
+        budgets.append(budget)
+        return compute(self, parsed_puml, budget=budget, seed=seed)
+
+    monkeypatch.setattr(genetic, "compute", spy)
+
+    warm_up(["evol"])
+
+    assert len(budgets) == 1
+    assert budgets[0].max_evaluations == warmup_module.WARMUP_EVALUATIONS
+    assert budgets[0].evaluations <= warmup_module.WARMUP_EVALUATIONS
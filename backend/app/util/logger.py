@@ -1,7 +1,9 @@
 from app.config import settings
+import atexit
 import os
 import logging
-from logging.handlers import RotatingFileHandler
+import queue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 
 log_dir = os.path.join(os.getcwd(), "logs")
 os.makedirs(log_dir, exist_ok=True)
@@ -13,23 +15,60 @@ if settings.log_level.upper() == "NONE":
 else:
     _logger.setLevel(getattr(logging, settings.log_level.upper(), logging.INFO))
 
+_LEVELS = {
+    "debug": logging.DEBUG,
+    "info": logging.INFO,
+    "warning": logging.WARNING,
+    "error": logging.ERROR,
+    "critical": logging.CRITICAL,
+}
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """Queues records unformatted so the message is built on the writer thread."""
+
+    def prepare(self, record):
+        return record
+
+
 _handler = RotatingFileHandler(
     os.path.join(log_dir, "app.log"), maxBytes=5 * 1024 * 1024, backupCount=2
 )
 _formatter = logging.Formatter("%(asctime)s [%(levelname)s] %(message)s")
 _handler.setFormatter(_formatter)
-_logger.addHandler(_handler)
-
-
-def log(message, level="info"):
-    level = level.lower()
-    if level == "debug":
-        _logger.debug(message)
-    elif level == "warning":
-        _logger.warning(message)
-    elif level == "error":
-        _logger.error(message)
-    elif level == "critical":
-        _logger.critical(message)
-    else:
-        _logger.info(message)
+
+# request threads only enqueue, disk I/O happens on the listener thread
+_queue = queue.SimpleQueue()
+_listener = QueueListener(_queue, _handler)
+_logger.addHandler(_DeferredQueueHandler(_queue))
+_listener.start()
+atexit.register(_listener.stop)
+
+
+class Truncated:
+    """Lazily stringified payload capped at `limit` characters."""
+
+    __slots__ = ("payload", "limit")
+
+    def __init__(self, payload, limit=None):
+        self.payload = payload
+        self.limit = settings.log_max_payload_chars if limit is None else limit
+
+    def __str__(self):
+        text = str(self.payload)
+        if self.limit <= 0 or len(text) <= self.limit:
+            return text
+        return f"{text[:self.limit]}... [truncated {len(text) - self.limit} chars]"
+
+
+def truncate(payload, limit=None):
+    return Truncated(payload, limit)
+
+
+def log(message, *args, level="info"):
+    """Log `message`, %-formatting it with `args` only if `level` is enabled.
+
+    Arguments are formatted on the writer thread, so they must not be mutated
+    after the call.
+    """
+    _logger.log(_LEVELS.get(level.lower(), logging.INFO), message, *args)
@@ -0,0 +1,67 @@
+"""
+Latency and accuracy of centrality_rank_vector on synthetic diagrams, exact
+betweenness against the sampled (k-pivot) estimate.
+
+Run from the backend directory:
+
+    python -m benchmarks.betweenness --sizes 1000 5000 10000 50000
+"""
+import argparse
+import time
+
+import networkx as nx
+import numpy as np
+
+from embedding.embedding.graph_builder import BETWEENNESS_PIVOTS, centrality_rank_vector
+
+
+def synthetic_diagram(classes: int, seed: int = 0) -> nx.DiGraph:
+    """Scale-free class graph: new classes mostly depend on popular older ones."""
+    rng = np.random.default_rng(seed)
+    undirected = nx.barabasi_albert_graph(classes, 2, seed=seed)
+    G = nx.DiGraph()
+    G.add_nodes_from(undirected)
+    for u, v in undirected.edges():
+        src, tgt = max(u, v), min(u, v)
+        # a few back references so the diagram has cycles
+        if rng.random() < 0.05:
+            src, tgt = tgt, src
+        G.add_edge(src, tgt)
+    return G
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 5_000, 10_000, 50_000])
+    parser.add_argument("--pivots", type=int, default=BETWEENNESS_PIVOTS)
+    parser.add_argument(
+        "--exact-max", type=int, default=5_000,
+        help="largest diagram to also run exact betweenness on (it is O(VE))",
+    )
+    args = parser.parse_args()
+
+    print(f"{'classes':>8}{'sampled (s)':>14}{'exact (s)':>12}{'L1 error':>10}")
+    for classes in args.sizes:
+        G = synthetic_diagram(classes)
+        sampled, sampled_s = timed(
+            lambda: centrality_rank_vector(G, exact_max_nodes=0, pivots=args.pivots)
+        )
+        if classes <= args.exact_max:
+            exact, exact_s = timed(
+                lambda: centrality_rank_vector(G, exact_max_nodes=classes)
+            )
+            exact_col = f"{exact_s:.2f}"
+            error_col = f"{np.abs(exact - sampled).sum():.3f}"
+        else:
+            exact_col = error_col = "-"
+        print(f"{classes:>8}{sampled_s:>14.2f}{exact_col:>12}{error_col:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Reader/writer throughput of the SQLite database with and without the
+connection pragmas from app.db (WAL, synchronous=NORMAL, busy_timeout, ...).
+
+Run from the backend directory:
+
+    python -m benchmarks.db_concurrency --writers 4 --readers 8 --seconds 5
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.exc import OperationalError
+
+from app.db import set_sqlite_pragmas
+
+
+SCHEMA = """
+CREATE TABLE messages (
+    id INTEGER PRIMARY KEY,
+    thread_id TEXT NOT NULL,
+    content TEXT NOT NULL
+)
+"""
+
+
+def _make_engine(path: str, tuned: bool):
+    engine = create_engine(
+        f"sqlite:///{path}",
+        connect_args={"check_same_thread": False},
+        pool_size=32,
+    )
+    if tuned:
+        event.listen(engine, "connect", set_sqlite_pragmas)
+    return engine
+
+
+def _writer(engine, stop, stats, index):
+    ops = errors = 0
+    while not stop.is_set():
+        try:
+            with engine.begin() as conn:
+                conn.execute(
+                    text("INSERT INTO messages (thread_id, content) VALUES (:t, :c)"),
+                    {"t": f"thread-{index}", "c": "x" * 256},
+                )
+            ops += 1
+        except OperationalError:
+            errors += 1
+    stats.append(("write", ops, errors))
+
+
+def _reader(engine, stop, stats, index):
+    ops = errors = 0
+    while not stop.is_set():
+        try:
+            with engine.connect() as conn:
+                conn.execute(
+                    text("SELECT id, content FROM messages WHERE thread_id = :t ORDER BY id DESC LIMIT 50"),
+                    {"t": f"thread-{index % 4}"},
+                ).fetchall()
+            ops += 1
+        except OperationalError:
+            errors += 1
+    stats.append(("read", ops, errors))
+
+
+def run(tuned: bool, writers: int, readers: int, seconds: float) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = _make_engine(os.path.join(tmp, "bench.db"), tuned)
+        with engine.begin() as conn:
+            conn.execute(text(SCHEMA))
+
+        stop = threading.Event()
+        stats = []
+        threads = [
+            threading.Thread(target=_writer, args=(engine, stop, stats, i)) for i in range(writers)
+        ] + [
+            threading.Thread(target=_reader, args=(engine, stop, stats, i)) for i in range(readers)
+        ]
+
+        for t in threads:
+            t.start()
+        time.sleep(seconds)
+        stop.set()
+        for t in threads:
+            t.join()
+        engine.dispose()
+
+    result = {"write": 0, "read": 0, "errors": 0}
+    for kind, ops, errors in stats:
+        result[kind] += ops
+        result["errors"] += errors
+    return {
+        "writes/s": result["write"] / seconds,
+        "reads/s": result["read"] / seconds,
+        "errors": result["errors"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    print(f"{args.writers} writers, {args.readers} readers, {args.seconds}s per run")
+    print(f"{'mode':<10}{'writes/s':>12}{'reads/s':>12}{'errors':>10}")
+    for name, tuned in (("default", False), ("tuned", True)):
+        r = run(tuned, args.writers, args.readers, args.seconds)
+        print(f"{name:<10}{r['writes/s']:>12.0f}{r['reads/s']:>12.0f}{r['errors']:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Cold-start import time of the API and of the shrinking algorithms, measured
+with ``python -X importtime`` in fresh interpreters.
+
+Run from the backend directory:
+
+    python -m benchmarks.import_time --repeat 5
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+TARGETS = {
+    "app.main": "import app.main",
+    "kruskal": "import app.main; from app.services.shrinking_algorithms.factory import get_algorithm; get_algorithm('kruskal')",
+    "genetic": "import app.main; from app.services.shrinking_algorithms.factory import get_algorithm; get_algorithm('genetic')",
+}
+
+_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+
+def cumulative_us(code: str, depth: int = 0) -> dict[str, int]:
+    """Cumulative import time of the imports `code` makes at nesting `depth`."""
+    env = dict(os.environ, OPENAI_API_KEY=os.environ.get("OPENAI_API_KEY", "benchmark"))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        env=env, capture_output=True, text=True, check=True,
+    )
+    times = {}
+    for match in _LINE.finditer(result.stderr):
+        _, cumulative, indent, module = match.groups()
+        if (len(indent) - 1) // 2 == depth:
+            times[module] = int(cumulative)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=5, help="number of slowest app.main imports to list")
+    args = parser.parse_args()
+
+    print(f"{'target':>10}{'median total (ms)':>20}")
+    for name, code in TARGETS.items():
+        runs = [cumulative_us(code) for _ in range(args.repeat)]
+        totals = [sum(times.values()) / 1000 for times in runs]
+        print(f"{name:>10}{statistics.median(totals):>20.0f}")
+
+    slowest = sorted(cumulative_us(TARGETS["app.main"], depth=1).items(), key=lambda kv: -kv[1])
+    print("\nslowest imports made by app.main:")
+    for module, us in slowest[:args.top]:
+        print(f"  {module:<50}{us / 1000:>8.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
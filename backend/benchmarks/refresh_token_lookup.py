@@ -0,0 +1,97 @@
+"""
+Latency of the /auth/refresh token lookup as the refresh_tokens table grows,
+with and without the unique index on token_hash.
+
+Run from the backend directory:
+
+    python -m benchmarks.refresh_token_lookup --sizes 10000 100000 1000000
+"""
+import argparse
+import os
+import secrets
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from app.db import Base
+from app.models.user import User
+from app.models.refresh_token import RefreshToken
+from app.services.jwt_service import hash_refresh_token
+from app.services.refresh_token_service import get_active_refresh_token
+
+
+def _fill(engine, rows: int, batch: int = 50_000) -> list[str]:
+    """Insert random tokens and return a sample of hashes spread over the table."""
+    expires = datetime.utcnow() + timedelta(days=7)
+    sample = []
+    with engine.begin() as conn:
+        for start in range(0, rows, batch):
+            values = []
+            for _ in range(min(batch, rows - start)):
+                token_hash = hash_refresh_token(secrets.token_urlsafe(64))
+                values.append({"user_id": 1, "token_hash": token_hash, "expires_at": expires})
+            sample.extend(v["token_hash"] for v in values[-10:])
+            conn.execute(
+                text(
+                    "INSERT INTO refresh_tokens (user_id, token_hash, created_at, expires_at, revoked) "
+                    "VALUES (:user_id, :token_hash, CURRENT_TIMESTAMP, :expires_at, 0)"
+                ),
+                values,
+            )
+    return sample
+
+
+def _lookup_latency_us(engine, hashes: list[str], repeat: int) -> float:
+    """Median latency of get_active_refresh_token in microseconds."""
+    Session = sessionmaker(bind=engine)
+    timings = []
+    with Session() as db:
+        for i in range(repeat):
+            token_hash = hashes[i % len(hashes)]
+            start = time.perf_counter()
+            token = get_active_refresh_token(db, token_hash)
+            timings.append(time.perf_counter() - start)
+            assert token is not None
+            db.expunge_all()
+    return statistics.median(timings) * 1e6
+
+
+def run(rows: int, indexed: bool, repeat: int) -> float:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(engine, tables=[User.__table__, RefreshToken.__table__])
+        if not indexed:
+            with engine.begin() as conn:
+                conn.execute(text("DROP INDEX ix_refresh_tokens_token_hash"))
+        hashes = _fill(engine, rows)
+        latency = _lookup_latency_us(engine, hashes, repeat)
+        engine.dispose()
+    return latency
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument(
+        "--unindexed-max", type=int, default=100_000,
+        help="largest table size to also run without the index (full scans are slow)",
+    )
+    args = parser.parse_args()
+
+    print(f"{'rows':>10}{'indexed (us)':>16}{'no index (us)':>16}")
+    for rows in args.sizes:
+        indexed = run(rows, indexed=True, repeat=args.repeat)
+        if rows <= args.unindexed_max:
+            unindexed = f"{run(rows, indexed=False, repeat=min(args.repeat, 50)):.0f}"
+        else:
+            unindexed = "-"
+        print(f"{rows:>10}{indexed:>16.0f}{unindexed:>16}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Shrinking algorithms on synthetic large diagrams: latency, kept classes and
+edges, and how many of the planted class clusters survive the shrink.
+
+Run from the backend directory:
+
+    python -m benchmarks.shrinking_algorithms --sizes 1000 5000 20000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from app.services.shrinking_algorithms.factory import get_algorithm
+
+RELATIONS = ["dependency-right", "extension-right", "composition-right", "association"]
+
+
+def synthetic_diagram(classes: int, cluster_size: int = 40, seed: int = 0):
+    """
+    Parsed-PUML dict of `classes` classes in clusters of about `cluster_size`.
+    Each class has a few relations inside its cluster and one in twenty
+    relations crosses to another cluster. Returns the diagram and the
+    cluster of each class.
+    """
+    rng = np.random.default_rng(seed)
+    names = [f"C{i}" for i in range(classes)]
+    cluster = np.arange(classes) // cluster_size
+    clusters = int(cluster.max()) + 1
+
+    diagram = {
+        "classes": {
+            name: {
+                "id": i,
+                "attributes": [
+                    {"name": f"a{j}", "visibility": "private", "datatype": "int"}
+                    for j in range(int(rng.integers(0, 4)))
+                ],
+                "methods": [
+                    {"name": f"m{j}", "visibility": "public", "signature": f"m{j}()"}
+                    for j in range(int(rng.integers(0, 4)))
+                ],
+            }
+            for i, name in enumerate(names)
+        },
+        "edges": [],
+    }
+
+    for i in range(classes):
+        for _ in range(3):
+            if rng.random() < 0.05:
+                other = int(rng.integers(clusters))
+            else:
+                other = int(cluster[i])
+            members = np.flatnonzero(cluster == other)
+            j = int(rng.choice(members))
+            if j != i:
+                diagram["edges"].append({
+                    "source": names[i],
+                    "target": names[j],
+                    "relation": RELATIONS[int(rng.integers(len(RELATIONS)))],
+                })
+
+    return diagram, {name: int(cluster[i]) for i, name in enumerate(names)}
+
+
+def run(name, params, diagram):
+    alg = get_algorithm(name)
+    alg.initialize(**params)
+    start = time.perf_counter()
+    reduced = alg.compute(diagram)
+    return reduced, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 5_000, 20_000])
+    parser.add_argument("--target-ratio", type=float, default=0.2)
+    parser.add_argument(
+        "--ga-max", type=int, default=1_000,
+        help="largest diagram to also run the genetic algorithm on",
+    )
+    args = parser.parse_args()
+
+    algorithms = [
+        ("kruskal", "kruskal", {}),
+        ("genetic", "genetic", {"population_size": 20, "generations": 10,
+                                "embedding": "structural", "seed": 0}),
+        ("greedy", "greedy", {"target_ratio": args.target_ratio}),
+        ("community/lpa", "community", {"method": "label_propagation",
+                                        "target_ratio": args.target_ratio}),
+        ("community/louvain", "community", {"method": "louvain",
+                                            "target_ratio": args.target_ratio, "seed": 0}),
+    ]
+
+    print(f"{'classes':>8}  {'algorithm':<18}{'time (s)':>10}{'classes':>9}{'edges':>8}{'clusters':>10}")
+    for classes in args.sizes:
+        diagram, cluster = synthetic_diagram(classes)
+        clusters = len(set(cluster.values()))
+        for label, name, params in algorithms:
+            if name == "genetic" and classes > args.ga_max:
+                continue
+            reduced, seconds = run(name, params, diagram)
+            covered = len({cluster[c] for c in reduced["classes"]})
+            print(
+                f"{classes:>8}  {label:<18}{seconds:>10.2f}{len(reduced['classes']):>9}"
+                f"{len(reduced['edges']):>8}{f'{covered}/{clusters}':>10}"
+            )
+
+
+if __name__ == "__main__":
+    main()
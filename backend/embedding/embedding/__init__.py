@@ -1,4 +1,21 @@
 from .graph_builder import uml_dict_to_graph
-from .embedding import embed_graph_structural, embed_graph
+from .compact_graph import CompactBatch, CompactGraph, CompactSubgraph
+from .embedding import (
+    embed_graph_structural,
+    embed_graph,
+    embed_graphs_structural,
+    embed_subgraphs_from_vectors,
+    node2vec_vectors,
+)
 
-__all__ = ["embed_graph_structural", "uml_dict_to_graph", "embed_graph"]
+__all__ = [
+    "embed_graph_structural",
+    "embed_graphs_structural",
+    "uml_dict_to_graph",
+    "embed_graph",
+    "embed_subgraphs_from_vectors",
+    "node2vec_vectors",
+    "CompactGraph",
+    "CompactSubgraph",
+    "CompactBatch",
+]
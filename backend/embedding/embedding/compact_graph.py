@@ -0,0 +1,235 @@
+import networkx as nx
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import connected_components
+
+
+class CompactGraph:
+    """
+    Directed class graph stored as edge arrays, built once per diagram.
+
+    Nodes are numbered ``0..n-1`` in class order and parallel edges are merged,
+    matching `uml_dict_to_graph`. Subgraphs (e.g. GA candidates) are selected
+    with boolean node/edge masks through `subgraph`, which copies nothing.
+
+    :param names: Class names, one per node.
+    :param src: Source node of each edge.
+    :param dst: Target node of each edge.
+    """
+
+    def __init__(self, names, src, dst):
+        self.names = list(names)
+        self.name_to_id = {name: i for i, name in enumerate(self.names)}
+
+        pairs = np.unique(
+            np.column_stack([
+                np.asarray(src, dtype=np.int64),
+                np.asarray(dst, dtype=np.int64),
+            ]).reshape(-1, 2),
+            axis=0,
+        )
+        self.src = pairs[:, 0]
+        self.dst = pairs[:, 1]
+        self.edge_to_id = {
+            (int(s), int(t)): i for i, (s, t) in enumerate(zip(self.src, self.dst))
+        }
+
+    @classmethod
+    def from_uml(cls, uml: dict) -> "CompactGraph":
+        """
+        Builds the graph from a parsed UML dictionary (see `uml_dict_to_graph`).
+        Edges whose source or target is not a known class are skipped.
+        """
+        names = list(uml.get("classes", {}).keys())
+        name_to_id = {name: i for i, name in enumerate(names)}
+
+        src, dst = [], []
+        for edge in uml.get("edges", []):
+            s = name_to_id.get(edge["source"])
+            t = name_to_id.get(edge["target"])
+            if s is not None and t is not None:
+                src.append(s)
+                dst.append(t)
+
+        return cls(names, src, dst)
+
+    def number_of_nodes(self) -> int:
+        return len(self.names)
+
+    def number_of_edges(self) -> int:
+        return len(self.src)
+
+    def masks_from_uml(self, uml: dict):
+        """
+        Node and edge masks selecting the classes and edges of `uml`, a
+        reduced version of the diagram this graph was built from.
+        """
+        node_mask = np.zeros(self.number_of_nodes(), dtype=bool)
+        edge_mask = np.zeros(self.number_of_edges(), dtype=bool)
+
+        for name in uml.get("classes", {}):
+            node = self.name_to_id.get(name)
+            if node is not None:
+                node_mask[node] = True
+
+        for edge in uml.get("edges", []):
+            s = self.name_to_id.get(edge["source"])
+            t = self.name_to_id.get(edge["target"])
+            edge_id = self.edge_to_id.get((s, t))
+            if edge_id is not None:
+                edge_mask[edge_id] = True
+
+        return node_mask, edge_mask
+
+    def subgraph(self, node_mask=None, edge_mask=None) -> "CompactSubgraph":
+        """
+        View of the graph restricted to the masked nodes and edges. Edges with
+        an excluded endpoint are dropped. Missing masks select everything.
+        """
+        if node_mask is None:
+            node_mask = np.ones(self.number_of_nodes(), dtype=bool)
+        if edge_mask is None:
+            edge_mask = np.ones(self.number_of_edges(), dtype=bool)
+        return CompactSubgraph(self, node_mask, edge_mask)
+
+    def batch(self, node_masks, edge_masks=None) -> "CompactBatch":
+        """
+        Stacks one subgraph per row of `node_masks`/`edge_masks`. Missing
+        edge masks keep every edge between included nodes.
+        """
+        node_masks = np.atleast_2d(node_masks)
+        if edge_masks is None:
+            edge_masks = np.ones((node_masks.shape[0], self.number_of_edges()), dtype=bool)
+        return CompactBatch(self, node_masks, edge_masks)
+
+
+class CompactSubgraph:
+    """
+    Masked view of a `CompactGraph`. Implements the small part of the
+    networkx graph interface the structural metrics need, plus array accessors.
+    Node ids stay those of the full graph.
+    """
+
+    __slots__ = ("graph", "node_mask", "edge_mask")
+
+    def __init__(self, graph: CompactGraph, node_mask, edge_mask):
+        self.graph = graph
+        self.node_mask = np.asarray(node_mask, dtype=bool)
+        self.edge_mask = (
+            np.asarray(edge_mask, dtype=bool)
+            & self.node_mask[graph.src]
+            & self.node_mask[graph.dst]
+        )
+
+    def __len__(self):
+        return self.number_of_nodes()
+
+    def is_directed(self) -> bool:
+        return True
+
+    def number_of_nodes(self) -> int:
+        return int(np.count_nonzero(self.node_mask))
+
+    def number_of_edges(self) -> int:
+        return int(np.count_nonzero(self.edge_mask))
+
+    def nodes(self) -> np.ndarray:
+        return np.flatnonzero(self.node_mask)
+
+    def edges(self):
+        """Source and target arrays of the included edges."""
+        return self.graph.src[self.edge_mask], self.graph.dst[self.edge_mask]
+
+    def degrees(self) -> np.ndarray:
+        """Total degree of each included node (self-loops count twice)."""
+        src, dst = self.edges()
+        n = self.graph.number_of_nodes()
+        degree = np.bincount(src, minlength=n) + np.bincount(dst, minlength=n)
+        return degree[self.node_mask]
+
+    def adjacency(self) -> csr_matrix:
+        """Adjacency matrix over all node ids of the full graph."""
+        src, dst = self.edges()
+        n = self.graph.number_of_nodes()
+        return csr_matrix((np.ones(len(src)), (src, dst)), shape=(n, n))
+
+    def strongly_connected_components(self):
+        """
+        Component label of every node id and the number of labels.
+        Excluded nodes are isolated, so they get labels of their own.
+        """
+        count, labels = connected_components(self.adjacency(), directed=True, connection="strong")
+        return labels, count
+
+    def to_networkx(self) -> nx.DiGraph:
+        G = nx.DiGraph()
+        for node in self.nodes():
+            G.add_node(int(node), label="Class", name=self.graph.names[node])
+        src, dst = self.edges()
+        G.add_edges_from(zip(src.tolist(), dst.tolist()))
+        return G
+
+
+class CompactBatch:
+    """
+    Many masked views of one `CompactGraph`, e.g. a whole GA generation.
+
+    The candidates are laid out as one block-diagonal "union" graph in which
+    node ``v`` of candidate ``c`` has id ``c * n + v``, so graph algorithms
+    (connected components, breadth-first search) run once for all candidates.
+
+    :param node_masks: ``(candidates, nodes)`` boolean matrix.
+    :param edge_masks: ``(candidates, edges)`` boolean matrix, edges with an
+        excluded endpoint are dropped.
+    """
+
+    def __init__(self, graph: CompactGraph, node_masks, edge_masks):
+        self.graph = graph
+        self.node_masks = np.atleast_2d(np.asarray(node_masks, dtype=bool))
+        self.edge_masks = (
+            np.atleast_2d(np.asarray(edge_masks, dtype=bool))
+            & self.node_masks[:, graph.src]
+            & self.node_masks[:, graph.dst]
+        )
+
+        n = graph.number_of_nodes()
+        candidate, edge = np.nonzero(self.edge_masks)
+        self.union_src = candidate * n + graph.src[edge]
+        self.union_dst = candidate * n + graph.dst[edge]
+        self.edge_owner = candidate
+
+    def __len__(self):
+        return self.node_masks.shape[0]
+
+    def number_of_nodes(self) -> np.ndarray:
+        return np.count_nonzero(self.node_masks, axis=1)
+
+    def number_of_edges(self) -> np.ndarray:
+        return np.count_nonzero(self.edge_masks, axis=1)
+
+    def degrees(self) -> np.ndarray:
+        """``(candidates, nodes)`` total degrees, zero for excluded nodes."""
+        size = self.node_masks.size
+        degree = (
+            np.bincount(self.union_src, minlength=size)
+            + np.bincount(self.union_dst, minlength=size)
+        )
+        return degree.reshape(self.node_masks.shape)
+
+    def adjacency(self) -> csr_matrix:
+        """Adjacency matrix of the union graph."""
+        size = self.node_masks.size
+        return csr_matrix(
+            (np.ones(len(self.union_src)), (self.union_src, self.union_dst)),
+            shape=(size, size),
+        )
+
+    def strongly_connected_components(self):
+        """
+        Component label of every union node, the number of labels and the
+        candidate each label belongs to.
+        """
+        count, labels = connected_components(self.adjacency(), directed=True, connection="strong")
+        owner = np.empty(count, dtype=np.int64)
+        owner[labels] = np.repeat(np.arange(len(self)), self.graph.number_of_nodes())
+        return labels, count, owner
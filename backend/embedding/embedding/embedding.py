@@ -1,9 +1,8 @@
-from node2vec import Node2Vec
-
+from embedding.embedding.compact_graph import CompactGraph
 from embedding.embedding.graph_builder import *
 
 
-def embed_graph(G: nx.Graph, dimensions=64, walk_length=30, num_walks=100):
+def embed_graph(G: nx.Graph, dimensions=64, walk_length=30, num_walks=100, seed=None):
     """
     Generates graph embeddings using the Node2Vec algorithm.
 
@@ -15,22 +14,70 @@ def embed_graph(G: nx.Graph, dimensions=64, walk_length=30, num_walks=100):
     :param dimensions: The number of dimensions for the embeddings.
     :param walk_length: The length of each random walk performed during training.
     :param num_walks: The number of random walks per node.
+    :param seed: Seed of the walks and of training, see `node2vec_vectors`.
     :return: A numpy array representing the averaged embedding of the graph nodes.
     """
-    # train node2vec
-    n2v = Node2Vec(G, dimensions=dimensions,
-                   walk_length=walk_length, num_walks=num_walks,
-                   workers=4,
-                   quiet=True)
-    model = n2v.fit(window=10, min_count=1)
+    emb = node2vec_vectors(G, dimensions=dimensions,
+                           walk_length=walk_length, num_walks=num_walks, seed=seed)
+    return np.mean(emb, axis=0)
+
+
+def node2vec_vectors(G: nx.Graph, dimensions=64, walk_length=30, num_walks=100, seed=None):
+    """
+    Trains Node2Vec on `G` once and returns the vector of every node.
+
+    Subgraphs of `G` can then be embedded with `embed_subgraphs_from_vectors`
+    instead of generating walks and training a model for each of them.
+
+    :param G: The input graph as a NetworkX graph object.
+    :param dimensions: The number of dimensions for the embeddings.
+    :param walk_length: The length of each random walk performed during training.
+    :param num_walks: The number of random walks per node.
+    :param seed: With a seed, walks and training run in a single thread from
+        private generators, so the vectors are reproducible and no global
+        random state is touched. Without one, training uses 4 workers.
+    :return: ``(n_nodes, dimensions)`` matrix, rows in ``G.nodes()`` order.
+    """
+    # imported here, node2vec pulls in gensim which is slow to import
+    if seed is None:
+        from node2vec import Node2Vec
+
+        n2v = Node2Vec(G, dimensions=dimensions,
+                       walk_length=walk_length, num_walks=num_walks,
+                       workers=4,
+                       quiet=True)
+        model = n2v.fit(window=10, min_count=1)
+    else:
+        from embedding.embedding.seeded_node2vec import SeededNode2Vec
+
+        n2v = SeededNode2Vec(G, seed, dimensions=dimensions,
+                             walk_length=walk_length, num_walks=num_walks,
+                             quiet=True)
+        model = n2v.fit(window=10, min_count=1, seed=seed)
 
     # create embedding matrix
     node_list = list(G.nodes())
-    emb = np.vstack([model.wv[str(n)] for n in node_list])
-    return np.mean(emb, axis=0)
+    return np.vstack([model.wv[str(n)] for n in node_list])
 
 
-def embed_graph_structural(G: nx.Graph) -> np.ndarray:
+def embed_subgraphs_from_vectors(node_vectors: np.ndarray, node_masks) -> np.ndarray:
+    """
+    Embeds subgraphs as the mean of their nodes' precomputed vectors.
+
+    :param node_vectors: ``(n_nodes, dim)`` matrix, e.g. from `node2vec_vectors`
+        on the full diagram.
+    :param node_masks: ``(n_candidates, n_nodes)`` boolean inclusion matrix.
+    :return: ``(n_candidates, dim)`` matrix, zero rows for empty subgraphs.
+    :rtype: np.ndarray
+    """
+    weights = np.atleast_2d(node_masks).astype(float)
+    counts = weights.sum(axis=1, keepdims=True)
+    return np.divide(weights @ node_vectors, counts,
+                     out=np.zeros((len(weights), node_vectors.shape[1])),
+                     where=counts > 0)
+
+
+def embed_graph_structural(G: nx.Graph, seed=0) -> np.ndarray:
     """
     Generate a structural embedding of a graph by combining various graph
     features that represent its structure. This function extracts features
@@ -38,9 +85,11 @@ def embed_graph_structural(G: nx.Graph) -> np.ndarray:
     strongly connected component size histogram, and centrality-based rank
     vector.
 
-    :param G: A networkx graph instance for which the structural embedding
+    :param G: A networkx graph instance, or a `CompactSubgraph` whose metrics
+              are computed over arrays, for which the structural embedding
               is computed.
-    :type G: nx.Graph
+    :type G: nx.Graph | CompactSubgraph
+    :param seed: Seed of the betweenness pivots of large graphs.
     :return: A concatenated numpy array containing the computed structural
              embeddings of the input graph by combining all extracted
              features.
@@ -51,5 +100,31 @@ def embed_graph_structural(G: nx.Graph) -> np.ndarray:
         np.array([cycle_ratio(G)]),
         np.array([hierarchy_depth(G)]),
         scc_size_histogram(G, bins=5),
-        centrality_rank_vector(G, k=5)
+        centrality_rank_vector(G, k=5, seed=seed)
+    ])
+
+
+def embed_graphs_structural(graph: CompactGraph, node_masks, edge_masks=None, seed=0) -> np.ndarray:
+    """
+    Structural embeddings of many subgraphs of one diagram at once.
+
+    Row ``i`` is the `embed_graph_structural` embedding of
+    ``graph.subgraph(node_masks[i], edge_masks[i])``, but every feature is
+    computed for all candidates together with vectorized operations.
+
+    :param graph: The full diagram.
+    :param node_masks: ``(n_candidates, n_nodes)`` boolean inclusion matrix.
+    :param edge_masks: ``(n_candidates, n_edges)`` boolean inclusion matrix,
+        all edges between included nodes when omitted.
+    :param seed: Seed of the betweenness pivots of large graphs.
+    :return: ``(n_candidates, dim)`` embedding matrix.
+    :rtype: np.ndarray
+    """
+    batch = graph.batch(node_masks, edge_masks)
+    return np.hstack([
+        normalized_degree_histograms(batch, bins=5),
+        cycle_ratios(batch)[:, None],
+        hierarchy_depths(batch)[:, None],
+        scc_size_histograms(batch, bins=5),
+        centrality_rank_vectors(batch, k=5, seed=seed),
     ])
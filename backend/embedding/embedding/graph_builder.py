@@ -1,5 +1,12 @@
 import networkx as nx
 import numpy as np
+from scipy.sparse import csr_matrix
+
+from embedding.embedding.compact_graph import CompactSubgraph
+
+# above this many nodes betweenness centrality is estimated from sampled pivots
+EXACT_BETWEENNESS_MAX_NODES = 1000
+BETWEENNESS_PIVOTS = 256
 
 
 def uml_dict_to_graph(uml: dict) -> nx.DiGraph:
@@ -49,25 +56,65 @@ def uml_dict_to_graph(uml: dict) -> nx.DiGraph:
 
 
 def normalized_degree_histogram(G, bins=5):
-    degrees = [d for _, d in G.degree()]
-    if not degrees:
+    if isinstance(G, CompactSubgraph):
+        degrees = G.degrees()
+    else:
+        degrees = [d for _, d in G.degree()]
+    if len(degrees) == 0:
         return np.zeros(bins)
 
     hist, _ = np.histogram(degrees, bins=bins, range=(0, max(degrees)))
     hist = hist.astype(float)
     return hist / hist.sum()
 
+def cycle_rank(G):
+    """
+    Cyclomatic number of the graph: the number of independent cycles.
+
+    For directed graphs it is summed over the strongly connected components,
+    each contributing ``edges - nodes + 1`` (a self-loop counts as one cycle),
+    so edges between components never add cycles. Runs in O(V + E), unlike
+    enumerating simple cycles which is exponential on dense diagrams.
+    """
+    if isinstance(G, CompactSubgraph):
+        return _compact_cycle_rank(G)
+
+    if not G.is_directed():
+        return G.number_of_edges() - G.number_of_nodes() + nx.number_connected_components(G)
+
+    component_of = {}
+    component_sizes = []
+    for i, scc in enumerate(nx.strongly_connected_components(G)):
+        component_sizes.append(len(scc))
+        for node in scc:
+            component_of[node] = i
+
+    internal_edges = [0] * len(component_sizes)
+    for u, v in G.edges():
+        if component_of[u] == component_of[v]:
+            internal_edges[component_of[u]] += 1
+
+    return sum(
+        edges - size + 1
+        for edges, size in zip(internal_edges, component_sizes)
+        if edges > 0
+    )
+
+def _compact_cycle_rank(G):
+    labels, count = G.strongly_connected_components()
+    src, dst = G.edges()
+    internal = labels[src] == labels[dst]
+
+    internal_edges = np.bincount(labels[src[internal]], minlength=count)
+    component_sizes = np.bincount(labels[G.node_mask], minlength=count)
+    cyclic = internal_edges > 0
+    return int((internal_edges[cyclic] - component_sizes[cyclic] + 1).sum())
+
 def cycle_ratio(G):
     if G.number_of_edges() == 0:
         return 0.0
 
-    try:
-        cycles = nx.simple_cycles(G) if G.is_directed() else nx.cycle_basis(G)
-        num_cycles = len(list(cycles))
-    except Exception:
-        num_cycles = 0
-
-    return min(1.0, num_cycles / G.number_of_edges())
+    return min(1.0, cycle_rank(G) / G.number_of_edges())
 
 def hierarchy_depth(G):
     if G.number_of_nodes() == 0:
@@ -76,6 +123,9 @@ def hierarchy_depth(G):
     if not G.is_directed():
         return 0.0
 
+    if isinstance(G, CompactSubgraph):
+        return _compact_condensation_depth(G) / max(1, G.number_of_nodes())
+
     scc_graph = nx.condensation(G)
 
     if not nx.is_directed_acyclic_graph(scc_graph):
@@ -84,26 +134,91 @@ def hierarchy_depth(G):
     depth = nx.dag_longest_path_length(scc_graph)
     return depth / max(1, G.number_of_nodes())
 
+def _compact_condensation_depth(G):
+    """
+    Longest path length in the condensation of `G`, found by peeling off
+    source components layer by layer (each layer is one step of the path).
+    """
+    labels, count = G.strongly_connected_components()
+    src, dst = G.edges()
+    between = labels[src] != labels[dst]
+    csrc, cdst = labels[src[between]], labels[dst[between]]
+
+    remaining = np.zeros(count, dtype=bool)
+    remaining[labels[G.node_mask]] = True
+    in_degree = np.bincount(cdst, minlength=count)
+
+    layers = 0
+    frontier = remaining & (in_degree == 0)
+    while frontier.any():
+        layers += 1
+        remaining &= ~frontier
+        in_degree -= np.bincount(cdst[frontier[csrc]], minlength=count)
+        frontier = remaining & (in_degree == 0)
+
+    return max(0, layers - 1)
+
 def scc_size_histogram(G, bins=5):
     if not G.is_directed():
         return np.zeros(bins)
 
-    sccs = list(nx.strongly_connected_components(G))
-    sizes = [len(scc) for scc in sccs]
+    if isinstance(G, CompactSubgraph):
+        labels, _ = G.strongly_connected_components()
+        sizes = np.bincount(labels[G.node_mask])
+        sizes = sizes[sizes > 0]
+    else:
+        sizes = [len(scc) for scc in nx.strongly_connected_components(G)]
 
-    if not sizes:
+    if len(sizes) == 0:
         return np.zeros(bins)
 
     hist, _ = np.histogram(sizes, bins=bins, range=(1, max(sizes)))
     hist = hist.astype(float)
     return hist / hist.sum()
 
-def centrality_rank_vector(G, k=5):
+def betweenness_pivots(nodes, pivots=BETWEENNESS_PIVOTS, seed=0):
+    """
+    Sorted sample of ``pivots`` source nodes for sampled betweenness, drawn
+    from the sorted `nodes` with ``seed``. Every betweenness implementation
+    samples through here, so the same nodes and seed give the same pivots
+    whatever the graph type.
+    """
+    nodes = np.sort(np.asarray(nodes))
+    return np.sort(np.random.default_rng(seed).choice(nodes, size=min(pivots, len(nodes)), replace=False))
+
+def centrality_rank_vector(G, k=5, exact_max_nodes=None,
+                           pivots=BETWEENNESS_PIVOTS, seed=0):
+    """
+    Normalized top-k betweenness centralities of the graph.
+
+    Exact betweenness is O(VE), so graphs with more than ``exact_max_nodes``
+    nodes (default EXACT_BETWEENNESS_MAX_NODES) use the sampled estimate from
+    ``pivots`` source nodes instead. The
+    pivots are drawn with ``seed`` (see `betweenness_pivots`), so the result
+    is deterministic and the same for networkx and compact graphs.
+    """
     if G.number_of_nodes() == 0:
         return np.zeros(k)
 
-    centrality = nx.betweenness_centrality(G, normalized=True)
-    ranked = sorted(centrality.values(), reverse=True)
+    if exact_max_nodes is None:
+        exact_max_nodes = EXACT_BETWEENNESS_MAX_NODES
+    sampled = G.number_of_nodes() > exact_max_nodes
+    if isinstance(G, CompactSubgraph):
+        nodes = G.nodes()
+        if sampled:
+            nodes = betweenness_pivots(nodes, pivots, seed)
+        centrality = _compact_betweenness(G, nodes)
+    elif sampled:
+        sources = betweenness_pivots(list(G.nodes()), pivots, seed).tolist()
+        # with every node as a target this is Brandes' betweenness from `sources`
+        centrality = nx.betweenness_centrality_subset(
+            G, sources, list(G.nodes()), normalized=True
+        )
+        scale = G.number_of_nodes() / len(sources)
+        centrality = [value * scale for value in centrality.values()]
+    else:
+        centrality = nx.betweenness_centrality(G, normalized=True).values()
+    ranked = sorted(centrality, reverse=True)
 
     ranked = ranked[:k]
     if len(ranked) < k:
@@ -114,3 +229,225 @@ def centrality_rank_vector(G, k=5):
         return ranked
 
     return ranked / ranked.sum()
+
+def _compact_betweenness(G, sources, chunk_size=256):
+    """
+    Normalized betweenness of the included nodes of `G`, accumulated from
+    `sources` (all nodes for the exact value). Brandes' algorithm with the
+    breadth-first searches of a chunk of sources run together as sparse
+    matrix products, one per BFS level.
+    """
+    nodes = G.nodes()
+    n = len(nodes)
+    position = np.full(G.graph.number_of_nodes(), -1)
+    position[nodes] = np.arange(n)
+
+    src, dst = G.edges()
+    A = csr_matrix((np.ones(len(src)), (position[src], position[dst])), shape=(n, n))
+    A_t = A.T.tocsr()
+
+    betweenness = np.zeros(n)
+    for start in range(0, len(sources), chunk_size):
+        chunk = position[np.asarray(sources[start:start + chunk_size])]
+        rows = np.arange(len(chunk))
+
+        # forward: shortest path counts (sigma), one boolean mask per BFS level
+        sigma = np.zeros((len(chunk), n))
+        sigma[rows, chunk] = 1.0
+        visited = sigma > 0
+        levels = [visited.copy()]
+        frontier = sigma
+        while True:
+            reached = (A_t @ frontier.T).T
+            reached[visited] = 0.0
+            level = reached > 0
+            if not level.any():
+                break
+            visited |= level
+            levels.append(level)
+            sigma += reached
+            frontier = reached
+
+        # backward: dependency accumulation, deepest level first
+        delta = np.zeros((len(chunk), n))
+        inv_sigma = np.divide(1.0, sigma, out=np.zeros_like(sigma), where=sigma > 0)
+        for depth in range(len(levels) - 1, 0, -1):
+            coeff = np.where(levels[depth], (1.0 + delta) * inv_sigma, 0.0)
+            np.add(delta, sigma * (A @ coeff.T).T, out=delta, where=levels[depth - 1])
+        delta[rows, chunk] = 0.0
+        betweenness += delta.sum(axis=0)
+
+    scale = 1.0 / ((n - 1) * (n - 2)) if n > 2 else 1.0
+    if len(sources) < n:
+        scale *= n / len(sources)
+    return betweenness * scale
+
+
+# Batched metrics over a CompactBatch: one row per candidate, same values as
+# the single graph functions above.
+
+def _grouped_histograms(rows, values, num_rows, bins, low, high):
+    """
+    Row-wise ``np.histogram(values, bins, range=(low, high[row]))`` of the
+    values grouped by `rows`, normalized to sum to 1 (rows without values
+    stay zero). Uses numpy's bin edges and edge rounding rules.
+    """
+    values = np.asarray(values, dtype=float)
+    lo = np.full(num_rows, float(low))
+    hi = np.asarray(high, dtype=float).copy()
+    empty = lo == hi
+    lo[empty] -= 0.5
+    hi[empty] += 0.5
+
+    step = (hi - lo) / bins
+    edges = np.arange(bins + 1) * step[:, None] + lo[:, None]
+    edges[:, -1] = hi
+
+    row_lo, row_hi = lo[rows], hi[rows]
+    index = ((values - row_lo) * (bins / (row_hi - row_lo))).astype(np.int64)
+    index[index == bins] -= 1
+    index -= values < edges[rows, index]
+    index += (values >= edges[rows, index + 1]) & (index != bins - 1)
+
+    hist = np.bincount(rows * bins + index, minlength=num_rows * bins)
+    hist = hist.reshape(num_rows, bins).astype(float)
+    totals = hist.sum(axis=1, keepdims=True)
+    return np.divide(hist, totals, out=np.zeros_like(hist), where=totals > 0)
+
+def normalized_degree_histograms(batch, bins=5):
+    degrees = batch.degrees()
+    rows, nodes = np.nonzero(batch.node_masks)
+    high = np.where(batch.node_masks, degrees, 0).max(axis=1, initial=0)
+    return _grouped_histograms(rows, degrees[rows, nodes], len(batch), bins, 0, high)
+
+def cycle_ratios(batch):
+    labels, count, owner = batch.strongly_connected_components()
+    internal = labels[batch.union_src] == labels[batch.union_dst]
+
+    internal_edges = np.bincount(labels[batch.union_src[internal]], minlength=count)
+    component_sizes = np.bincount(labels[batch.node_masks.ravel()], minlength=count)
+    cyclic = internal_edges > 0
+    ranks = np.bincount(
+        owner[cyclic],
+        weights=internal_edges[cyclic] - component_sizes[cyclic] + 1,
+        minlength=len(batch),
+    )
+
+    edges = batch.number_of_edges()
+    ratios = np.divide(ranks, edges, out=np.zeros(len(batch)), where=edges > 0)
+    return np.minimum(1.0, ratios)
+
+def hierarchy_depths(batch):
+    labels, count, owner = batch.strongly_connected_components()
+    between = labels[batch.union_src] != labels[batch.union_dst]
+    csrc = labels[batch.union_src[between]]
+    cdst = labels[batch.union_dst[between]]
+
+    remaining = np.zeros(count, dtype=bool)
+    remaining[labels[batch.node_masks.ravel()]] = True
+    in_degree = np.bincount(cdst, minlength=count)
+    layers = np.zeros(len(batch), dtype=np.int64)
+
+    layer = 0
+    frontier = remaining & (in_degree == 0)
+    while frontier.any():
+        layer += 1
+        layers[owner[frontier]] = layer
+        remaining &= ~frontier
+        in_degree -= np.bincount(cdst[frontier[csrc]], minlength=count)
+        frontier = remaining & (in_degree == 0)
+
+    depth = np.maximum(0, layers - 1)
+    return depth / np.maximum(1, batch.number_of_nodes())
+
+def scc_size_histograms(batch, bins=5):
+    labels, count, owner = batch.strongly_connected_components()
+    sizes = np.bincount(labels[batch.node_masks.ravel()], minlength=count)
+    present = sizes > 0
+
+    high = np.zeros(len(batch))
+    np.maximum.at(high, owner[present], sizes[present])
+    return _grouped_histograms(owner[present], sizes[present], len(batch), bins, 1, high)
+
+def centrality_rank_vectors(batch, k=5, exact_max_nodes=None,
+                            pivots=BETWEENNESS_PIVOTS, seed=0):
+    """
+    Batched `centrality_rank_vector`. Sampling is decided on the size of the
+    full diagram and all candidates share the same pivots, so for diagrams
+    above ``exact_max_nodes`` the values differ slightly from the single graph
+    version.
+    """
+    if exact_max_nodes is None:
+        exact_max_nodes = EXACT_BETWEENNESS_MAX_NODES
+    n = batch.graph.number_of_nodes()
+    sources = np.arange(n)
+    if n > exact_max_nodes:
+        sources = betweenness_pivots(sources, pivots, seed)
+
+    centrality = _batch_betweenness(batch, sources)
+    centrality[~batch.node_masks] = -np.inf
+
+    top = -np.sort(-centrality, axis=1)[:, :k]
+    top[np.isinf(top)] = 0.0
+    if top.shape[1] < k:
+        top = np.pad(top, ((0, 0), (0, k - top.shape[1])))
+
+    totals = top.sum(axis=1, keepdims=True)
+    return np.divide(top, totals, out=top.copy(), where=totals != 0)
+
+def _batch_betweenness(batch, sources, max_cells=4_000_000):
+    """
+    ``(candidates, nodes)`` normalized betweenness accumulated from the
+    `sources` node ids.
+
+    Brandes' algorithm with union nodes as rows and sources as columns, so a
+    single sparse product advances the BFS of every source in every
+    candidate. Each BFS level is kept as a sparse matrix of shortest path
+    counts. Sources are processed in chunks of at most ``max_cells`` matrix
+    cells.
+    """
+    c, n = batch.node_masks.shape
+    size = c * n
+    A = batch.adjacency()
+    A_t = A.T.tocsr()
+    active = batch.node_masks.ravel()
+    chunk_size = max(1, max_cells // max(1, size))
+
+    betweenness = np.zeros(size)
+    for start in range(0, len(sources), chunk_size):
+        chunk = sources[start:start + chunk_size]
+        columns = np.tile(np.arange(len(chunk)), c)
+        starts = (np.arange(c)[:, None] * n + chunk[None, :]).ravel()
+        starts_active = active[starts]
+        starts, columns = starts[starts_active], columns[starts_active]
+
+        # forward: shortest path counts of the nodes first reached at each level
+        frontier = csr_matrix(
+            (np.ones(len(starts)), (starts, columns)), shape=(size, len(chunk))
+        )
+        visited = frontier.copy()
+        levels = [frontier]
+        while True:
+            reached = A_t @ frontier
+            reached = reached - reached.multiply(visited)
+            reached.eliminate_zeros()
+            if reached.nnz == 0:
+                break
+            visited = visited + reached
+            visited.data[:] = 1.0
+            levels.append(reached)
+            frontier = reached
+
+        # backward: dependency accumulation, deepest level first, sources excluded
+        delta = csr_matrix((size, len(chunk)))
+        for depth in range(len(levels) - 1, 1, -1):
+            inv_sigma = levels[depth].power(-1)
+            coeff = inv_sigma + delta.multiply(inv_sigma)
+            delta = delta + levels[depth - 1].multiply(A @ coeff)
+        betweenness += np.asarray(delta.sum(axis=1)).ravel()
+
+    nodes = batch.number_of_nodes().astype(float)
+    scale = np.where(nodes > 2, 1.0 / np.maximum(1.0, (nodes - 1) * (nodes - 2)), 1.0)
+    sampled = np.count_nonzero(batch.node_masks[:, sources], axis=1)
+    scale *= np.divide(nodes, sampled, out=np.zeros_like(nodes), where=sampled > 0)
+    return betweenness.reshape(c, n) * scale[:, None]
@@ -0,0 +1,49 @@
+import random
+
+from node2vec import Node2Vec
+
+
+class SeededNode2Vec(Node2Vec):
+    """
+    Node2Vec whose random walks are drawn from its own ``random.Random(seed)``.
+
+    The library seeds the global `random` and `numpy.random` state and splits
+    the walks over worker processes, so concurrent trainings are not
+    reproducible. Here walks are generated in one thread from a private
+    generator; train with ``fit(seed=seed, workers=1)`` for a deterministic
+    model.
+    """
+
+    def __init__(self, graph, seed: int, **params):
+        self.rng = random.Random(seed)
+        super().__init__(graph, workers=1, **params)
+
+    def _generate_walks(self) -> list:
+        walks = []
+        nodes = list(self.d_graph.keys())
+
+        for n_walk in range(self.num_walks):
+            self.rng.shuffle(nodes)
+
+            for source in nodes:
+                strategy = self.sampling_strategy.get(source, {})
+                if strategy.get(self.NUM_WALKS_KEY, self.num_walks) <= n_walk:
+                    continue
+
+                walk = [source]
+                walk_length = strategy.get(self.WALK_LENGTH_KEY, self.walk_length)
+
+                while len(walk) < walk_length:
+                    options = self.d_graph[walk[-1]].get(self.NEIGHBORS_KEY)
+                    if not options:
+                        break
+
+                    if len(walk) == 1:
+                        weights = self.d_graph[walk[-1]][self.FIRST_TRAVEL_KEY]
+                    else:
+                        weights = self.d_graph[walk[-1]][self.PROBABILITIES_KEY][walk[-2]]
+                    walk.append(self.rng.choices(options, weights=weights)[0])
+
+                walks.append([str(node) for node in walk])
+
+        return walks
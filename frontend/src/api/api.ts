@@ -80,6 +80,7 @@ const extendedApi = apiSlice.injectEndpoints({
       query: (threadId) => ({
         url: `api/threads/${threadId}`,
         method: "GET",
+        params: { include_files: true },
       }),
       providesTags: (result, error, threadId) => [
         { type: "ChatThread", id: threadId },
@@ -7,6 +7,7 @@ const extendedApi = apiSlice.injectEndpoints({
       query: (id) => ({
         url: `api/threads/${id}`,
         method: "GET",
+        params: { include_files: true },
       }),
       // providesTags: (result, error, id) => [{ type: "Thread", id }],
     }),
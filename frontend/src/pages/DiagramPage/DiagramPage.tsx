@@ -33,6 +33,16 @@ export const algorithms = [
     name: "Evolutionary algorithm",
     description: "Use Evolutionary algorithm for diagram shrinking.",
   },
+  {
+    id: "greedy",
+    name: "Greedy importance ranking",
+    description: "Remove the least important classes, members and edges first. Fast on large diagrams.",
+  },
+  {
+    id: "community",
+    name: "Community summary",
+    description: "Summarize each cluster of classes by its best connected classes. Meant for very large diagrams.",
+  },
   {
     id: "none",
     name: "No algorithm",
@@ -21,17 +21,80 @@ export class Logger {
     );
   }
 
-  private async sendToBackend(level: LogLevel, msg: string, ...args: any[]) {
-    try {
-      const response = await fetch("http://localhost:8000/api/logs", {
-        method: "POST",
-        headers: { "Content-Type": "application/json" },
-        body: JSON.stringify({ level, message: msg, extra: args }),
-      });
-      console.log("Log sent, response:", response.status);
-    } catch (e) {
-      console.error("Failed to send log to backend", e);
+  // records are buffered and posted to the backend in batches
+  private buffer: { level: LogLevel; message: string; extra: any[] }[] = [];
+  private flushTimer: ReturnType<typeof setTimeout> | null = null;
+  private maxBatchSize = 50;
+  private flushIntervalMs = 2000;
+  // browsers reject keepalive requests once their bodies in flight exceed
+  // 64 KiB, so batches stay below that and unload flushes stop at it
+  private maxBatchBytes = 60 * 1024;
+  private encoder = new TextEncoder();
+
+  private sendToBackend(level: LogLevel, msg: string, ...args: any[]) {
+    this.buffer.push({ level, message: msg, extra: args });
+    if (this.buffer.length >= this.maxBatchSize) {
+      this.flush();
+    } else if (this.flushTimer === null) {
+      this.flushTimer = setTimeout(() => this.flush(), this.flushIntervalMs);
+    }
+  }
+
+  // JSON bodies of at most maxBatchSize records and, unless a single record
+  // is larger, maxBatchBytes bytes
+  private splitBatches(
+    records: { level: LogLevel; message: string; extra: any[] }[],
+  ): string[] {
+    const bodies: string[] = [];
+    let batch: string[] = [];
+    let bytes = 2;
+    for (const record of records) {
+      const json = JSON.stringify(record);
+      const size = this.encoder.encode(json).length + 1;
+      if (
+        batch.length > 0 &&
+        (batch.length >= this.maxBatchSize || bytes + size > this.maxBatchBytes)
+      ) {
+        bodies.push(`[${batch.join(",")}]`);
+        batch = [];
+        bytes = 2;
+      }
+      batch.push(json);
+      bytes += size;
     }
+    if (batch.length > 0) bodies.push(`[${batch.join(",")}]`);
+    return bodies;
+  }
+
+  // `unloading` is set by the pagehide handler: requests are then sent with
+  // keepalive so they outlive the page, up to the browser's 64 KiB limit
+  async flush(unloading = false) {
+    if (this.flushTimer !== null) {
+      clearTimeout(this.flushTimer);
+      this.flushTimer = null;
+    }
+    if (this.buffer.length === 0) return;
+
+    const batch = this.buffer;
+    this.buffer = [];
+    let keepaliveBytes = 0;
+    // all requests are started right away, the page may be gone after this call
+    const requests: Promise<unknown>[] = [];
+    for (const body of this.splitBatches(batch)) {
+      if (unloading) {
+        keepaliveBytes += this.encoder.encode(body).length;
+        if (keepaliveBytes > this.maxBatchBytes) break;
+      }
+      requests.push(
+        fetch("http://localhost:8000/api/logs", {
+          method: "POST",
+          headers: { "Content-Type": "application/json" },
+          body,
+          keepalive: unloading,
+        }).catch((e) => console.error("Failed to send logs to backend", e)),
+      );
+    }
+    await Promise.all(requests);
   }
 
   debug(msg: string, ...args: any[]) {
@@ -74,3 +137,8 @@ export class Logger {
 // Load log level from env (Vite, Next.js, etc.)
 const logLevel = (import.meta.env.VITE_LOG_LEVEL as LogLevel) || "INFO";
 export const logger = new Logger(logLevel);
+
+// send whatever is still buffered when the page is hidden or closed
+if (typeof window !== "undefined") {
+  window.addEventListener("pagehide", () => logger.flush(true));
+}